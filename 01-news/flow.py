@@ -1,6 +1,8 @@
 from pocketflow import Flow
 from nodes import (
     IngestNewsFromRSS,
+    FilterSeenArticles,
+    NoNewArticles,
     SummarizeNewsArticles,
     GenerateBusinessIdea,
     ConductMarketResearch,
@@ -9,7 +11,8 @@ from nodes import (
     FilterCompetitorResults,
     ProjectManagerAgent,
     PitchAgent,
-    PushToDatabase
+    PushToDatabase,
+    MarkArticlesSeen
 )
 
 def create_news_to_pitch_flow() -> Flow:
@@ -18,6 +21,8 @@ def create_news_to_pitch_flow() -> Flow:
     """
     # Create initial nodes.
     rss_node = IngestNewsFromRSS()
+    seen_filter_node = FilterSeenArticles()
+    no_new_node = NoNewArticles()
     summarize_node = SummarizeNewsArticles()
     idea_node = GenerateBusinessIdea()
     market_node = ConductMarketResearch()
@@ -31,8 +36,12 @@ def create_news_to_pitch_flow() -> Flow:
     pm_agent = ProjectManagerAgent()
     pitch_agent = PitchAgent()
     db_push_node = PushToDatabase()
+    mark_seen_node = MarkArticlesSeen()
 
     # Chain the nodes.
-    rss_node >> summarize_node >> idea_node >> market_node >> competitor_search >> search_competitors >> filter_results >> pm_agent >> pitch_agent #>> db_push_node
+    seen_filter_node - "no_new" >> no_new_node
+
+    # mark_seen_node stays last: articles are only recorded as seen once the flow has finished them.
+    rss_node >> seen_filter_node >> summarize_node >> idea_node >> market_node >> competitor_search >> search_competitors >> filter_results >> pm_agent >> pitch_agent >> mark_seen_node #pitch_agent >> db_push_node >> mark_seen_node
 
     return Flow(start=rss_node)
@@ -1,5 +1,6 @@
 from flow import create_news_to_pitch_flow
 from utils.visualizer import save_as_image
+from utils.llm import get_cache_stats
 
 
 def main():
@@ -14,6 +15,8 @@ def main():
     print("\n=== Workflow Complete ===\n")
     final_ideas = shared.get("final_ideas", [])
     print(f"Total Ideas Processed: {len(final_ideas)}")
+    stats = get_cache_stats()
+    print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
     
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,10 +1,44 @@
 # news/nodes.py
-from pocketflow import Node
-import feedparser
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pocketflow import Node, BatchNode
 import yaml
 import re
 from utils.llm import call_llm
+from utils.feeds import fetch_feeds
+from utils.dedup import SeenArticleIndex
 from utils.supabase_client import supabase
+from utils.supabase_writer import SupabaseUpsertWriter
+
+
+class ParallelBatchNode(BatchNode):
+    """
+    BatchNode that runs exec() for each item on a bounded thread pool.
+    Results keep the order of the input items, and each item is retried on its
+    own (max_retries / wait), so one failed completion does not re-run the batch.
+    """
+    def __init__(self, max_retries=3, wait=1, max_workers=8):
+        super().__init__(max_retries=max_retries, wait=wait)
+        self.max_workers = max_workers
+
+    def _exec_item(self, item):
+        # Node._exec keeps its attempt counter on self.cur_retry, which the
+        # workers would share; this loop keeps it local to the item.
+        for attempt in range(self.max_retries):
+            try:
+                return self.exec(item)
+            except Exception as e:
+                if attempt == self.max_retries - 1:
+                    return self.exec_fallback(item, e)
+                if self.wait > 0:
+                    time.sleep(self.wait)
+
+    def _exec(self, items):
+        items = list(items or [])
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool:
+            return list(pool.map(self._exec_item, items))
 
 ### Existing Nodes
 
@@ -60,14 +94,16 @@ class IngestNewsFromRSS(Node):
     
     def exec(self, feed_urls):
         all_articles = []
+        # Feeds are fetched concurrently; FilterSeenArticles drops the ones already processed.
+        results = fetch_feeds(feed_urls)
         for url in feed_urls:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:1]:  # Limit to one article per feed for testing
+            for entry in results[url]["entries"]:
                 article = {
-                    "title": entry.title,
-                    "link": entry.link,
-                    "summary": entry.summary,
-                    "published": entry.get("published", "")
+                    "title": entry["title"],
+                    "link": entry["link"],
+                    "summary": entry["summary"],
+                    "published": entry["published"],
+                    "feed": url
                 }
                 all_articles.append(article)
         return all_articles
@@ -81,14 +117,75 @@ class IngestNewsFromRSS(Node):
         print("==================================\n")
         return "default"
 
-class SummarizeNewsArticles(Node):
+MAX_NEW_PER_FEED = 1  # Limit to one article per feed for testing
+
+class FilterSeenArticles(Node):
+    """
+    Drops articles already processed on a previous run (same normalized link,
+    same title+summary fingerprint, or a near-duplicate SimHash) so the LLM
+    nodes downstream only see new stories. They are only recorded as seen by
+    MarkArticlesSeen, once the flow has finished with them.
+    """
     def prep(self, shared):
         return shared.get("news_articles", [])
     
     def exec(self, articles):
-        summarized_articles = []
-        for article in articles:
-            prompt = f"""
+        index = SeenArticleIndex()
+        try:
+            new_articles = index.filter_new(articles)
+        finally:
+            index.close()
+        per_feed = {}
+        limited = []
+        for article in new_articles:
+            feed = article.get("feed")
+            if per_feed.get(feed, 0) < MAX_NEW_PER_FEED:
+                per_feed[feed] = per_feed.get(feed, 0) + 1
+                limited.append(article)
+        return new_articles, limited
+    
+    def post(self, shared, prep_res, exec_res):
+        new_articles, limited = exec_res
+        shared["news_articles"] = limited
+        shared["unseen_articles"] = limited
+        print(f"\n===== {len(new_articles)} NEW ARTICLES ({len(prep_res) - len(new_articles)} ALREADY SEEN), "
+              f"PROCESSING {len(limited)} =====\n")
+        # Nothing new: end the flow here instead of running the LLM nodes on an empty batch
+        return "default" if limited else "no_new"
+
+class NoNewArticles(Node):
+    """End of the flow when every ingested article was already processed."""
+    def post(self, shared, prep_res, exec_res):
+        shared["final_ideas"] = []
+        print("\n===== NO NEW ARTICLES; NOTHING TO DO =====\n")
+        return "default"
+
+class MarkArticlesSeen(Node):
+    """
+    Records the articles FilterSeenArticles let through as seen. Runs last,
+    so stories from a run that failed part-way are picked up again next time.
+    """
+    def prep(self, shared):
+        return shared.get("unseen_articles", [])
+    
+    def exec(self, articles):
+        index = SeenArticleIndex()
+        try:
+            index.mark_seen(articles)
+        finally:
+            index.close()
+        return len(articles)
+    
+    def post(self, shared, prep_res, exec_res):
+        print(f"\n===== {exec_res} ARTICLES MARKED AS SEEN =====\n")
+        return "default"
+
+class SummarizeNewsArticles(ParallelBatchNode):
+    def prep(self, shared):
+        return shared.get("news_articles", [])
+    
+    def exec(self, article):
+        prompt = f"""
 Summarize the following news article in 3-4 sentences using clear and neutral language.
 
 Title: {article['title']}
@@ -96,14 +193,13 @@ Summary Snippet: {article['summary']}
 
 Only use the information given above. Do not make anything up.
 """
-            summary = call_llm(prompt)
-            summarized_articles.append({
-                "title": article["title"],
-                "link": article["link"],
-                "summary": summary,
-                "published": article["published"]
-            })
-        return summarized_articles
+        summary = call_llm(prompt)
+        return {
+            "title": article["title"],
+            "link": article["link"],
+            "summary": summary,
+            "published": article["published"]
+        }
     
     def post(self, shared, prep_res, exec_res):
         shared["summarized_articles"] = exec_res
@@ -116,14 +212,12 @@ Only use the information given above. Do not make anything up.
         print("=================================\n")
         return "default"
 
-class GenerateBusinessIdea(Node):
+class GenerateBusinessIdea(ParallelBatchNode):
     def prep(self, shared):
         return shared.get("summarized_articles", [])
     
-    def exec(self, articles):
-        business_ideas = []
-        for article in articles:
-            prompt = f"""
+    def exec(self, article):
+        prompt = f"""
 Generate a high-level business idea based on the following news summary.
 Include:
 - The startup's name
@@ -140,14 +234,13 @@ User: <target user>
 Problem: <problem statement>
 Idea: <brief description>
 """
-            idea_text = call_llm(prompt)
-            business_ideas.append({
-                "title": article["title"],
-                "business_idea": idea_text,
-                "link": article["link"],
-                "published": article["published"]
-            })
-        return business_ideas
+        idea_text = call_llm(prompt)
+        return {
+            "title": article["title"],
+            "business_idea": idea_text,
+            "link": article["link"],
+            "published": article["published"]
+        }
     
     def post(self, shared, prep_res, exec_res):
         shared["business_ideas"] = exec_res
@@ -257,25 +350,22 @@ Return your answer as a plain string containing only the competitor names (no ex
 
 
 
-class ProjectManagerAgent(Node):
+class ProjectManagerAgent(ParallelBatchNode):
     def prep(self, shared):
         # Use the ideas produced by the market research node.
         return shared.get("developed_ideas", [])
     
-    def exec(self, ideas):
-        updated_ideas = []
-        for idea in ideas:
-            prompt = f"""
+    def exec(self, idea):
+        prompt = f"""
 You are an experienced project manager. Given the following business idea, estimate how long it would take to build a Minimum Viable Product (MVP).
 Are there any regulations or infrastructure requirements that will hold things up? Or could a developer put out something live in a few days?
 Business Idea: {idea['business_idea']}
 Format your answer as a single sentence. Start with the time it would take and then an explanation, such as: 
 2-3 Weeks, [reason]
 """
-            mvp_estimate = call_llm(prompt)
-            idea["mvp_estimate"] = mvp_estimate
-            updated_ideas.append(idea)
-        return updated_ideas
+        mvp_estimate = call_llm(prompt)
+        idea["mvp_estimate"] = mvp_estimate
+        return idea
     
     def post(self, shared, prep_res, exec_res):
         shared["ideas_with_pm"] = exec_res
@@ -287,24 +377,21 @@ Format your answer as a single sentence. Start with the time it would take and t
 
 
 
-class ConductMarketResearch(Node):
+class ConductMarketResearch(ParallelBatchNode):
     def prep(self, shared):
         return shared.get("business_ideas", [])
     
-    def exec(self, ideas):
-        developed_ideas = []
-        for idea in ideas:
-            prompt = f"""
+    def exec(self, idea):
+        prompt = f"""
 You are a market research expert. Further develop the following business idea by providing detailed market research.
 Include information about potential competitors, market size, growth opportunities, and key challenges.
 Business Idea: {idea['business_idea']}
 
 Provide your response in a clear, structured summary.
 """
-            market_research = call_llm(prompt)
-            idea["developed_idea"] = market_research
-            developed_ideas.append(idea)
-        return developed_ideas
+        market_research = call_llm(prompt)
+        idea["developed_idea"] = market_research
+        return idea
     
     def post(self, shared, prep_res, exec_res):
         shared["developed_ideas"] = exec_res
@@ -314,14 +401,12 @@ Provide your response in a clear, structured summary.
             print(f"Developed Idea: {idea['developed_idea']}\n")
         return "default"
 
-class PitchAgent(Node):
+class PitchAgent(ParallelBatchNode):
     def prep(self, shared):
         return shared.get("ideas_with_pm", [])
     
-    def exec(self, ideas):
-        final_results = []
-        for idea in ideas:
-            prompt = f"""
+    def exec(self, idea):
+        prompt = f"""
 You are an expert pitch creator.
 Based on the following business idea, TAM research, market research, and MVP timeline, create a compelling pitch.
 Business Idea and Research:
@@ -330,15 +415,14 @@ MVP Timeline: {idea.get('mvp_estimate', 'N/A')}
 
 Output your pitch as a single line that begins with "Pitch:".
 """
-            response = call_llm(prompt)
-            # Assume the response is something like: "Pitch: <pitch text>"
-            if "Pitch:" in response:
-                pitch = response.split("Pitch:")[1].strip()
-            else:
-                pitch = response.strip()
-            idea["pitch"] = pitch
-            final_results.append(idea)
-        return final_results
+        response = call_llm(prompt)
+        # Assume the response is something like: "Pitch: <pitch text>"
+        if "Pitch:" in response:
+            pitch = response.split("Pitch:")[1].strip()
+        else:
+            pitch = response.strip()
+        idea["pitch"] = pitch
+        return idea
     
     def post(self, shared, prep_res, exec_res):
         shared["ideas_with_pitch"] = exec_res
@@ -355,9 +439,12 @@ class PushToDatabase(Node):
         return shared.get("ideas_with_pitch", [])
     
     def exec(self, ideas):
-        # Iterate over each idea and insert it into the Supabase database
+        # Upsert all ideas in one request, keyed on the source article URL
+        writer = SupabaseUpsertWriter(supabase, "startup_ideas", on_conflict="source_url", batch_size=100, flush_interval=0)
+        pushed = []
         for idea in ideas:
-            supabase.table("startup_ideas").insert({
+            # Ideas without a source link have no natural key and are skipped by the writer
+            added = writer.add({
                 "title": idea["title"],
                 "business_idea": idea["business_idea"],
                 "mvp_estimate": idea.get("mvp_estimate", ""),
@@ -366,9 +453,12 @@ class PushToDatabase(Node):
                 "source_url": idea.get("link", ""),
                 "published_at": idea.get("published", None),
                 "competitors": idea.get("competitor_info", "")
-            }).execute()
+            })
+            if added:
+                pushed.append(idea)
+        writer.close()
         # Return the ideas (or a success confirmation) for logging purposes
-        return ideas
+        return pushed
     
     def post(self, shared, prep_res, exec_res):
         shared["final_ideas"] = exec_res
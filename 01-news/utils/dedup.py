@@ -0,0 +1,153 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+INDEX_PATH = os.environ.get("SEEN_INDEX_PATH", os.path.join(os.path.dirname(__file__), "..", ".seen_articles.sqlite"))
+
+# Articles whose 64-bit SimHashes differ in at most this many bits are near-duplicates
+# (a one-word edit to a headline+snippet typically flips 5-7 bits).
+# The hash is split into NUM_BANDS bands, so any such pair shares at least one band exactly.
+MAX_HAMMING_DISTANCE = 7
+NUM_BANDS = MAX_HAMMING_DISTANCE + 1
+BAND_BITS = 64 // NUM_BANDS
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|cmpid)$", re.IGNORECASE)
+
+
+def normalize_link(link):
+    """Lowercase scheme/host, drop www., tracking params, fragments and trailing slashes."""
+    parts = urlsplit(link.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if not _TRACKING_PARAMS.match(k)))
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), host, path, query, ""))
+
+
+def _tokens(text):
+    return re.findall(r"\w+", re.sub(r"<[^>]+>", " ", text).lower())
+
+
+def fingerprint(title, summary):
+    """Exact content fingerprint of the normalized title and summary."""
+    text = " ".join(_tokens(title) + _tokens(summary))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def simhash(text, shingle_size=2):
+    """64-bit SimHash over word shingles."""
+    words = _tokens(text)
+    shingles = [" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))]
+    weights = [0] * 64
+    for shingle in shingles:
+        h = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _bands(h):
+    mask = (1 << BAND_BITS) - 1
+    return [(h >> (i * BAND_BITS)) & mask for i in range(NUM_BANDS)]
+
+
+class SeenArticleIndex:
+    """
+    Persistent index of articles already processed by the news flow.
+
+    An article is considered seen if its normalized link or exact content
+    fingerprint is known, or if a stored article's SimHash is within
+    MAX_HAMMING_DISTANCE bits (looked up through the band index, not a scan).
+
+    Checking and recording are separate: filter_new() only reads the index,
+    and mark_seen() records articles once the flow has finished them, so a
+    failed run does not hide its stories from the next one. Articles without
+    a link are keyed by their fingerprint.
+    """
+    def __init__(self, path=INDEX_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "link TEXT PRIMARY KEY, fingerprint TEXT, simhash TEXT, title TEXT, seen_at REAL)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_articles_fingerprint ON articles(fingerprint)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS bands (band INTEGER, value INTEGER, link TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS idx_bands ON bands(band, value)")
+        self.db.commit()
+
+    def _keys(self, article):
+        text = f"{article.get('title', '')} {article.get('summary', '')}"
+        link = (article.get("link") or "").strip()
+        return (
+            normalize_link(link) if link else None,
+            fingerprint(article.get("title", ""), article.get("summary", "")),
+            simhash(text),
+        )
+
+    def _is_near_duplicate(self, h):
+        for band, value in enumerate(_bands(h)):
+            rows = self.db.execute(
+                "SELECT a.simhash FROM bands b JOIN articles a ON a.link = b.link "
+                "WHERE b.band = ? AND b.value = ?", (band, value)
+            )
+            for (other,) in rows:
+                if bin(h ^ int(other, 16)).count("1") <= MAX_HAMMING_DISTANCE:
+                    return True
+        return False
+
+    def _is_seen(self, link, fp, h):
+        # A NULL link (article without one) matches nothing, so only the fingerprint is compared.
+        row = self.db.execute(
+            "SELECT 1 FROM articles WHERE link = ? OR fingerprint = ? LIMIT 1", (link, fp)
+        ).fetchone()
+        return row is not None or self._is_near_duplicate(h)
+
+    def is_seen(self, article):
+        return self._is_seen(*self._keys(article))
+
+    def _add(self, article):
+        link, fp, h = self._keys(article)
+        key = link or f"fingerprint:{fp}"
+        cur = self.db.execute(
+            "INSERT OR IGNORE INTO articles VALUES (?, ?, ?, ?, ?)",
+            (key, fp, format(h, "016x"), article.get("title", ""), time.time()),
+        )
+        if cur.rowcount:
+            self.db.executemany(
+                "INSERT INTO bands VALUES (?, ?, ?)",
+                [(band, value, key) for band, value in enumerate(_bands(h))],
+            )
+
+    def add(self, article):
+        self._add(article)
+        self.db.commit()
+
+    def mark_seen(self, articles):
+        """Record articles the flow has finished processing (one transaction)."""
+        for article in articles:
+            self._add(article)
+        self.db.commit()
+
+    def filter_new(self, articles):
+        """Return the unseen articles, also deduplicated among themselves. Nothing is recorded."""
+        new_articles = []
+        batch_links, batch_fps, batch_hashes = set(), set(), []
+        for article in articles:
+            link, fp, h = self._keys(article)
+            if (link in batch_links or fp in batch_fps
+                    or any(bin(h ^ other).count("1") <= MAX_HAMMING_DISTANCE for other in batch_hashes)
+                    or self._is_seen(link, fp, h)):
+                continue
+            if link:
+                batch_links.add(link)
+            batch_fps.add(fp)
+            batch_hashes.append(h)
+            new_articles.append(article)
+        return new_articles
+
+    def close(self):
+        self.db.close()
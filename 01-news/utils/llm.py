@@ -1,14 +1,109 @@
 import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
 from openai import OpenAI
 
-def call_llm(prompt):    
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
-    r = client.chat.completions.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}]
+MODEL = "gpt-4o"
+
+# On-disk response cache. Set LLM_CACHE_TTL=0 to disable it.
+CACHE_PATH = os.environ.get("LLM_CACHE_PATH", os.path.join(os.path.dirname(__file__), "..", ".llm_cache.sqlite"))
+CACHE_TTL = int(os.environ.get("LLM_CACHE_TTL", 7 * 24 * 3600))  # seconds
+CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+
+cache_stats = {"hits": 0, "misses": 0}
+
+_client = None
+_db = None
+_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared OpenAI client so its connection pool is reused across calls."""
+    global _client
+    with _lock:
+        if _client is None:
+            _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", "your-api-key"))
+        return _client
+
+
+def _get_db():
+    global _db
+    if _db is None:
+        _db = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, response TEXT, created_at REAL, last_used REAL)"
+        )
+        _db.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)")
+        _db.commit()
+    return _db
+
+
+def _cache_key(model, messages):
+    payload = json.dumps({"model": model, "messages": messages}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cache_get(key):
+    now = time.time()
+    with _lock:
+        db = _get_db()
+        row = db.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > CACHE_TTL:
+            db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            db.commit()
+            return None
+        db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+        db.commit()
+        return row[0]
+
+
+def _cache_put(key, response):
+    now = time.time()
+    with _lock:
+        db = _get_db()
+        db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, response, now, now))
+        # Evict least recently used entries beyond the size bound.
+        db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (CACHE_MAX_ENTRIES,),
+        )
+        db.commit()
+
+
+def get_cache_stats():
+    """Return a copy of the cache hit/miss counters for this process."""
+    with _lock:
+        return dict(cache_stats)
+
+
+def call_llm(prompt, use_cache=True):
+    messages = [{"role": "user", "content": prompt}]
+    use_cache = use_cache and CACHE_TTL > 0
+    if use_cache:
+        key = _cache_key(MODEL, messages)
+        cached = _cache_get(key)
+        with _lock:
+            cache_stats["hits" if cached is not None else "misses"] += 1
+        if cached is not None:
+            return cached
+
+    r = get_client().chat.completions.create(
+        model=MODEL,
+        messages=messages
     )
-    return r.choices[0].message.content
+    content = r.choices[0].message.content
+    if use_cache and content is not None:
+        _cache_put(key, content)
+    return content
 
 # Example usage
 if __name__ == "__main__":
-    print(call_llm("Tell me a short joke")) 
\ No newline at end of file
+    print(call_llm("Tell me a short joke"))
+    print(get_cache_stats())
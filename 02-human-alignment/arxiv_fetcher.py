@@ -0,0 +1,102 @@
+import os
+import time
+import hashlib
+import threading
+
+import requests
+
+from paper_cursor import PaperCursor, iter_papers, register_cursor
+
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".arxiv_cache")
+CACHE_TTL = 24 * 3600  # seconds
+PAGE_SIZE = 100
+
+
+class TokenBucket:
+    """Blocking token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                time.sleep((1 - self.tokens) / self.rate)
+
+
+# arXiv asks API clients to wait 3 seconds between requests.
+_bucket = TokenBucket(rate=1 / 3.0)
+_session = requests.Session()
+
+
+def _cache_path(search_query, start, max_results):
+    key = hashlib.sha256(f"{search_query}|{start}|{max_results}".encode("utf-8")).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.xml")
+
+
+def fetch_page(search_query, start, max_results):
+    """Fetch one result window, from the disk cache when it is fresh enough."""
+    path = _cache_path(search_query, start, max_results)
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < CACHE_TTL:
+        with open(path, "rb") as f:
+            return f.read()
+
+    _bucket.acquire()
+    response = _session.get(ARXIV_API_URL, params={
+        "search_query": search_query,
+        "start": start,
+        "max_results": max_results,
+        "sortBy": "submittedDate",
+        "sortOrder": "descending",
+    }, timeout=60)
+    response.raise_for_status()
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(response.content)
+    os.replace(tmp_path, path)
+    return response.content
+
+
+def iter_pages(topic, max_results, page_size=PAGE_SIZE):
+    """Yield the papers of each `start`/`max_results` window as it arrives."""
+    search_query = f"all:{topic}"
+    for start in range(0, max_results, page_size):
+        window = min(page_size, max_results - start)
+        papers = list(iter_papers(fetch_page(search_query, start, window)))
+        yield papers
+        if len(papers) < window:
+            break
+
+
+def fetch_papers(topic, max_results, page_size=PAGE_SIZE):
+    """
+    Start paging through arXiv results in a background thread and return a
+    registered PaperCursor as soon as the first page has arrived. Later pages
+    are appended to the cursor while the caller reads the first papers.
+    """
+    cursor = register_cursor(PaperCursor(complete=False))
+
+    def load():
+        try:
+            for papers in iter_pages(topic, max_results, page_size):
+                cursor.extend(papers)
+        except Exception as e:
+            cursor.finish(error=e)
+        else:
+            cursor.finish()
+
+    threading.Thread(target=load, daemon=True).start()
+    cursor.wait_for(0)
+    return cursor
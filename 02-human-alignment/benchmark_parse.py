@@ -0,0 +1,48 @@
+"""
+Compare parsing an arXiv result feed per paper (the old parse_next_paper, which
+re-parsed the whole XML on every index) with parsing it once into a PaperCursor.
+
+    python benchmark_parse.py [num_entries]
+"""
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from paper_cursor import open_cursor
+
+
+def make_feed(num_entries):
+    entries = "".join(
+        f"""<entry>
+    <id>http://arxiv.org/abs/2501.{i:05d}v1</id>
+    <title>Paper {i} on AI policy and energy governance</title>
+    <summary>{"An abstract about AI policy and the energy sector. " * 20}</summary>
+    <published>2025-01-01T00:00:00Z</published>
+    <link href="http://arxiv.org/abs/2501.{i:05d}v1" rel="alternate" type="text/html"/>
+  </entry>"""
+        for i in range(num_entries)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+
+
+def walk_reparsing(xml_data, num_entries):
+    ns = {"atom": "http://www.w3.org/2005/Atom"}
+    for index in range(num_entries):
+        entry = ET.fromstring(xml_data).findall("atom:entry", ns)[index]
+        entry.find("atom:title", ns).text.strip()
+
+
+def walk_cursor(xml_data, num_entries):
+    cursor = open_cursor(xml_data)
+    for index in range(num_entries):
+        cursor.paper_json(index)
+
+
+if __name__ == "__main__":
+    num_entries = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    xml_data = make_feed(num_entries)
+    print(f"Feed with {num_entries} entries ({len(xml_data) / 1e6:.1f} MB)")
+    for name, walk in [("re-parse per paper", walk_reparsing), ("parse once + cursor", walk_cursor)]:
+        start = time.perf_counter()
+        walk(xml_data, num_entries)
+        print(f"{name:>22}: {time.perf_counter() - start:.3f}s")
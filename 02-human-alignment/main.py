@@ -1,12 +1,13 @@
 import os
 import requests
-import xml.etree.ElementTree as ET
 import json
 import re
 from smolagents import CodeAgent, ToolCallingAgent, HfApiModel, tool, LiteLLMModel
 from dotenv import load_dotenv
 from requests.exceptions import RequestException
 from datetime import date
+from paper_cursor import get_cursor
+from arxiv_fetcher import fetch_papers
 
 
 load_dotenv()
@@ -17,85 +18,63 @@ load_dotenv()
 @tool
 def fetch_arxiv_papers(topic: str, max_results: int) -> str:
     """
-    Searches the arXiv API for papers on a given topic and returns the raw XML.
+    Searches the arXiv API for papers on a given topic. Results are fetched page by page in the
+    background, so the first papers can be read while later pages are still downloading.
     
     Args:
         topic: The research topic or keyword.
         max_results: The number of results to fetch.
         
     Returns:
-        The raw XML response from arXiv.
+        A JSON string with a "handle" for the results and the number of papers loaded so far. Pass the handle to parse_next_paper.
     """
-    query = f"search_query=all:{topic}&start=0&max_results={max_results}&sortBy=submittedDate&sortOrder=descending"
-    url = f"http://export.arxiv.org/api/query?{query}"
-    response = requests.get(url)
-    if response.status_code != 200:
-        return f"Error: Received status code {response.status_code} from arXiv API."
-    
-    return response.text
+    cursor = fetch_papers(topic, max_results)
+    if cursor.error is not None and not len(cursor):
+        return f"Error: fetching papers from the arXiv API failed: {cursor.error}"
+    return json.dumps({
+        "status": "success",
+        "handle": cursor.handle,
+        "papers_loaded": len(cursor),
+        "all_pages_loaded": cursor.complete
+    })
 
 @tool
-def parse_next_paper(xml_data: str, index: int) -> str:
+def parse_next_paper(handle: str, index: int) -> str:
     """
-    Parses the XML data from arXiv and returns information about the paper at the given index.
+    Returns information about the paper at the given index of a result set fetched with fetch_arxiv_papers.
     
     Args:
-        xml_data: The raw XML response from arXiv.
-        index: The index of the paper to parse.
+        handle: The handle returned by fetch_arxiv_papers.
+        index: The index of the paper to return.
         
     Returns:
         A JSON string representing the paper information, or a message if no more papers are found.
     """
-    try:
-        root = ET.fromstring(xml_data)
-    except ET.ParseError as e:
-        return f"Error parsing XML: {str(e)}"
-    
-    ns = {"atom": "http://www.w3.org/2005/Atom"}
-    entries = root.findall("atom:entry", ns)
-    
-    if index >= len(entries):
-        return json.dumps({"status": "end", "message": "No more papers available."})
-    
-    entry = entries[index]
-    
-    title_elem = entry.find("atom:title", ns)
-    summary_elem = entry.find("atom:summary", ns)
-    published_elem = entry.find("atom:published", ns)
-    
-    if title_elem is None or summary_elem is None or published_elem is None:
-        return json.dumps({"status": "error", "message": "Incomplete paper entry."})
-    
-    title = title_elem.text.strip()
-    summary_text = summary_elem.text.strip()
-    published_date = published_elem.text.strip()
-
-    # Find the first <link> element with rel="alternate" for the URL.
-    paper_url = None
-    for link in entry.findall("atom:link", ns):
-        if link.attrib.get("rel") == "alternate":
-            paper_url = link.attrib.get("href")
-            break
-    if paper_url is None:
-        return json.dumps({"status": "error", "message": "No URL found for paper."})
-
-    paper = {
-        "status": "success",
-        "paper_name": title,
-        "url": paper_url,
-        "published_date": published_date,
-        "summary": summary_text,
-        "total_papers": len(entries),
-        "current_index": index
-    }
-    
-    return json.dumps(paper, indent=2)
+    cursor = get_cursor(handle)
+    if cursor is None:
+        return json.dumps({"status": "error", "message": f"Unknown handle: {handle}. Call fetch_arxiv_papers first."})
+    return cursor.paper_json(index)
+
+# Shared Supabase client and batched writer, created on the first push.
+_paper_writer = None
+
+def get_paper_writer():
+    global _paper_writer
+    if _paper_writer is None:
+        from supabase import create_client
+        from supabase_writer import SupabaseUpsertWriter
+        client = create_client(os.getenv("SUPABASE_URL"), os.getenv("SUPABASE_SERVICE_KEY"))
+        # Existing papers (same url) are skipped rather than overwritten.
+        _paper_writer = SupabaseUpsertWriter(
+            client, "policy_papers", on_conflict="url", batch_size=20, flush_interval=10.0, ignore_duplicates=True
+        )
+    return _paper_writer
 
 @tool
 def push_to_supabase(paper_name: str, url: str, published_date: str, summary: str) -> str:
     """
     Pushes the qualifying paper information to the Supabase database (table: policy_papers).
-    Checks if the paper already exists before inserting to avoid duplicates.
+    Papers are buffered and upserted in batches keyed on the URL, so papers that already exist are skipped.
 
     Args:
         paper_name: The title of the paper.
@@ -104,7 +83,8 @@ def push_to_supabase(paper_name: str, url: str, published_date: str, summary: st
         summary: The paper summary.
     
     Returns:
-        A confirmation message or a message if credentials are missing.
+        A message saying the paper was queued (writes are deferred, not confirmed) and
+        reporting any failed batch write, or why the paper was not queued.
     """
     supabase_url = os.getenv("SUPABASE_URL")
     supabase_service_key = os.getenv("SUPABASE_SERVICE_KEY")
@@ -112,33 +92,26 @@ def push_to_supabase(paper_name: str, url: str, published_date: str, summary: st
     if not supabase_url or not supabase_service_key:
         return "Supabase credentials not found in .env. Skipping database push."
 
-    from supabase import create_client
-    client = create_client(supabase_url, supabase_service_key)
-    
-    # Check if paper already exists by URL (more reliable than title which might have formatting differences)
-    existing = client.table("policy_papers").select("*").eq("url", url).execute()
-    
-    # If paper already exists, return message
-    if existing and existing.data and len(existing.data) > 0:
-        return f"Paper already exists in database with URL: {url}. Skipping insertion."
-    
-    # If paper doesn't exist by URL, also check by title for extra safety
-    existing = client.table("policy_papers").select("*").eq("paper_name", paper_name).execute()
+    print(f"Queueing record - Paper Name: {paper_name}, URL: {url}, Published Date: {published_date}")
     
-    if existing and existing.data and len(existing.data) > 0:
-        return f"Paper already exists in database with title: {paper_name}. Skipping insertion."
-    
-    # If paper doesn't exist, insert it
-    print(f"Inserting record - Paper Name: {paper_name}, URL: {url}, Published Date: {published_date}")
-    
-    response = client.table("policy_papers").insert({
+    writer = get_paper_writer()
+    queued = writer.add({
         "paper_name": paper_name,
         "url": url,
         "summary": summary,
         "published_date": published_date
-    }).execute()
-
-    return "Paper pushed to the policy_papers table successfully."
+    })
+    if not queued:
+        return "Paper not queued: a URL is required (it is the key used to skip existing papers)."
+
+    status = (
+        "Paper queued for the policy_papers table. Delivery is deferred: papers are written in batches "
+        "(existing URLs are skipped), so this write is not confirmed yet. "
+        f"{writer.rows_written} paper(s) written so far."
+    )
+    if writer.last_error is not None:
+        status += f" WARNING: the last batch write failed ({writer.last_error}); it will be retried."
+    return status
 
 @tool
 def visit_webpage(url: str) -> str:
@@ -209,10 +182,10 @@ def main():
     
     Follow these steps:
     
-    1. Use the "fetch_arxiv_papers" tool to fetch the raw XML data for papers on the topic, setting an appropriate max_results parameter.
+    1. Use the "fetch_arxiv_papers" tool to fetch papers on the topic, setting an appropriate max_results parameter. It returns a handle for the results.
     
     2. Process each paper sequentially:
-       a. Call "parse_next_paper" with the XML data and the current index (starting from 0)
+       a. Call "parse_next_paper" with the handle and the current index (starting from 0)
        b. Evaluate individually whether the paper meets the goal criteria. Use your logic and understanding based on the title and summary, not just keyword searches.
        c. If the paper qualifies, call the "push_to_supabase" tool with the paper information
        d. Increment the index and repeat until you've processed all papers or tried your best to find at least 5 qualifying papers
@@ -231,6 +204,8 @@ def main():
     # Run the agent with the task.
     print("Running agent task...")
     result = agent.run(task)
+    if _paper_writer is not None:
+        _paper_writer.close()
     print("Agent output:")
     print(result)
 
@@ -0,0 +1,117 @@
+import io
+import json
+import uuid
+import threading
+import xml.etree.ElementTree as ET
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+# Parsed feeds, keyed by the handle returned to the agent.
+_CURSORS = {}
+_CURSORS_LOCK = threading.Lock()
+
+
+def _entry_to_paper(entry):
+    def text(tag):
+        elem = entry.find(ATOM + tag)
+        return elem.text.strip() if elem is not None and elem.text else None
+
+    # The first <link> element with rel="alternate" is the paper URL.
+    paper_url = None
+    for link in entry.findall(ATOM + "link"):
+        if link.attrib.get("rel") == "alternate":
+            paper_url = link.attrib.get("href")
+            break
+
+    return {
+        "paper_name": text("title"),
+        "url": paper_url,
+        "published_date": text("published"),
+        "summary": text("summary"),
+    }
+
+
+def iter_papers(xml_data):
+    """
+    Incrementally parse arXiv Atom XML and yield one paper dict per <entry>.
+    Parsed entries are cleared as we go, so memory stays flat for large feeds.
+    """
+    if isinstance(xml_data, str):
+        xml_data = xml_data.encode("utf-8")
+    for _, elem in ET.iterparse(io.BytesIO(xml_data), events=("end",)):
+        if elem.tag == ATOM + "entry":
+            yield _entry_to_paper(elem)
+            elem.clear()
+
+
+class PaperCursor:
+    """
+    Structured papers from one arXiv query, parsed once and read by index.
+    Papers can be appended while later result pages are still downloading;
+    readers block until the requested index arrives or the cursor is complete.
+    """
+    def __init__(self, papers=None, complete=True):
+        self.handle = uuid.uuid4().hex[:12]
+        self.papers = list(papers or [])
+        self.complete = complete
+        self.error = None
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self.papers)
+
+    def extend(self, papers):
+        with self._cond:
+            self.papers.extend(papers)
+            self._cond.notify_all()
+
+    def finish(self, error=None):
+        with self._cond:
+            self.complete = True
+            self.error = error
+            self._cond.notify_all()
+
+    def wait_for(self, index, timeout=None):
+        """Wait until paper `index` is available or no more papers will arrive."""
+        with self._cond:
+            self._cond.wait_for(lambda: index < len(self.papers) or self.complete, timeout)
+            return index < len(self.papers)
+
+    def paper_json(self, index, timeout=120):
+        """Return the paper at `index` in the JSON format the agent tools expect."""
+        if index < 0 or not self.wait_for(index, timeout):
+            if self.error is not None:
+                return json.dumps({"status": "error", "message": f"Fetching more papers failed: {self.error}"})
+            if not self.complete:
+                return json.dumps({"status": "error", "message": "Timed out waiting for the next page of papers."})
+            return json.dumps({"status": "end", "message": "No more papers available."})
+
+        paper = self.papers[index]
+        if paper["paper_name"] is None or paper["summary"] is None or paper["published_date"] is None:
+            return json.dumps({"status": "error", "message": "Incomplete paper entry."})
+        if paper["url"] is None:
+            return json.dumps({"status": "error", "message": "No URL found for paper."})
+
+        return json.dumps({
+            "status": "success",
+            **paper,
+            "total_papers": len(self.papers),
+            "all_pages_loaded": self.complete,
+            "current_index": index
+        }, indent=2)
+
+
+def register_cursor(cursor):
+    with _CURSORS_LOCK:
+        _CURSORS[cursor.handle] = cursor
+    return cursor
+
+
+def open_cursor(xml_data):
+    """Parse `xml_data` once and register it; returns the new PaperCursor."""
+    return register_cursor(PaperCursor(iter_papers(xml_data)))
+
+
+def get_cursor(handle):
+    with _CURSORS_LOCK:
+        return _CURSORS.get(handle)
@@ -0,0 +1,90 @@
+import time
+import atexit
+import threading
+
+
+class SupabaseUpsertWriter:
+    """
+    Buffers rows for one table and writes them with a single upsert per batch.
+
+    Rows are flushed when `batch_size` rows are buffered, when the oldest
+    buffered row is `flush_interval` seconds old, on `flush()`, and at exit.
+    `on_conflict` is the natural key column (it needs a unique constraint).
+    With `ignore_duplicates=True` existing rows are left untouched instead of
+    being updated. Rows with a missing or empty key are skipped (and logged):
+    they would all collapse onto one buffered row. If a flush fails, the
+    error is kept in `last_error` (cleared by the next successful flush).
+    """
+    def __init__(self, client, table, on_conflict, batch_size=50, flush_interval=5.0, ignore_duplicates=False):
+        self.client = client
+        self.table = table
+        self.on_conflict = on_conflict
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.ignore_duplicates = ignore_duplicates
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.last_error = None
+        self._buffer = {}
+        self._oldest = None
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._timer = None
+        if flush_interval:
+            self._timer = threading.Thread(target=self._flush_periodically, daemon=True)
+            self._timer.start()
+        atexit.register(self.close)
+
+    def add(self, row):
+        """Buffer a row; returns False (and writes nothing) if its key is missing or empty."""
+        key = row.get(self.on_conflict)
+        if key is None or key == "":
+            self.rows_skipped += 1
+            print(f"Skipping row for {self.table} without {self.on_conflict} ({self.rows_skipped} skipped so far)")
+            return False
+        with self._lock:
+            # Keyed by the natural key: a single upsert may not touch the same row twice.
+            self._buffer[key] = row
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+        return True
+
+    def flush(self):
+        with self._lock:
+            rows = list(self._buffer.values())
+            self._buffer.clear()
+            self._oldest = None
+            if not rows:
+                return 0
+            try:
+                self.client.table(self.table).upsert(
+                    rows, on_conflict=self.on_conflict, ignore_duplicates=self.ignore_duplicates
+                ).execute()
+            except Exception as e:
+                # Keep the rows buffered so the next flush retries them.
+                self._buffer.update({row[self.on_conflict]: row for row in rows})
+                self._oldest = time.monotonic()
+                self.last_error = e
+                raise
+            self.last_error = None
+            self.rows_written += len(rows)
+            return len(rows)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.flush_interval / 2):
+            oldest = self._oldest
+            if oldest is not None and time.monotonic() - oldest >= self.flush_interval:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"Error flushing rows to {self.table}: {e}")
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self.flush()
+        atexit.unregister(self.close)
@@ -1,16 +1,14 @@
-from sentence_transformers import SentenceTransformer
-import hdbscan
-
-model = SentenceTransformer("all-MiniLM-L6-v2")
+from embeddings import embed_texts
+from incremental_clustering import get_clusterer
 
 def cluster_items(items, min_cluster_size=2):
     texts = [item["title"] for item in items]
     if not texts:
         return []
 
-    embeddings = model.encode(texts)
-    clusterer = hdbscan.HDBSCAN(min_cluster_size=min_cluster_size, metric="euclidean")
-    labels = clusterer.fit_predict(embeddings)
+    embeddings = embed_texts(texts)
+    # Cluster IDs stay stable across refreshes; a full refit only runs on drift.
+    labels = get_clusterer(min_cluster_size).update(texts, embeddings)
 
     clusters = {}
     for label, text in zip(labels, texts):
@@ -19,7 +17,7 @@ def cluster_items(items, min_cluster_size=2):
         clusters.setdefault(label, []).append(text)
 
     cluster_text = []
-    for i, titles in clusters.items():
+    for i, titles in sorted(clusters.items()):
         cluster_text.append(f"🔸 Cluster {i} ({len(titles)} items):")
         cluster_text.extend(f"- {t}" for t in titles)
         cluster_text.append("")  # add space between clusters
@@ -0,0 +1,70 @@
+"""
+Benchmark parsing saved GitHub trending pages with BeautifulSoup's html.parser
+(the previous scraper) against lxml (parse_trending_page).
+
+    python benchmark_trending.py          # benchmark the fixtures in fixtures/
+    python benchmark_trending.py --save   # replace them with freshly downloaded pages
+
+The committed fixtures are offline copies of the trending page markup
+(25 article.Box-row entries per page plus header/footer chrome, one repo
+without a description), so the benchmark runs without network access.
+"""
+import os
+import sys
+import glob
+import time
+
+from bs4 import BeautifulSoup
+
+from fetch import parse_trending_page
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+FIXTURE_PAGES = [("python", "daily"), ("javascript", "daily"), ("", "weekly"), ("rust", "monthly")]
+ROUNDS = 20
+
+
+def parse_with_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    trending = []
+    for repo in soup.select("article.Box-row"):
+        title = repo.h2.get_text(strip=True).replace(" ", "")
+        description_tag = repo.find("p")
+        description = description_tag.get_text(strip=True) if description_tag else "No description"
+        stars = repo.select_one("a[href$='/stargazers']").get_text(strip=True)
+        trending.append({"name": title, "description": description, "stars": stars})
+    return trending
+
+
+def save_fixtures():
+    from feeds import get_session
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for language, since in FIXTURE_PAGES:
+        res = get_session().get(f"https://github.com/trending/{language}?since={since}", timeout=15)
+        res.raise_for_status()
+        path = os.path.join(FIXTURE_DIR, f"trending_{language or 'all'}_{since}.html")
+        with open(path, "wb") as f:
+            f.write(res.content)
+        print(f"Saved {path}")
+
+
+def benchmark():
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, "trending_*.html"))):
+        with open(path, "rb") as f:
+            pages.append(f.read())
+    if not pages:
+        sys.exit("No fixtures found; run with --save first.")
+
+    for name, parse in [("bs4 html.parser", parse_with_bs4), ("lxml", parse_trending_page)]:
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            repos = [parse(page) for page in pages]
+        elapsed = (time.perf_counter() - start) / (ROUNDS * len(pages))
+        print(f"{name:>16}: {elapsed * 1000:.1f} ms/page ({sum(map(len, repos))} repos in {len(pages)} pages)")
+
+
+if __name__ == "__main__":
+    if "--save" in sys.argv:
+        save_fixtures()
+    else:
+        benchmark()
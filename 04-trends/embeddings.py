@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+import threading
+
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".embedding_cache")
+
+_models = {}
+_caches = {}
+_lock = threading.Lock()
+
+
+def get_model(model_name=MODEL_NAME):
+    """Return the process-wide SentenceTransformer for `model_name`, loading it on first use."""
+    with _lock:
+        if model_name not in _models:
+            from sentence_transformers import SentenceTransformer
+            _models[model_name] = SentenceTransformer(model_name)
+        return _models[model_name]
+
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    On-disk embedding memo for one model.
+
+    Vectors are appended to a float32 matrix file that is read through a
+    memory map; keys.txt holds the text hash of each row, in row order.
+    Only texts that are not cached yet are sent to the model.
+    """
+    def __init__(self, model_name=MODEL_NAME, cache_dir=CACHE_DIR):
+        self.model_name = model_name
+        self.path = os.path.join(cache_dir, model_name.replace("/", "__"))
+        os.makedirs(self.path, exist_ok=True)
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.keys_path = os.path.join(self.path, "keys.txt")
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.dim = None
+        self.index = {}
+        self.vectors = None
+        self.last_encoded = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path) as f:
+            self.dim = json.load(f)["dim"]
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                keys = f.read().split()
+        # Rows are written before keys, so a torn write leaves extra rows, never missing ones.
+        num_rows = min(len(keys), os.path.getsize(self.vectors_path) // (4 * self.dim))
+        self.index = {key: row for row, key in enumerate(keys[:num_rows])}
+        self._remap(num_rows)
+
+    def _remap(self, num_rows):
+        if num_rows:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(num_rows, self.dim))
+
+    def _append(self, keys, vectors):
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            with open(self.meta_path, "w") as f:
+                json.dump({"model": self.model_name, "dim": self.dim}, f)
+        num_rows = len(self.index)
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(num_rows * 4 * self.dim)  # drop rows left over from a torn write
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.keys_path, "w" if num_rows == 0 else "a") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+        for offset, key in enumerate(keys):
+            self.index[key] = num_rows + offset
+        self._remap(len(self.index))
+
+    def encode(self, texts, batch_size=64):
+        """Return a (len(texts), dim) float32 array, encoding only uncached texts."""
+        texts = list(texts)
+        keys = [_text_key(t) for t in texts]
+        with self._lock:
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in self.index:
+                    missing.setdefault(key, text)
+            self.last_encoded = len(missing)
+            if missing:
+                vectors = get_model(self.model_name).encode(
+                    list(missing.values()), batch_size=batch_size, convert_to_numpy=True
+                )
+                self._append(list(missing), vectors)
+            if not keys:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return np.asarray(self.vectors[[self.index[key] for key in keys]])
+
+
+def get_embedding_cache(model_name=MODEL_NAME):
+    with _lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
+
+
+def embed_texts(texts, model_name=MODEL_NAME):
+    """Embed `texts` with the shared model, reusing cached vectors."""
+    return get_embedding_cache(model_name).encode(texts)
@@ -0,0 +1,120 @@
+import os
+import json
+import calendar
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+# Per-feed ETag / Last-Modified and cached entries. Which entries were already
+# processed is up to the caller, which records them once it has used them.
+STATE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".feed_state.json")
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=16):
+    """Return the shared HTTP session so feeds reuse pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers["User-Agent"] = "Mozilla/5.0"
+        return _session
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, path=STATE_PATH):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def _entry_to_article(entry):
+    published_parsed = entry.get("published_parsed")
+    return {
+        "id": entry.get("id") or entry.get("link", ""),
+        "title": entry.get("title", ""),
+        "link": entry.get("link", ""),
+        "summary": entry.get("summary", ""),
+        "published": entry.get("published", ""),
+        "timestamp": calendar.timegm(published_parsed) if published_parsed else None,
+    }
+
+
+def _fetch_one(url, feed_state, timeout):
+    headers = {}
+    if feed_state.get("etag"):
+        headers["If-None-Match"] = feed_state["etag"]
+    if feed_state.get("modified"):
+        headers["If-Modified-Since"] = feed_state["modified"]
+
+    res = get_session().get(url, headers=headers, timeout=timeout)
+    if res.status_code == 304:
+        return feed_state, feed_state.get("entries", []), True
+    res.raise_for_status()
+
+    entries = [_entry_to_article(e) for e in feedparser.parse(res.content).entries]
+    new_state = {
+        "etag": res.headers.get("ETag"),
+        "modified": res.headers.get("Last-Modified"),
+        "entries": entries,
+    }
+    return new_state, entries, False
+
+
+def fetch_feeds(feed_urls, state_path=STATE_PATH, max_workers=8, timeout=10):
+    """
+    Fetch several RSS/Atom feeds concurrently using conditional GETs.
+
+    Feeds answering 304 Not Modified are served from the cached entries in the
+    state file. Every current entry is returned; filtering out entries that
+    were already processed is left to the caller, so nothing is marked as
+    processed before it actually is.
+
+    Args:
+        feed_urls: Iterable of feed URLs.
+        state_path: JSON file holding per-feed ETag/Last-Modified and cached entries.
+        max_workers: Maximum number of feeds fetched at once.
+        timeout: Per-request timeout in seconds.
+
+    Returns:
+        dict: url -> {"entries": [...], "not_modified": bool}
+    """
+    feed_urls = list(dict.fromkeys(feed_urls))
+    if not feed_urls:
+        return {}
+    state = load_state(state_path)
+
+    def fetch(url):
+        feed_state = state.get(url, {})
+        try:
+            return _fetch_one(url, feed_state, timeout)
+        except Exception as e:
+            print(f"Error fetching {url}: {e}")
+            return feed_state, feed_state.get("entries", []), False
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(feed_urls))) as pool:
+        fetched = list(pool.map(fetch, feed_urls))
+
+    results = {}
+    for url, (feed_state, entries, not_modified) in zip(feed_urls, fetched):
+        if feed_state:
+            state[url] = {k: v for k, v in feed_state.items() if k != "seen"}  # drop legacy seen IDs
+        results[url] = {"entries": entries, "not_modified": not_modified}
+    save_state(state, state_path)
+    return results
@@ -1,42 +1,46 @@
-import feedparser
-import requests
-from bs4 import BeautifulSoup
-from collections import Counter
-import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import lxml.html
+from feeds import fetch_feeds, get_session
+from trend_terms import emerging_terms
 
 def fetch_articles(feed_urls, limit=5):
+    """Fetch all feeds concurrently; unchanged feeds are served from the local feed cache."""
     all_articles = []
-    for name, url in feed_urls.items():
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:limit]:
-                article = {
-                    "title": entry.title,
-                    "link": entry.link,
-                    "summary": entry.get("summary", "No summary"),
-                    "published": entry.get("published", "No date")
-                }
-                all_articles.append(article)
-        except Exception as e:
-            print(f"Error parsing {url}: {e}")
+    results = fetch_feeds(feed_urls.values())
+    for url in feed_urls.values():
+        result = results.get(url, {})
+        entries = result.get("entries", [])
+        for entry in entries[:limit]:
+            article = {
+                "title": entry["title"],
+                "link": entry["link"],
+                "summary": entry["summary"] or "No summary",
+                "published": entry["published"] or "No date",
+                "timestamp": entry.get("timestamp")
+            }
+            all_articles.append(article)
     return all_articles
 
 
-def fetch_trending_repos(language=None, since="daily"):
-    base_url = "https://github.com/trending"
-    url = f"{base_url}/{language or ''}?since={since}"
-    headers = {"User-Agent": "Mozilla/5.0"}
+# Trending pages change slowly; repeated UI clicks within the TTL are served from memory.
+TRENDING_CACHE_TTL = 300  # seconds
+_trending_cache = {}
+_trending_cache_lock = threading.Lock()
 
-    res = requests.get(url, headers=headers)
-    soup = BeautifulSoup(res.text, "html.parser")
-    repo_elements = soup.select("article.Box-row")
 
+def parse_trending_page(html):
+    """Extract repos from a GitHub trending page with lxml."""
+    root = lxml.html.fromstring(html)
     trending = []
-    for repo in repo_elements:
-        title = repo.h2.get_text(strip=True).replace(" ", "")
-        description_tag = repo.find("p")
-        description = description_tag.get_text(strip=True) if description_tag else "No description"
-        stars = repo.select_one("a[href$='/stargazers']").get_text(strip=True)
+    for repo in root.xpath("//article[contains(concat(' ', normalize-space(@class), ' '), ' Box-row ')]"):
+        title = "".join(repo.xpath("string(.//h2)").split())
+        description_tag = repo.xpath(".//p")
+        description = description_tag[0].text_content().strip() if description_tag else "No description"
+        stars_tag = repo.xpath(".//a[contains(@href, '/stargazers')]")
+        stars = stars_tag[0].text_content().strip() if stars_tag else "0"
         repo_url = f"https://github.com/{title}"
         trending.append({
             "name": title,
@@ -44,13 +48,43 @@ def fetch_trending_repos(language=None, since="daily"):
             "stars": stars,
             "url": repo_url
         })
+    return trending
+
 
+def fetch_trending_repos(language=None, since="daily"):
+    key = (language or "", since)
+    with _trending_cache_lock:
+        cached = _trending_cache.get(key)
+    if cached and time.monotonic() - cached[0] < TRENDING_CACHE_TTL:
+        return cached[1]
+
+    base_url = "https://github.com/trending"
+    url = f"{base_url}/{language or ''}?since={since}"
+    res = get_session().get(url, timeout=15)
+    res.raise_for_status()
+    trending = parse_trending_page(res.content)
+
+    with _trending_cache_lock:
+        _trending_cache[key] = (time.monotonic(), trending)
     return trending
 
 
-def analyze_trends(items):
-    """Dummy trend analyzer: count word frequencies in titles."""
-    text = " ".join(item["title"] for item in items)
-    words = re.findall(r'\b\w{4,}\b', text.lower())  # 4+ letter words
-    common = Counter(words).most_common(10)
-    return common
+def fetch_trending_repos_many(combinations, max_workers=4):
+    """
+    Fetch several (language, since) trending pages concurrently.
+    Returns a dict mapping each (language, since) pair to its repos.
+    """
+    combinations = list(dict.fromkeys(combinations))
+    if not combinations:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(combinations))) as pool:
+        results = pool.map(lambda combo: fetch_trending_repos(*combo), combinations)
+        return dict(zip(combinations, results))
+
+
+def analyze_trends(items, top_k=10, window_hours=24, baseline_windows=7):
+    """
+    Rank emerging terms (words and two-word phrases) in item titles by their burst
+    in the latest time window over a rolling baseline. See trend_terms.emerging_terms.
+    """
+    return emerging_terms(items, top_k=top_k, window_hours=window_hours, baseline_windows=baseline_windows)
@@ -1,17 +1,21 @@
 
 import gradio as gr
 from sources import RSS_FEEDS
-from fetch import fetch_articles, fetch_trending_repos, analyze_trends
+from fetch import fetch_articles, fetch_trending_repos_many, analyze_trends
 from analyze import cluster_items
 
-def get_combined_feed(source_choice, selected_news_sites):
+GITHUB_LANGUAGES = ["python", "javascript", "typescript", "rust", "go"]
+
+def get_combined_feed(source_choice, selected_news_sites, selected_languages):
     feed_items = []
 
     if "News" in source_choice and selected_news_sites:
         selected_feeds = {name: url for name, url in RSS_FEEDS.items() if name in selected_news_sites}
         feed_items += fetch_articles(selected_feeds, limit=6)
     
-    if "GitHub" in source_choice:
+    if "GitHub" in source_choice and selected_languages:
+        # One trending page per language, fetched concurrently (and cached for a few minutes)
+        trending = fetch_trending_repos_many([(language, "daily") for language in selected_languages])
         feed_items += [
             {
                 "title": repo["name"],
@@ -19,7 +23,8 @@ def get_combined_feed(source_choice, selected_news_sites):
                 "summary": repo["description"],
                 "published": f"{repo['stars']} stars"
             }
-            for repo in fetch_trending_repos(language="python", since="daily")[:5]
+            for repos in trending.values()
+            for repo in repos[:5]
         ]
     
     feed_text = "\n\n".join([f"🔹 {item['title']} ({item['published']})\n{item['link']}" for item in feed_items])
@@ -34,12 +39,15 @@ with gr.Blocks() as demo:
         with gr.Column(scale=1):
             source_selector = gr.CheckboxGroup(["News", "GitHub"], value=["News"], label="Select Sources")
             news_site_selector = gr.CheckboxGroup(list(RSS_FEEDS.keys()), value=["BBC", "Wired"], label="News Sites")
+            language_selector = gr.CheckboxGroup(GITHUB_LANGUAGES, value=["python"], label="GitHub Languages")
         with gr.Column(scale=2):
             feed_output = gr.Textbox(label="Aggregated Feed", lines=20)
         with gr.Column(scale=2):
             trend_output = gr.Textbox(label="Top Trends", lines=20)
 
-    source_selector.change(fn=get_combined_feed, inputs=[source_selector, news_site_selector], outputs=[feed_output, trend_output])
-    news_site_selector.change(fn=get_combined_feed, inputs=[source_selector, news_site_selector], outputs=[feed_output, trend_output])
+    inputs = [source_selector, news_site_selector, language_selector]
+    source_selector.change(fn=get_combined_feed, inputs=inputs, outputs=[feed_output, trend_output])
+    news_site_selector.change(fn=get_combined_feed, inputs=inputs, outputs=[feed_output, trend_output])
+    language_selector.change(fn=get_combined_feed, inputs=inputs, outputs=[feed_output, trend_output])
 
 demo.launch()
@@ -0,0 +1,86 @@
+"""
+Benchmark building the knowledge-graph figure with one trace and one arrow
+annotation per edge (the previous renderer) against graph_render's batched,
+level-of-detail renderer. Layout is excluded: both get the same random positions.
+
+    python benchmark_render.py                  # 5k nodes, 2 edges per node
+    python benchmark_render.py --nodes 500      # small enough to include the per-edge renderer
+
+fig.add_annotation revalidates every existing annotation, so the per-edge
+renderer grows quadratically (about 6 minutes for 1k edges) and is only run
+for graphs up to --old-max-edges.
+"""
+import sys
+import time
+import random
+import argparse
+
+import networkx as nx
+import plotly.graph_objects as go
+
+from graph_render import render_knowledge_graph
+
+
+def random_graph(num_nodes, edges_per_node, seed=0):
+    """Directed graph with preferential-attachment degrees, weighted edges and random positions."""
+    rng = random.Random(seed)
+    undirected = nx.barabasi_albert_graph(num_nodes, edges_per_node, seed=seed)
+    G = nx.DiGraph()
+    for u, v in undirected.edges():
+        if rng.random() < 0.5:
+            u, v = v, u
+        G.add_edge(f"Entity {u}", f"Entity {v}", weight=rng.randint(1, 20), relation_types=["RELATED_TO"])
+    pos = {node: (rng.random(), rng.random()) for node in G.nodes()}
+    return G, pos
+
+
+def render_per_edge(G, pos):
+    """The previous renderer: one Scatter and one annotation per edge."""
+    node_trace = go.Scatter(
+        x=[pos[n][0] for n in G.nodes()],
+        y=[pos[n][1] for n in G.nodes()],
+        mode='markers+text',
+        text=list(G.nodes()),
+        hoverinfo='text',
+    )
+    edge_traces = [
+        go.Scatter(x=[pos[u][0], pos[v][0]], y=[pos[u][1], pos[v][1]], mode='lines', hoverinfo='none')
+        for u, v in G.edges()
+    ]
+    fig = go.Figure(data=edge_traces + [node_trace])
+    for u, v in G.edges():
+        fig.add_annotation(x=pos[v][0], y=pos[v][1], ax=pos[u][0], ay=pos[u][1],
+                           xref='x', yref='y', axref='x', ayref='y', showarrow=True, arrowhead=3, text="")
+    return fig
+
+
+def measure(name, render):
+    start = time.perf_counter()
+    fig = render()
+    built = time.perf_counter() - start
+    payload = len(fig.to_json())
+    total = time.perf_counter() - start
+    print(f"{name:>28}: build {built:7.2f}s, build+serialize {total:7.2f}s, "
+          f"{len(fig.data)} traces, {len(fig.layout.annotations)} annotations, {payload / 1e6:6.2f} MB JSON")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--nodes", type=int, default=5000)
+    parser.add_argument("--edges-per-node", type=int, default=2)
+    parser.add_argument("--old-max-edges", type=int, default=1000,
+                        help="only run the (slow) per-edge renderer up to this many edges")
+    args = parser.parse_args()
+
+    G, pos = random_graph(args.nodes, args.edges_per_node)
+    print(f"Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+    if G.number_of_edges() <= args.old_max_edges:
+        measure("per-edge traces", lambda: render_per_edge(G, pos))
+    else:
+        print(f"Skipping the per-edge renderer (more than {args.old_max_edges} edges)")
+    measure("batched, all edges", lambda: render_knowledge_graph(G, pos=pos, max_edges=sys.maxsize))
+    measure("batched, level of detail", lambda: render_knowledge_graph(G, pos=pos))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import re
+import bisect
+import unicodedata
+from collections import Counter, defaultdict
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+SIMILARITY_THRESHOLD = 0.8
+PREFIX_LENGTH = 4
+MAX_BLOCK_SIZE = 200      # larger blocks are only compared within a sorted window
+BLOCK_WINDOW = 25         # neighbours on each side, in key order, for oversized blocks
+MIN_KEY_LENGTH = 4        # shorter keys ("ai", "us") only ever merge on an exact key match
+
+# Trailing legal-form tokens and a leading article do not distinguish entities.
+_LEGAL_SUFFIXES = {
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited",
+    "llc", "plc", "gmbh", "ag", "sa", "group", "holdings",
+}
+_SOUNDEX = str.maketrans("bfpvcgjkqsxzdtlmnr", "111122222222334556")
+_vectorizer = HashingVectorizer(
+    analyzer="char_wb", ngram_range=(2, 3), n_features=2 ** 18, alternate_sign=False, norm="l2"
+)
+
+
+def canonical_tokens(name):
+    """Lowercased, accent- and punctuation-free tokens without legal suffixes."""
+    text = unicodedata.normalize("NFKD", str(name))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    tokens = re.sub(r"[^\w\s]|_", " ", text).split()
+    while len(tokens) > 1 and tokens[-1] in _LEGAL_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens.pop(0)
+    return tokens
+
+
+def canonical_key(name):
+    """Spacing-insensitive key: "OpenAI", "Open AI" and "OpenAI Inc." all become "openai"."""
+    return "".join(canonical_tokens(name))
+
+
+def soundex(key):
+    letters = [c for c in key if "a" <= c <= "z"]
+    if not letters:
+        return ""
+    codes = "".join(letters).translate(_SOUNDEX)
+    code, previous = letters[0].upper(), codes[0]
+    for digit, letter in zip(codes[1:], letters[1:]):
+        if digit.isdigit() and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def block_keys(key):
+    """A key lands in a prefix block and a phonetic block; only keys sharing a block are compared."""
+    return ["p:" + key[:PREFIX_LENGTH], "s:" + soundex(key)]
+
+
+def char_ngram_embeddings(texts):
+    """L2-normalized hashed character 2-3-gram vectors (scipy sparse, one row per text)."""
+    return _vectorizer.transform(texts)
+
+
+def _row_similarity(A, B):
+    if sparse.issparse(A):
+        return np.asarray(A.multiply(B).sum(axis=1)).ravel()
+    return np.einsum("ij,ij->i", A, B)
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+
+class EntityResolver:
+    """
+    Incrementally maps entity name variants onto one canonical name.
+
+    Names are first matched on canonical_key. Keys not seen before are
+    compared, by embedding cosine similarity, only with keys sharing a prefix
+    or Soundex block (oversized blocks only within a window of neighbours in
+    key order), so the number of comparisons grows linearly with the number
+    of entities. Names whose digits differ ("GPT-4" / "GPT-5") never merge.
+
+    `embed` maps a list of strings to L2-normalized vectors (sparse or dense
+    rows); hashed character n-grams are used by default, a sentence embedding
+    model can be passed instead.
+    """
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, embed=char_ngram_embeddings):
+        self.threshold = threshold
+        self.embed = embed
+        self.canonical = {}                 # key -> canonical name
+        self.text = {}                      # key -> text that gets embedded
+        self.blocks = defaultdict(list)     # block -> sorted keys
+        self.aliases = {}                   # raw name -> canonical name
+        self.stats = Counter()
+
+    def _register(self, key, name, text):
+        self.canonical[key] = name
+        self.text[key] = text
+        for block in block_keys(key):
+            bisect.insort(self.blocks[block], key)
+
+    def add_entities(self, names):
+        """Register existing canonical entities (e.g. loaded from a store) without comparing them."""
+        for name in names:
+            key = canonical_key(name)
+            if key and key not in self.canonical:
+                self._register(key, name, " ".join(canonical_tokens(name)))
+
+    def _candidates(self, block, key):
+        members = self.blocks.get(block, ())
+        if len(members) <= MAX_BLOCK_SIZE:
+            return members
+        self.stats["oversized_blocks"] += 1
+        position = bisect.bisect_left(members, key)
+        return members[max(0, position - BLOCK_WINDOW):position + BLOCK_WINDOW]
+
+    def _candidate_pairs(self, new_keys):
+        pairs = set()
+        new_blocks = defaultdict(list)
+        for key in new_keys:
+            for block in block_keys(key):
+                for other in self._candidates(block, key):
+                    pairs.add((key, other))
+                new_blocks[block].append(key)
+        for block, keys in new_blocks.items():
+            keys.sort()
+            for i, key in enumerate(keys):
+                for other in keys[i + 1:i + 1 + (len(keys) if len(keys) <= MAX_BLOCK_SIZE else BLOCK_WINDOW)]:
+                    pairs.add((key, other))
+        return [
+            (a, b) for a, b in pairs
+            if len(a) >= MIN_KEY_LENGTH and len(b) >= MIN_KEY_LENGTH
+            and re.sub(r"\D", "", a) == re.sub(r"\D", "", b)
+        ]
+
+    def resolve(self, names):
+        """
+        Return {name: canonical name} for every non-empty name in `names`,
+        merging new variants into known entities or into each other.
+        """
+        counts = Counter(str(n).strip() for n in names if n and str(n).strip())
+        self.stats["names"] += sum(counts.values())
+        result, new_names = {}, defaultdict(list)
+        for name in counts:
+            if name in self.aliases:
+                result[name] = self.aliases[name]
+                continue
+            key = canonical_key(name)
+            if not key:
+                result[name] = name
+            elif key in self.canonical:
+                result[name] = self.canonical[key]
+                if result[name] != name:
+                    self.stats["merged_by_key"] += 1
+            else:
+                new_names[key].append(name)
+
+        if new_names:
+            for key, key_names in new_names.items():
+                self.text[key] = " ".join(canonical_tokens(key_names[0]))
+            pairs = self._candidate_pairs(list(new_names))
+            self.stats["comparisons"] += len(pairs)
+            merged = self._merge_similar(pairs, new_names, counts)
+            self.stats["merged_by_similarity"] += merged
+            # Variants sharing a new key are merges by key as well.
+            self.stats["merged_by_key"] += sum(len(v) - 1 for v in new_names.values())
+            for key, key_names in new_names.items():
+                for name in key_names:
+                    result[name] = self.canonical[key]
+
+        self.aliases.update(result)
+        return result
+
+    def _merge_similar(self, pairs, new_names, counts):
+        """Union new keys with similar keys, best pairs first; never joins two known entities."""
+        sets = _DisjointSet()
+        if pairs:
+            keys = list(dict.fromkeys(k for pair in pairs for k in pair))
+            index = {k: i for i, k in enumerate(keys)}
+            vectors = self.embed([self.text[k] for k in keys])
+            left = [index[a] for a, _ in pairs]
+            right = [index[b] for _, b in pairs]
+            similarity = _row_similarity(vectors[left], vectors[right])
+            known_roots = {k for k in keys if k in self.canonical}
+            for i in np.argsort(-similarity, kind="stable"):
+                if similarity[i] < self.threshold:
+                    break
+                a, b = sets.find(pairs[i][0]), sets.find(pairs[i][1])
+                if a == b or (a in known_roots and b in known_roots):
+                    continue
+                if b in known_roots:
+                    a, b = b, a
+                sets.parent[b] = a
+                known_roots.discard(b)
+
+        components = defaultdict(list)
+        for key in new_names:
+            components[sets.find(key)].append(key)
+        merged = 0
+        for root, keys in components.items():
+            if root in self.canonical:
+                name = self.canonical[root]
+                merged += len(keys)
+            else:
+                # The most frequent spelling names a new entity; on ties the longer, more
+                # complete form ("Google" over the typo "Gogle"), then the first seen.
+                spellings = [n for k in keys for n in new_names[k]]
+                name = min(spellings, key=lambda n: (-counts[n], -len(n)))
+                merged += len(keys) - 1
+            for key in keys:
+                self._register(key, name, self.text[key])
+        return merged
+
+    def merge_stats(self):
+        """Counts of names seen, distinct names, canonical entities and merges."""
+        entities = len(set(self.canonical.values()))
+        distinct = len(self.aliases)
+        return {
+            "names": self.stats["names"],
+            "distinct_names": distinct,
+            "entities": entities,
+            "merged_by_key": self.stats["merged_by_key"],
+            "merged_by_similarity": self.stats["merged_by_similarity"],
+            "comparisons": self.stats["comparisons"],
+            "oversized_blocks": self.stats["oversized_blocks"],
+        }
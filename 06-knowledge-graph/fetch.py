@@ -1,30 +1,30 @@
-import feedparser
 import requests
 from bs4 import BeautifulSoup
-from collections import Counter
-import re
+from feeds import fetch_feeds
+from trend_terms import emerging_terms
 
 def fetch_articles(feed_urls, limit=5):
+    """Fetch all feeds concurrently; unchanged feeds are served from the local feed cache."""
     all_articles = []
-    for name, url in feed_urls.items():
-        try:
-            feed = feedparser.parse(url)
-            for entry in feed.entries[:limit]:
-                article = {
-                    "title": entry.title,
-                    "link": entry.link,
-                    "summary": entry.get("summary", "No summary"),
-                    "published": entry.get("published", "No date")
-                }
-                all_articles.append(article)
-        except Exception as e:
-            print(f"Error parsing {url}: {e}")
+    results = fetch_feeds(feed_urls.values())
+    for url in feed_urls.values():
+        result = results.get(url, {})
+        entries = result.get("entries", [])
+        for entry in entries[:limit]:
+            article = {
+                "title": entry["title"],
+                "link": entry["link"],
+                "summary": entry["summary"] or "No summary",
+                "published": entry["published"] or "No date",
+                "timestamp": entry.get("timestamp")
+            }
+            all_articles.append(article)
     return all_articles
 
 
-def analyze_trends(items):
-    """Dummy trend analyzer: count word frequencies in titles."""
-    text = " ".join(item["title"] for item in items)
-    words = re.findall(r'\b\w{4,}\b', text.lower())  # 4+ letter words
-    common = Counter(words).most_common(10)
-    return common
+def analyze_trends(items, top_k=10, window_hours=24, baseline_windows=7):
+    """
+    Rank emerging terms (words and two-word phrases) in item titles by their burst
+    in the latest time window over a rolling baseline. See trend_terms.emerging_terms.
+    """
+    return emerging_terms(items, top_k=top_k, window_hours=window_hours, baseline_windows=baseline_windows)
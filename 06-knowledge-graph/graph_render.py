@@ -0,0 +1,133 @@
+import numpy as np
+import plotly.graph_objects as go
+
+from graph_layout import compute_layout
+
+# Level of detail: larger graphs are cut down to their heaviest edges.
+MAX_EDGES = 1500
+MAX_LABELS = 150          # only the highest-degree nodes get a text label
+MAX_HOVER_LINES = 20
+WEBGL_EDGE_THRESHOLD = 1000
+ARROW_POSITION = 0.85     # arrowheads sit this far along each edge, short of the target node
+
+
+def select_level_of_detail(G, max_edges=MAX_EDGES, min_degree=0):
+    """
+    Keep the `max_edges` heaviest edges, then drop nodes whose degree in the
+    reduced graph is below `min_degree`. Small graphs are returned unchanged.
+    """
+    if G.number_of_edges() <= max_edges and min_degree <= 0:
+        return G
+    edges = sorted(G.edges(data=True), key=lambda e: -e[2].get("weight", 1))[:max_edges]
+    H = G.__class__()
+    H.add_nodes_from(G.nodes(data=True))
+    H.add_edges_from(edges)
+    if min_degree > 0:
+        H.remove_nodes_from([n for n, d in H.degree() if d < min_degree])
+    return H
+
+
+def _node_hover(G, node):
+    # List outgoing and incoming connection details.
+    details = []
+    for u, v, data in G.out_edges(node, data=True):
+        rels = ", ".join(data.get("relation_types", []))
+        details.append(f"Out: {node} - {rels} -> {v}")
+    for u, v, data in G.in_edges(node, data=True):
+        rels = ", ".join(data.get("relation_types", []))
+        details.append(f"In: {u} - {rels} -> {node}")
+    if not details:
+        return node  # Fallback if there are no connections.
+    if len(details) > MAX_HOVER_LINES:
+        details = details[:MAX_HOVER_LINES] + [f"... {len(details) - MAX_HOVER_LINES} more"]
+    return "<br>".join(details)
+
+
+def render_knowledge_graph(G, pos=None, max_edges=MAX_EDGES, min_degree=0):
+    """
+    Convert a directed knowledge graph to an interactive Plotly figure.
+
+    Steps:
+      1. Reduce large graphs to their heaviest edges (level of detail).
+      2. Compute a layout unless positions are given (see graph_layout).
+      3. Create the node trace with hover text showing connections.
+      4. Draw all edges as a single None-separated line trace.
+      5. Draw arrowheads as one marker layer, rotated along each edge.
+      6. Build the Plotly figure (WebGL traces for large graphs).
+    """
+    # 1. Level of detail.
+    G = select_level_of_detail(G, max_edges=max_edges, min_degree=min_degree)
+    scatter = go.Scattergl if G.number_of_edges() > WEBGL_EDGE_THRESHOLD else go.Scatter
+
+    # 2. Compute positions unless the caller has a (cached) layout.
+    if pos is None:
+        pos = compute_layout(G)
+    nodes = list(G.nodes())
+    index = {node: i for i, node in enumerate(nodes)}
+    xy = np.array([pos[node] for node in nodes], dtype=float).reshape(-1, 2)
+
+    # 3. Node trace; only the best-connected nodes are labelled.
+    labelled = set(sorted(nodes, key=lambda n: -G.degree(n))[:MAX_LABELS])
+    node_trace = scatter(
+        x=xy[:, 0],
+        y=xy[:, 1],
+        mode='markers+text',
+        text=[node if node in labelled else "" for node in nodes],
+        textposition="top center",
+        hoverinfo='text',
+        hovertext=[_node_hover(G, node) for node in nodes],
+        marker=dict(
+            size=10,
+            color='#1f78b4'
+        )
+    )
+
+    # 4. One trace for all edges: x0, x1, None, x0, x1, None, ...
+    edge_index = np.array([(index[u], index[v]) for u, v in G.edges()], dtype=int).reshape(-1, 2)
+    start, end = xy[edge_index[:, 0]], xy[edge_index[:, 1]]
+    edge_x = np.full(3 * len(edge_index), np.nan)
+    edge_y = np.full(3 * len(edge_index), np.nan)
+    edge_x[0::3], edge_x[1::3] = start[:, 0], end[:, 0]
+    edge_y[0::3], edge_y[1::3] = start[:, 1], end[:, 1]
+    edge_trace = scatter(
+        x=edge_x,
+        y=edge_y,
+        mode='lines',
+        line=dict(width=1, color='#888'),
+        hoverinfo='none',
+        connectgaps=False
+    )
+
+    # 5. Arrowheads: marker angles are degrees clockwise from "up".
+    delta = end - start
+    tips = start + ARROW_POSITION * delta
+    arrow_trace = scatter(
+        x=tips[:, 0],
+        y=tips[:, 1],
+        mode='markers',
+        marker=dict(
+            symbol='arrow',
+            size=9,
+            color='#888',
+            angle=90 - np.degrees(np.arctan2(delta[:, 1], delta[:, 0]))
+        ),
+        hoverinfo='none'
+    )
+
+    # 6. Build the interactive Plotly figure.
+    fig = go.Figure(
+        data=[edge_trace, arrow_trace, node_trace],
+        layout=go.Layout(
+            title='<br>Interactive Knowledge Graph (LLM-derived)',
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=20, l=5, r=5, t=40),
+            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
+            width=1200,   # wider figure
+            height=800,   # taller figure
+            dragmode='pan'
+        )
+    )
+
+    return fig
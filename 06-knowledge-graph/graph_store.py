@@ -0,0 +1,214 @@
+import os
+import re
+import time
+import sqlite3
+
+import networkx as nx
+
+from graph_layout import compute_layout
+from entity_resolution import EntityResolver
+
+GRAPH_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "knowledge_graph.sqlite")
+
+
+def normalize_entity_id(name):
+    """Case- and whitespace-insensitive entity key."""
+    return re.sub(r"\s+", " ", str(name)).strip().casefold()
+
+
+class GraphStore:
+    """
+    SQLite-backed knowledge graph that accumulates across runs.
+
+    Entity names are canonicalized with an EntityResolver (seeded with the
+    stored entities) and deduplicated by normalized ID; every other spelling is
+    kept in the aliases table. An entity's `mentions` counts the chunks it
+    appears in (as a node or a relation endpoint). Each (source, target, type)
+    relation keeps a weight that grows every time it is extracted again. Each
+    chunk is merged only once, so re-rendering cached chunks does not inflate
+    weights. Layout positions are stored per entity so the rendered graph stays
+    stable as it grows.
+    """
+    def __init__(self, path=GRAPH_DB_PATH):
+        # Gradio may advance the streaming generator that owns a store on
+        # different worker threads (one step at a time, never concurrently).
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                type TEXT,
+                mentions INTEGER NOT NULL DEFAULT 0,
+                first_seen REAL,
+                last_seen REAL
+            );
+            CREATE TABLE IF NOT EXISTS relations (
+                source TEXT NOT NULL,
+                target TEXT NOT NULL,
+                type TEXT NOT NULL,
+                weight INTEGER NOT NULL DEFAULT 0,
+                first_seen REAL,
+                last_seen REAL,
+                PRIMARY KEY (source, target, type)
+            );
+            CREATE INDEX IF NOT EXISTS idx_relations_target ON relations(target);
+            CREATE INDEX IF NOT EXISTS idx_relations_last_seen ON relations(last_seen);
+            CREATE INDEX IF NOT EXISTS idx_relations_weight ON relations(weight);
+            CREATE TABLE IF NOT EXISTS merged_chunks (
+                key TEXT PRIMARY KEY,
+                merged_at REAL
+            );
+            CREATE TABLE IF NOT EXISTS aliases (
+                alias TEXT PRIMARY KEY,
+                entity_id TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS positions (
+                id TEXT PRIMARY KEY,
+                x REAL NOT NULL,
+                y REAL NOT NULL
+            );
+        """)
+        self.db.commit()
+        self.resolver = EntityResolver()
+        self.resolver.add_entities(name for (name,) in self.db.execute("SELECT name FROM entities"))
+
+    def close(self):
+        self.db.close()
+
+    def _upsert_entity(self, name, entity_type, now, canonical, mentioned):
+        """Upsert an entity; `mentions` grows once per chunk (`mentioned`: IDs already counted for it)."""
+        alias_id = normalize_entity_id(name)
+        name = canonical.get(str(name).strip(), name)
+        entity_id = normalize_entity_id(name)
+        if alias_id != entity_id:
+            self.db.execute("INSERT OR REPLACE INTO aliases VALUES (?, ?)", (alias_id, entity_id))
+        mention = 0 if entity_id in mentioned else 1
+        mentioned.add(entity_id)
+        self.db.execute(
+            """INSERT INTO entities (id, name, type, mentions, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET mentions = mentions + excluded.mentions, last_seen = excluded.last_seen,
+                   type = COALESCE(entities.type, excluded.type)""",
+            (entity_id, str(name).strip(), entity_type, mention, now, now),
+        )
+        return entity_id
+
+    def merge_graph_document(self, chunk_key, gdoc):
+        """Merge one extracted graph document (dict); returns False if the chunk was merged before."""
+        now = time.time()
+        with self.db:
+            cur = self.db.execute("INSERT OR IGNORE INTO merged_chunks VALUES (?, ?)", (chunk_key, now))
+            if not cur.rowcount:
+                return False
+            canonical = self.resolver.resolve(
+                [node.get("id") or node.get("name") for node in gdoc.get("nodes", [])]
+                + [rel.get(end, {}).get("id") for rel in gdoc.get("relationships", []) for end in ("source", "target")]
+            )
+            mentioned = set()
+            for node in gdoc.get("nodes", []):
+                name = node.get("id") or node.get("name")
+                if name:
+                    self._upsert_entity(name, node.get("type"), now, canonical, mentioned)
+            for rel in gdoc.get("relationships", []):
+                source = rel.get("source", {})
+                target = rel.get("target", {})
+                if not source.get("id") or not target.get("id"):
+                    continue
+                source_id = self._upsert_entity(source["id"], source.get("type"), now, canonical, mentioned)
+                target_id = self._upsert_entity(target["id"], target.get("type"), now, canonical, mentioned)
+                self.db.execute(
+                    """INSERT INTO relations (source, target, type, weight, first_seen, last_seen) VALUES (?, ?, ?, 1, ?, ?)
+                       ON CONFLICT(source, target, type) DO UPDATE SET weight = weight + 1, last_seen = excluded.last_seen""",
+                    (source_id, target_id, rel.get("type", ""), now, now),
+                )
+        return True
+
+    def _to_networkx(self, relation_rows, entity_ids):
+        G = nx.DiGraph()
+        names = {}
+        for start in range(0, len(entity_ids), 500):
+            batch = entity_ids[start:start + 500]
+            rows = self.db.execute(
+                f"SELECT id, name FROM entities WHERE id IN ({','.join('?' * len(batch))})", batch
+            )
+            names.update(rows)
+        for entity_id in entity_ids:
+            G.add_node(names.get(entity_id, entity_id))
+        for source, target, rel_type, weight in relation_rows:
+            u, v = names.get(source, source), names.get(target, target)
+            if G.has_edge(u, v):
+                G[u][v]["weight"] += weight
+                if rel_type not in G[u][v]["relation_types"]:
+                    G[u][v]["relation_types"].append(rel_type)
+            else:
+                G.add_edge(u, v, weight=weight, relation_types=[rel_type])
+        return G
+
+    def neighborhood(self, query="", depth=1, since=None, max_edges=2000):
+        """
+        Return the graph around entities whose normalized ID or alias contains
+        `query`, expanded `depth` hops in both directions, as a NetworkX
+        DiGraph. With no query, the `max_edges` heaviest relations are
+        returned. `since` (epoch seconds) limits relations to those seen since then.
+        """
+        since = since or 0
+        query = normalize_entity_id(query)
+        if not query:
+            rows = self.db.execute(
+                "SELECT source, target, type, weight FROM relations WHERE last_seen >= ? ORDER BY weight DESC LIMIT ?",
+                (since, max_edges),
+            ).fetchall()
+            entity_ids = sorted({r[0] for r in rows} | {r[1] for r in rows})
+            return self._to_networkx(rows, entity_ids)
+
+        frontier = {r[0] for r in self.db.execute(
+            "SELECT id FROM entities WHERE id LIKE ? UNION SELECT entity_id FROM aliases WHERE alias LIKE ?",
+            (f"%{query}%", f"%{query}%"),
+        )}
+        seen, rows = set(frontier), {}
+        for _ in range(depth):
+            if not frontier or len(rows) >= max_edges:
+                break
+            batch = sorted(frontier)
+            next_frontier = set()
+            for start in range(0, len(batch), 400):
+                ids = batch[start:start + 400]
+                marks = ",".join("?" * len(ids))
+                for row in self.db.execute(
+                    f"""SELECT source, target, type, weight FROM relations
+                        WHERE (source IN ({marks}) OR target IN ({marks})) AND last_seen >= ?""",
+                    ids + ids + [since],
+                ):
+                    rows[row[:3]] = row
+                    next_frontier.update(row[:2])
+            frontier = next_frontier - seen
+            seen |= next_frontier
+        relation_rows = sorted(rows.values(), key=lambda r: -r[3])[:max_edges]
+        return self._to_networkx(relation_rows, sorted(seen))
+
+    def load_positions(self, names):
+        """Stored layout positions {name: (x, y)} for the given entity names."""
+        ids = {normalize_entity_id(name): name for name in names}
+        id_list = list(ids)
+        positions = {}
+        for start in range(0, len(id_list), 500):
+            batch = id_list[start:start + 500]
+            for entity_id, x, y in self.db.execute(
+                f"SELECT id, x, y FROM positions WHERE id IN ({','.join('?' * len(batch))})", batch
+            ):
+                positions[ids[entity_id]] = (x, y)
+        return positions
+
+    def save_positions(self, pos):
+        with self.db:
+            self.db.executemany(
+                "INSERT INTO positions (id, x, y) VALUES (?, ?, ?) ON CONFLICT(id) DO UPDATE SET x = excluded.x, y = excluded.y",
+                [(normalize_entity_id(name), float(x), float(y)) for name, (x, y) in pos.items()],
+            )
+
+    def layout(self, G):
+        """Lay out G warm-started from the stored positions and store the new ones."""
+        cached = self.load_positions(G.nodes())
+        pos = compute_layout(G, cached)
+        self.save_positions({node: xy for node, xy in pos.items() if node not in cached})
+        return pos
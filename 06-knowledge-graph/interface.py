@@ -1,10 +1,19 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import gradio as gr
 import networkx as nx
 import spacy
-import plotly.graph_objects as go
 
 from sources import RSS_FEEDS
 from fetch import fetch_articles
+from graph_store import GraphStore
+from entity_resolution import EntityResolver
+from graph_render import render_knowledge_graph
 
 # Imports for the LLM knowledge graph transformer
 from langchain.schema import Document
@@ -13,54 +22,105 @@ from langchain_openai import ChatOpenAI
 from langchain_experimental.graph_transformers import LLMGraphTransformer
 
 
-def build_interactive_knowledge_graph(feed_items):
+# Per-chunk extraction results, keyed by a hash of the chunk text.
+EXTRACTION_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".extraction_cache")
+EXTRACTION_WORKERS = 8
+
+
+def split_feed_items(feed_items):
     """
-    Build an interactive knowledge graph from aggregated RSS feed text using an LLM.
-    
-    Steps:
-      1. Combine the title and summary of all feed items.
-      2. Create a Document and split it into chunks.
-      3. Use ChatOpenAI and LLMGraphTransformer to get graph information.
-      4. Merge nodes and relationships into a directed NetworkX graph.
-      5. Compute a spring layout and convert the graph to a Plotly figure.
-      6. Compute node hover text showing all outgoing/incoming connections.
-      7. Re-add arrow annotations to indicate direction (with no extra text).
-      8. Return the Plotly figure.
+    Split each feed item into 500-char chunks on its own, so an unchanged
+    article always produces the same chunks (and hits the extraction cache).
     """
-    # 1. Combine all feed items into one aggregated text.
-    combined_text = "\n\n".join([f"{item['title']}. {item['summary']}" for item in feed_items])
-    
-    # 2. Create a Document and split it.
-    doc = Document(page_content=combined_text)
     text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-    docs = text_splitter.split_documents([doc])
-    
-    # 3. Initialize the LLM and transformer.
+    docs = [Document(page_content=f"{item['title']}. {item['summary']}") for item in feed_items]
+    return text_splitter.split_documents(docs)
+
+
+def chunk_key(chunk):
+    return hashlib.sha256(chunk.page_content.encode("utf-8")).hexdigest()
+
+
+def _load_cached(path):
+    """Cached graph document at `path`, or None if it is missing or unreadable (e.g. truncated)."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def extract_graph_documents(docs, max_workers=EXTRACTION_WORKERS):
+    """
+    Yield (chunk key, graph document as a dict) for each chunk as soon as it
+    is available: cached chunks first, then LLM extractions in completion order,
+    with at most `max_workers` chunks in flight. Identical chunks (same key)
+    are extracted once.
+    """
+    os.makedirs(EXTRACTION_CACHE_DIR, exist_ok=True)
+    pending = {}
+    for chunk in docs:
+        key = chunk_key(chunk)
+        if key in pending:
+            continue
+        path = os.path.join(EXTRACTION_CACHE_DIR, f"{key}.json")
+        cached = _load_cached(path)
+        if cached is not None:
+            yield key, cached
+        else:
+            pending[key] = (chunk, key, path)
+    if not pending:
+        return
+
     llm = ChatOpenAI(temperature=0, model="gpt-4o")
     llm_transformer = LLMGraphTransformer(llm=llm)
-    graph_documents = llm_transformer.convert_to_graph_documents(docs)
-    
-    # 4. Build a directed NetworkX graph.
-    G = nx.DiGraph()
-    for graph_doc in graph_documents:
-        # Convert the Pydantic model to a dictionary.
-        gdoc = graph_doc.model_dump()
+
+    def extract(chunk, key, path):
+        gdoc = llm_transformer.convert_to_graph_documents([chunk])[0].model_dump(mode="json")
+        # Write-then-rename through a uniquely named temp file, so neither a crash
+        # nor another writer of the same key can leave a truncated cache file.
+        with tempfile.NamedTemporaryFile("w", dir=EXTRACTION_CACHE_DIR, suffix=".tmp", delete=False) as f:
+            json.dump(gdoc, f)
+        os.replace(f.name, path)
+        return key, gdoc
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(extract, chunk, key, path) for chunk, key, path in pending.values()]
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"Error extracting graph from chunk: {e}")
+
+
+def build_graph(graph_documents, G=None, resolver=None):
+    """
+    Merge graph documents (dicts) into a directed NetworkX graph, with entity
+    names canonicalized by `resolver` (a new EntityResolver by default).
+    """
+    G = nx.DiGraph() if G is None else G
+    resolver = resolver or EntityResolver()
+    for gdoc in graph_documents:
         nodes = gdoc.get("nodes", [])
         # In these documents, relationships are stored under "relationships".
         relationships = gdoc.get("relationships", [])
+        canonical = resolver.resolve(
+            [node.get("id") or node.get("name") for node in nodes]
+            + [rel.get(end, {}).get("id") for rel in relationships for end in ("source", "target")]
+        )
         
         # Add nodes.
         for node in nodes:
             node_id = node.get("id") or node.get("name")
             if node_id:
-                G.add_node(node_id)
+                G.add_node(canonical.get(str(node_id).strip(), node_id))
         
         # Add relationships as directed edges.
         for rel in relationships:
             source_obj = rel.get("source", {})
             target_obj = rel.get("target", {})
-            source = source_obj.get("id")
-            target = target_obj.get("id")
+            source = canonical.get(str(source_obj.get("id")).strip(), source_obj.get("id"))
+            target = canonical.get(str(target_obj.get("id")).strip(), target_obj.get("id"))
             rel_type = rel.get("type", "")
             if source and target:
                 if G.has_edge(source, target):
@@ -72,111 +132,65 @@ def build_interactive_knowledge_graph(feed_items):
                     G[source][target]["weight"] += 1
                 else:
                     G.add_edge(source, target, weight=1, relation_types=[rel_type])
+    return G
+
+
+def stream_knowledge_graph(feed_items, query="", update_every=2.0):
+    """
+    Extract chunks concurrently, merge them into the persistent graph store and
+    yield the stored neighborhood of `query` at most every `update_every`
+    seconds while extraction runs, then the final figure.
+    """
+    store = GraphStore()
+    try:
+        last_update = time.monotonic()
+        for key, gdoc in extract_graph_documents(split_feed_items(feed_items)):
+            store.merge_graph_document(key, gdoc)
+            if time.monotonic() - last_update >= update_every:
+                last_update = time.monotonic()
+                yield render_stored_neighborhood(store, query)
+        yield render_stored_neighborhood(store, query)
+    finally:
+        print(f"Entity resolution: {store.resolver.merge_stats()}")
+        store.close()
+
+
+def render_stored_neighborhood(store, query):
+    """Render the stored neighborhood of `query` using (and extending) the stored layout."""
+    G = store.neighborhood(query)
+    return render_knowledge_graph(G, pos=store.layout(G))
+
+
+def render_stored_graph(query):
+    """Render the stored graph around `query` without fetching or extracting anything."""
+    store = GraphStore()
+    try:
+        return render_stored_neighborhood(store, query)
+    finally:
+        store.close()
+
+
+def build_interactive_knowledge_graph(feed_items):
+    """
+    Build an interactive knowledge graph from aggregated RSS feed text using an LLM.
     
-    # 5. Compute positions using a spring layout.
-    pos = nx.spring_layout(G, k=1.2)
-    #pos = nx.kamada_kawai_layout(G)
-    
-    # 6. Prepare node hover text.
-    # For each node, list all outgoing and incoming connection details.
-    node_hover = {}
-    for node in G.nodes():
-        outgoing = []
-        for u, v, data in G.out_edges(node, data=True):
-            rels = ", ".join(data.get("relation_types", []))
-            outgoing.append(f"Out: {node} - {rels} -> {v}")
-        incoming = []
-        for u, v, data in G.in_edges(node, data=True):
-            rels = ", ".join(data.get("relation_types", []))
-            incoming.append(f"In: {u} - {rels} -> {node}")
-        details = outgoing + incoming
-        if details:
-            node_hover[node] = "<br>".join(details)
-        else:
-            node_hover[node] = node  # Fallback if there are no connections.
-    
-    # 7. Create node trace using calculated positions and hover text.
-    node_x = []
-    node_y = []
-    node_text = []         # Displayed text is just the node name.
-    node_hover_list = []   # Custom hover info with connection details.
-    for node in G.nodes():
-        x, y = pos[node]
-        node_x.append(x)
-        node_y.append(y)
-        node_text.append(node)
-        node_hover_list.append(node_hover.get(node, node))
-        
-    node_trace = go.Scatter(
-        x=node_x,
-        y=node_y,
-        mode='markers+text',
-        text=node_text,
-        textposition="top center",
-        hoverinfo='text',
-        hovertext=node_hover_list,
-        marker=dict(
-            size=10,
-            color='#1f78b4'
-        )
-    )
-    
-    # 8. Create edge traces: one trace per edge.
-    edge_traces = []
-    for edge in G.edges(data=True):
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        edge_trace = go.Scatter(
-            x=[x0, x1],
-            y=[y0, y1],
-            mode='lines',
-            line=dict(width=1, color='#888'),
-            hoverinfo='none'
-        )
-        edge_traces.append(edge_trace)
-    
-    # 9. Build the interactive Plotly figure.
-    fig = go.Figure(
-        data=edge_traces + [node_trace],
-        layout=go.Layout(
-            title='<br>Interactive Knowledge Graph (LLM-derived)',
-            showlegend=False,
-            hovermode='closest',
-            margin=dict(b=20, l=5, r=5, t=40),
-            xaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            yaxis=dict(showgrid=False, zeroline=False, showticklabels=False),
-            width=1200,   # wider figure
-            height=800,   # taller figure
-            dragmode='pan'
-        )
-    )
-    
-    # 10. Re-add arrow annotations for each edge (without hover text).
-    for edge in G.edges(data=True):
-        x0, y0 = pos[edge[0]]
-        x1, y1 = pos[edge[1]]
-        fig.add_annotation(
-            x=x1,
-            y=y1,
-            ax=x0,
-            ay=y0,
-            xref='x',
-            yref='y',
-            axref='x',
-            ayref='y',
-            showarrow=True,
-            arrowhead=3,
-            arrowcolor='#888',
-            arrowwidth=2,
-            text="",  # No text; rely on node hover for details.
-        )
-    
-    return fig
+    Steps:
+      1. Split the title and summary of each feed item into chunks.
+      2. Extract graph information from the chunks concurrently with ChatOpenAI and
+         LLMGraphTransformer (cached per chunk).
+      3. Canonicalize entity names and merge nodes and relationships into a
+         directed NetworkX graph.
+      4. Render the graph as a Plotly figure (see render_knowledge_graph).
+    """
+    G = build_graph(gdoc for _, gdoc in extract_graph_documents(split_feed_items(feed_items)))
+    return render_knowledge_graph(G)
 
-def get_combined_feed(source_choice, selected_news_sites):
+
+def get_combined_feed(source_choice, selected_news_sites, query=""):
     """
-    Create an aggregated feed from selected RSS sources
-    and build an interactive Plotly knowledge graph.
+    Create an aggregated feed from selected RSS sources, merge it into the
+    stored knowledge graph and render the graph around `query`, yielding
+    partial graphs as chunks are extracted.
     """
     feed_items = []
     
@@ -188,10 +202,9 @@ def get_combined_feed(source_choice, selected_news_sites):
     # Aggregate feed text.
     feed_text = "\n\n".join([f"🔹 {item['title']} ({item['published']})\n{item['link']}" for item in feed_items])
     
-    # Build an interactive knowledge graph using Plotly.
-    graph_fig = build_interactive_knowledge_graph(feed_items)
-    
-    return feed_text, graph_fig
+    # Stream the interactive knowledge graph as it grows.
+    for graph_fig in stream_knowledge_graph(feed_items, query):
+        yield feed_text, graph_fig
 
 # Define the Gradio interface with a button to trigger processing.
 with gr.Blocks() as demo:
@@ -203,6 +216,9 @@ with gr.Blocks() as demo:
             news_site_selector = gr.CheckboxGroup(
                 list(RSS_FEEDS.keys()), value=["BBC", "Wired"], label="News Sites"
             )
+            query_input = gr.Textbox(
+                label="Focus Entity", placeholder="Leave empty for the strongest relations"
+            )
         with gr.Column():
             feed_output = gr.Textbox(label="Aggregated Feed", lines=20)
     with gr.Row():
@@ -213,8 +229,16 @@ with gr.Blocks() as demo:
     generate_button = gr.Button("Generate Graph")
     generate_button.click(
         fn=get_combined_feed,
-        inputs=[source_selector, news_site_selector],
+        inputs=[source_selector, news_site_selector, query_input],
         outputs=[feed_output, graph_output]
     )
+    
+    # Button to explore the stored graph without fetching new articles.
+    stored_button = gr.Button("Show Stored Graph")
+    stored_button.click(
+        fn=render_stored_graph,
+        inputs=[query_input],
+        outputs=[graph_output]
+    )
 
 demo.launch()
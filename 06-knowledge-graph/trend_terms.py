@@ -0,0 +1,138 @@
+import time
+import string
+from functools import lru_cache
+from email.utils import parsedate_tz, mktime_tz
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+# ASCII punctuation becomes whitespace (a bytes translate is safe on UTF-8, as
+# ASCII bytes never occur inside multi-byte sequences); newlines mark title breaks.
+_BREAK = "\x01"
+_PUNCTUATION_TABLE = bytes.maketrans(string.punctuation.encode(), b" " * len(string.punctuation))
+MIN_TOKEN_LENGTH = 3
+
+
+@lru_cache(maxsize=100_000)
+def _parse_published(published):
+    parsed = parsedate_tz(published) if published else None
+    return float(mktime_tz(parsed)) if parsed else np.nan
+
+
+def item_timestamps(items):
+    """Epoch seconds per item, from "timestamp" or the RFC 822 "published" string (NaN if unknown)."""
+    return np.array(
+        [item["timestamp"] if item.get("timestamp") is not None else _parse_published(item.get("published", ""))
+         for item in items],
+        dtype=np.float64,
+    )
+
+
+class TermWindowMatrix:
+    """
+    Sparse (num_windows x num_terms) count matrix of unigrams and adjacent-word
+    bigrams (stopwords removed before pairing). Bigram names are only built for
+    the terms that are asked for.
+    """
+    def __init__(self, titles, window_ids, num_windows, bigrams=True, stop_words=ENGLISH_STOP_WORDS):
+        # Tokenize all titles in one pass over a single string.
+        text = "\n".join(title.replace("\n", " ") for title in titles).lower()
+        text = text.encode("utf-8").translate(_PUNCTUATION_TABLE).replace(b"\n", f" {_BREAK} ".encode())
+        tokens = text.decode("utf-8").split()
+        vocab = {tok: i for i, tok in enumerate(dict.fromkeys(tokens))}
+        ids = np.fromiter(map(vocab.__getitem__, tokens), dtype=np.int64, count=len(tokens))
+        break_id = vocab.get(_BREAK, -1)
+        is_break = ids == break_id
+        doc_of_token = np.cumsum(is_break)[~is_break]
+        ids = ids[~is_break]
+
+        self.unigrams = list(vocab)
+        # Stopwords, the break token, short tokens and numbers are never counted.
+        is_stop = np.fromiter(
+            (tok in stop_words or len(tok) < MIN_TOKEN_LENGTH or not tok[0].isalpha() for tok in self.unigrams),
+            dtype=bool, count=len(self.unigrams),
+        )
+
+        keep = ~is_stop[ids]
+        ids, doc_of_token = ids[keep], doc_of_token[keep]
+        window_ids = np.asarray(window_ids, dtype=np.int64)
+
+        num_unigrams = len(self.unigrams)
+        rows, cols = [window_ids[doc_of_token]], [ids]
+        self.bigram_pairs = np.zeros(0, dtype=np.int64)
+        if bigrams and len(ids) > 1:
+            same_doc = doc_of_token[1:] == doc_of_token[:-1]
+            pairs = ids[:-1][same_doc] * num_unigrams + ids[1:][same_doc]
+            self.bigram_pairs, inverse = np.unique(pairs, return_inverse=True)
+            rows.append(window_ids[doc_of_token[1:][same_doc]])
+            cols.append(num_unigrams + inverse.ravel())
+
+        self.rows, self.cols = np.concatenate(rows), np.concatenate(cols)
+        self.num_windows = num_windows
+        self.num_terms = num_unigrams + len(self.bigram_pairs)
+        self._counts = None
+
+    @property
+    def counts(self):
+        """The full window x term matrix as a scipy CSR matrix."""
+        if self._counts is None:
+            self._counts = sparse.coo_matrix(
+                (np.ones(len(self.cols), dtype=np.float32), (self.rows, self.cols)),
+                shape=(self.num_windows, self.num_terms),
+            ).tocsr()
+        return self._counts
+
+    def window_counts(self, windows):
+        """Dense term counts summed over `windows` (a slice or array of window indices)."""
+        mask = np.isin(self.rows, np.arange(self.num_windows)[windows])
+        return np.bincount(self.cols[mask], minlength=self.num_terms).astype(np.float64)
+
+    def term(self, index):
+        num_unigrams = len(self.unigrams)
+        if index < num_unigrams:
+            return self.unigrams[index]
+        first, second = divmod(int(self.bigram_pairs[index - num_unigrams]), num_unigrams)
+        return f"{self.unigrams[first]} {self.unigrams[second]}"
+
+
+def emerging_terms(items, top_k=20, window_hours=24, baseline_windows=7, min_count=2, bigrams=True, now=None):
+    """
+    Rank terms in item titles by how much they burst in the latest time window
+    relative to the mean of the previous `baseline_windows` windows.
+
+    Items without a usable date count toward the latest window. With no
+    history the score reduces to the raw frequency in the latest window.
+
+    Returns:
+        list of dicts with "term", "count" (latest window), "baseline" (mean
+        count per earlier window) and "score", best first.
+    """
+    if not items:
+        return []
+    timestamps = item_timestamps(items)
+    end = now if now is not None else (np.nanmax(timestamps) if np.isfinite(timestamps).any() else time.time())
+    num_windows = baseline_windows + 1
+    age = np.nan_to_num((end - timestamps) // (window_hours * 3600), nan=0.0).clip(min=0)
+    in_range = age < num_windows
+    window_ids = (num_windows - 1 - age[in_range]).astype(np.int64)
+    titles = [item["title"] for item, keep in zip(items, in_range) if keep]
+
+    matrix = TermWindowMatrix(titles, window_ids, num_windows, bigrams=bigrams)
+    if not matrix.num_terms:
+        return []
+    current = matrix.window_counts(slice(num_windows - 1, num_windows))
+    baseline = matrix.window_counts(slice(0, num_windows - 1)) / max(baseline_windows, 1)
+    # Poisson-style burst score: excess over the baseline rate, scaled by its expected noise.
+    scores = (current - baseline) / np.sqrt(baseline + 1.0)
+    scores[current < min_count] = -np.inf
+
+    top_k = min(top_k, int(np.isfinite(scores).sum()))
+    if top_k <= 0:
+        return []
+    best = np.argpartition(-scores, top_k - 1)[:top_k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [
+        {"term": matrix.term(i), "count": int(current[i]), "baseline": float(baseline[i]), "score": float(scores[i])}
+        for i in best
+    ]
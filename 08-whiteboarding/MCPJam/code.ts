@@ -7,7 +7,7 @@ type Cmd =
   | { op: "move_node"; id: string; x: number; y: number }
   | { op: "start_timer"; seconds: number };
 
-figma.ui.onmessage = async (cmd: Cmd) => {
+async function handle(cmd: Cmd) {
   switch (cmd.op) {
     case "create_sticky": {
       const sticky = figma.createSticky();
@@ -36,4 +36,13 @@ figma.ui.onmessage = async (cmd: Cmd) => {
       }
     }
   }
+}
+
+// Commands from the server carry a job_id; report it back once the command is
+// done so the UI acknowledges it (unacknowledged commands are redelivered).
+figma.ui.onmessage = async (cmd: Cmd & { job_id?: number }) => {
+  await handle(cmd);
+  if (cmd.job_id !== undefined) {
+    figma.ui.postMessage({ ack: cmd.job_id });
+  }
 };
@@ -0,0 +1,145 @@
+import time
+import hashlib
+import threading
+
+import numpy as np
+import hdbscan
+
+NOISE = -1
+MAX_HISTORY = 1000
+
+_clusterers = {}
+_clusterers_lock = threading.Lock()
+
+
+def _text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class IncrementalClusterer:
+    """
+    Keeps HDBSCAN cluster state across refreshes of a changing set of items.
+
+    Items seen before keep their cluster. New items are assigned with
+    hdbscan.approximate_predict (falling back to the nearest centroid within
+    that cluster's radius) instead of refitting. A full refit runs only when
+    the items assigned since the last fit exceed `refit_fraction` of the fitted
+    set, or more than `max_noise_fraction` of them landed in noise (a new topic
+    is forming). After a refit, new clusters inherit the ID of the old cluster
+    they share the most members with, so cluster IDs stay stable over time.
+    """
+    def __init__(self, min_cluster_size=2, refit_fraction=0.25, max_noise_fraction=0.5):
+        self.min_cluster_size = min_cluster_size
+        self.refit_fraction = refit_fraction
+        self.max_noise_fraction = max_noise_fraction
+        self.clusterer = None
+        self.label_to_id = {}      # HDBSCAN label of the current fit -> stable cluster ID
+        self.assignments = {}      # item key -> stable cluster ID
+        self.centroids = {}        # stable cluster ID -> (centroid, radius)
+        self.fit_size = 0
+        self.assigned_since_fit = 0
+        self.noise_since_fit = 0
+        self.refits = 0
+        self.history = []          # (timestamp, {stable cluster ID: size}) per update
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _needs_refit(self, num_new):
+        if self.clusterer is None or not self.fit_size:
+            return True
+        assigned = self.assigned_since_fit + num_new
+        if assigned > self.refit_fraction * self.fit_size:
+            return True
+        return self.assigned_since_fit > 0 and self.noise_since_fit > self.max_noise_fraction * self.assigned_since_fit
+
+    def _refit(self, keys, embeddings):
+        clusterer = hdbscan.HDBSCAN(
+            min_cluster_size=self.min_cluster_size, metric="euclidean", prediction_data=True
+        )
+        labels = clusterer.fit_predict(embeddings)
+
+        # Match each new cluster to the old stable ID it overlaps most, largest clusters first.
+        members = {}
+        for key, label in zip(keys, labels):
+            if label != NOISE:
+                members.setdefault(label, []).append(key)
+        label_to_id, taken = {}, set()
+        for label, label_keys in sorted(members.items(), key=lambda kv: -len(kv[1])):
+            overlap = {}
+            for key in label_keys:
+                old_id = self.assignments.get(key, NOISE)
+                if old_id != NOISE and old_id not in taken:
+                    overlap[old_id] = overlap.get(old_id, 0) + 1
+            if overlap:
+                stable_id = max(overlap, key=overlap.get)
+            else:
+                stable_id = self._next_id
+                self._next_id += 1
+            taken.add(stable_id)
+            label_to_id[label] = stable_id
+
+        self.clusterer = clusterer
+        self.label_to_id = label_to_id
+        self.centroids = {}
+        for label, stable_id in label_to_id.items():
+            points = embeddings[labels == label]
+            centroid = points.mean(axis=0)
+            self.centroids[stable_id] = (centroid, float(np.linalg.norm(points - centroid, axis=1).max()))
+        for key, label in zip(keys, labels):
+            self.assignments[key] = label_to_id.get(label, NOISE)
+        self.fit_size = len(keys)
+        self.assigned_since_fit = 0
+        self.noise_since_fit = 0
+        self.refits += 1
+
+    def _nearest_centroid(self, embeddings):
+        ids = []
+        for vector in embeddings:
+            best_id, best_dist = NOISE, np.inf
+            for stable_id, (centroid, radius) in self.centroids.items():
+                dist = float(np.linalg.norm(vector - centroid))
+                if dist <= radius and dist < best_dist:
+                    best_id, best_dist = stable_id, dist
+            ids.append(best_id)
+        return ids
+
+    def _assign(self, keys, embeddings):
+        try:
+            labels, _ = hdbscan.approximate_predict(self.clusterer, embeddings)
+            ids = [self.label_to_id.get(label, NOISE) for label in labels]
+        except Exception:
+            ids = self._nearest_centroid(embeddings)
+        for key, stable_id in zip(keys, ids):
+            self.assignments[key] = stable_id
+        self.assigned_since_fit += len(keys)
+        self.noise_since_fit += sum(1 for stable_id in ids if stable_id == NOISE)
+
+    def update(self, texts, embeddings):
+        """Return a stable cluster ID (or -1 for noise) for each text."""
+        keys = [_text_key(t) for t in texts]
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        with self._lock:
+            if len(keys) <= self.min_cluster_size:
+                return [NOISE] * len(keys)
+            new_rows = [i for i, key in enumerate(keys) if key not in self.assignments]
+            if self._needs_refit(len(new_rows)):
+                self._refit(keys, embeddings)
+            elif new_rows:
+                self._assign([keys[i] for i in new_rows], embeddings[new_rows])
+
+            ids = [self.assignments[key] for key in keys]
+            sizes = {}
+            for stable_id in ids:
+                if stable_id != NOISE:
+                    sizes[stable_id] = sizes.get(stable_id, 0) + 1
+            self.history.append((time.time(), sizes))
+            del self.history[:-MAX_HISTORY]
+            return ids
+
+
+def get_clusterer(min_cluster_size=2):
+    """Return the process-wide IncrementalClusterer for `min_cluster_size`."""
+    with _clusterers_lock:
+        if min_cluster_size not in _clusterers:
+            _clusterers[min_cluster_size] = IncrementalClusterer(min_cluster_size=min_cluster_size)
+        return _clusterers[min_cluster_size]
@@ -18,8 +18,8 @@ from mcpadapt.smolagents_adapter import SmolAgentsAdapter
 import re
 import pandas as pd
 import matplotlib.pyplot as plt
-from sentence_transformers import SentenceTransformer
-import hdbscan
+from embeddings import embed_texts
+from incremental_clustering import get_clusterer
 
 
 class SafeNameAdapter(SmolAgentsAdapter):
@@ -49,13 +49,10 @@ def cluster_trends(items: List[Dict[str, str]], min_cluster_size: int = 2) -> st
     if not texts:
         return "No items to cluster."
 
-    # Load the sentence transformer model
-    model = SentenceTransformer("all-MiniLM-L6-v2")
-    
-    # Generate embeddings and cluster
-    embeddings = model.encode(texts)
-    clusterer = hdbscan.HDBSCAN(min_cluster_size=min_cluster_size, metric="euclidean")
-    labels = clusterer.fit_predict(embeddings)
+    # Embed with the shared model; titles seen before come from the embedding cache
+    embeddings = embed_texts(texts)
+    # Incremental clustering keeps cluster IDs stable between calls
+    labels = get_clusterer(min_cluster_size).update(texts, embeddings)
 
     # Organize items into clusters
     clusters = {}
@@ -66,7 +63,7 @@ def cluster_trends(items: List[Dict[str, str]], min_cluster_size: int = 2) -> st
 
     # Format the clusters as text
     cluster_text = []
-    for i, titles in clusters.items():
+    for i, titles in sorted(clusters.items()):
         cluster_text.append(f"🔸 Cluster {i} ({len(titles)} items):")
         cluster_text.extend(f"- {t}" for t in titles)
         cluster_text.append("")  # add space between clusters
@@ -0,0 +1,192 @@
+import os
+import json
+from collections import deque
+
+import numpy as np
+import networkx as nx
+from scipy import sparse
+from scipy.spatial import cKDTree
+
+# From this many nodes on, networkx switches to a slow per-node loop; above it
+# (and for every warm start) sparse_force_layout is used instead.
+SPARSE_LAYOUT_THRESHOLD = 500
+SPRING_K = 1.2            # networkx spring_layout spacing used for small graphs
+ITERATIONS = 50
+REPULSION_CUTOFF = 2.0    # exact repulsion radius, in multiples of the ideal edge length
+GRID_SIZE = 16            # far-field repulsion comes from a GRID_SIZE x GRID_SIZE grid of cell centroids
+
+
+def _initial_positions(G, cached, rng):
+    """
+    Cached nodes keep their position. New nodes start at the mean position of
+    their already placed neighbours (placed in BFS order from the cached part),
+    or at a random point inside the cached bounding box if they are not
+    connected to the cached part at all.
+    """
+    pos = {node: np.asarray(cached[node], dtype=float) for node in G if node in cached}
+    if pos:
+        known = np.array(list(pos.values()))
+        low, high = known.min(axis=0), known.max(axis=0)
+    else:
+        low, high = np.array([-1.0, -1.0]), np.array([1.0, 1.0])
+    spread = np.maximum(high - low, 1.0)
+    jitter = 0.05 * spread
+
+    undirected = G.to_undirected(as_view=True)
+    queue = deque(node for node in G if node not in pos and any(n in pos for n in undirected[node]))
+    queued = set(queue)
+    while queue:
+        node = queue.popleft()
+        placed = [pos[n] for n in undirected[node] if n in pos]
+        pos[node] = np.mean(placed, axis=0) + rng.normal(0, 1, 2) * jitter
+        for n in undirected[node]:
+            if n not in pos and n not in queued:
+                queue.append(n)
+                queued.add(n)
+    for node in G:
+        if node not in pos:
+            pos[node] = low + rng.random(2) * spread
+    return pos
+
+
+def _far_field_repulsion(xy, active, k, cutoff, chunk_size=4096):
+    """
+    Barnes-Hut style approximation of the repulsion from all nodes: nodes are
+    binned into a grid and every active node is pushed away from the centroid
+    of each grid cell (weighted by its node count) farther than `cutoff`.
+    """
+    low = xy.min(axis=0)
+    cell = np.maximum(np.ptp(xy, axis=0), 1e-9) / GRID_SIZE
+    bins = np.minimum(((xy - low) / cell).astype(np.int64), GRID_SIZE - 1)
+    cell_ids = bins[:, 0] * GRID_SIZE + bins[:, 1]
+    mass = np.bincount(cell_ids, minlength=GRID_SIZE * GRID_SIZE)
+    occupied = np.flatnonzero(mass)
+    mass = mass[occupied].astype(float)
+    centroids = np.stack([
+        np.bincount(cell_ids, xy[:, axis], minlength=GRID_SIZE * GRID_SIZE)[occupied] / mass
+        for axis in range(2)
+    ], axis=1)
+
+    disp = np.zeros_like(xy)
+    for start in range(0, len(active), chunk_size):
+        rows = active[start:start + chunk_size]
+        delta = xy[rows, None, :] - centroids[None, :, :]
+        dist_sq = np.einsum("ijk,ijk->ij", delta, delta)
+        scale = np.where(dist_sq > cutoff * cutoff, k * k * mass / np.maximum(dist_sq, 1e-12), 0.0)
+        disp[rows] = np.einsum("ij,ijk->ik", scale, delta)
+    return disp
+
+
+def sparse_force_layout(G, pos, fixed=(), iterations=ITERATIONS, k=None, weight="weight"):
+    """
+    Fruchterman-Reingold style layout for large graphs. Attraction is computed
+    over the sparse adjacency matrix; repulsion is exact only between node
+    pairs closer than REPULSION_CUTOFF * k (found with a KD-tree) and comes
+    from grid cell centroids beyond that, so each iteration costs
+    O(edges + nearby pairs + nodes * cells) instead of O(n^2). Nodes in
+    `fixed` do not move, and forces are only computed for the others.
+    """
+    nodes = list(G)
+    if not nodes:
+        return {}
+    xy = np.array([pos[node] for node in nodes], dtype=float)
+    active = np.array([i for i, node in enumerate(nodes) if node not in fixed], dtype=np.int64)
+    span = float(np.ptp(xy, axis=0).max()) or 1.0
+    k = k or span / np.sqrt(len(nodes))
+    cutoff = REPULSION_CUTOFF * k
+
+    A = nx.to_scipy_sparse_array(G, nodelist=nodes, weight=weight, format="coo")
+    A = sparse.coo_matrix(A + A.T)
+    # Only edges pulling on a movable node matter.
+    moving_edge = np.isin(A.row, active)
+    rows, cols, weights = A.row[moving_edge], A.col[moving_edge], A.data[moving_edge]
+
+    temperature = 0.1 * span
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        disp = _far_field_repulsion(xy, active, k, cutoff)
+
+        # Exact repulsion k^2 / d between nearby pairs.
+        tree = cKDTree(xy)
+        if len(active) == len(nodes):
+            pairs = tree.query_pairs(cutoff, output_type="ndarray")
+            i, j, symmetric = pairs[:, 0], pairs[:, 1], True
+        else:
+            near = cKDTree(xy[active]).sparse_distance_matrix(tree, cutoff, output_type="ndarray")
+            i, j, symmetric = active[near["i"]], near["j"], False
+            not_self = i != j
+            i, j = i[not_self], j[not_self]
+        delta = xy[i] - xy[j]
+        dist_sq = np.maximum(np.einsum("ij,ij->i", delta, delta), (0.01 * k) ** 2)
+        force = delta * (k * k / dist_sq)[:, None]
+        for axis in range(2):
+            disp[:, axis] += np.bincount(i, force[:, axis], minlength=len(nodes))
+            if symmetric:
+                disp[:, axis] -= np.bincount(j, force[:, axis], minlength=len(nodes))
+
+        # Attraction d^2 / k along edges.
+        delta = xy[rows] - xy[cols]
+        dist = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+        force = delta * (dist * weights / k)[:, None]
+        for axis in range(2):
+            disp[:, axis] -= np.bincount(rows, force[:, axis], minlength=len(nodes))
+
+        length = np.maximum(np.sqrt(np.einsum("ij,ij->i", disp, disp)), 1e-9)
+        step = disp * (np.minimum(length, temperature) / length)[:, None]
+        xy[active] += step[active]
+        temperature -= cooling
+    return dict(zip(nodes, xy))
+
+
+def compute_layout(G, cached=None, iterations=ITERATIONS, seed=None):
+    """
+    Lay out G, warm-starting from `cached` positions ({node: (x, y)}).
+
+    Nodes that already have a cached position stay where they are and only
+    new nodes are relaxed (with sparse_force_layout), so the picture does not
+    jump between refreshes. Without any cached position the whole graph is
+    laid out from scratch: with the networkx spring layout for small graphs and
+    sparse_force_layout from SPARSE_LAYOUT_THRESHOLD nodes on.
+
+    Returns:
+        dict: node -> np.array([x, y]) for every node in G.
+    """
+    cached = cached or {}
+    if not len(G):
+        return {}
+    fixed = [node for node in G if node in cached]
+    if len(fixed) == len(G):
+        return {node: np.asarray(cached[node], dtype=float) for node in G}
+
+    rng = np.random.default_rng(seed)
+    pos = _initial_positions(G, cached, rng)
+    if fixed:
+        return sparse_force_layout(G, pos, fixed=set(fixed), iterations=iterations)
+    if len(G) >= SPARSE_LAYOUT_THRESHOLD:
+        return nx.rescale_layout_dict(sparse_force_layout(G, pos, iterations=iterations))
+    return nx.spring_layout(G, k=SPRING_K, iterations=iterations, seed=seed)
+
+
+class LayoutCache:
+    """
+    Node positions persisted as JSON next to a graph file, so repeated
+    visualizations of a growing graph keep their existing layout.
+    """
+    def __init__(self, path):
+        self.path = path
+        try:
+            with open(path) as f:
+                self.positions = json.load(f)
+        except (OSError, ValueError):
+            self.positions = {}
+
+    def layout(self, G, iterations=ITERATIONS, seed=None):
+        """Lay out G from the cached positions, then save the result."""
+        cached = {node: self.positions[str(node)] for node in G if str(node) in self.positions}
+        pos = compute_layout(G, cached, iterations=iterations, seed=seed)
+        self.positions.update({str(node): [float(x), float(y)] for node, (x, y) in pos.items()})
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.positions, f)
+        os.replace(tmp_path, self.path)
+        return pos
@@ -22,6 +22,10 @@ except ImportError:
     raise ImportError("pyvis is required to run this script: pip install pyvis")
 
 from build_knowledge_graph import build_graph
+from graph_layout import LayoutCache
+
+# graph_layout positions are roughly in [-1, 1]; vis.js coordinates are pixels.
+LAYOUT_SCALE = 600
 
 
 def main():
@@ -37,6 +41,10 @@ def main():
     parser.add_argument(
         '--title', help='Title for the visualization', default=None
     )
+    parser.add_argument(
+        '--no-layout-cache', action='store_true',
+        help='Let vis.js physics place the nodes instead of the cached layout'
+    )
     args = parser.parse_args()
 
     # Load proof_of_work JSON
@@ -47,6 +55,13 @@ def main():
     # Build NetworkX graph
     G = build_graph(provenance)
 
+    # Fixed positions from the cached layout (<input>.layout.json); only new nodes are placed.
+    if not args.no_layout_cache:
+        base = os.path.splitext(args.input_json)[0]
+        pos = LayoutCache(f"{base}.layout.json").layout(G, seed=0)
+        for node, (x, y) in pos.items():
+            G.nodes[node]['x'], G.nodes[node]['y'] = float(x) * LAYOUT_SCALE, float(y) * LAYOUT_SCALE
+
     # Initialize PyVis network
     net = Network(
         height='750px', width='100%', directed=True, notebook=False
@@ -55,6 +70,8 @@ def main():
         net.heading = args.title
     # Transfer nodes & edges
     net.from_nx(G)
+    if not args.no_layout_cache:
+        net.toggle_physics(False)
 
     # Determine output HTML path
     base = os.path.splitext(args.input_json)[0]
@@ -0,0 +1,226 @@
+# aggregates.py
+import math
+from typing import Dict, Any, Optional, Iterable
+
+from columnar import parse_record
+
+RELATIVE_ACCURACY = 0.01       # quantile estimates are within 1% of the true value
+MIN_TRACKED_VALUE = 1e-9       # smaller execution times (and 0) share one bucket
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+class QuantileSketch:
+    """
+    Streaming quantile sketch with bounded relative error (the DDSketch
+    bucketing): a value x lands in bucket ceil(log_gamma(x)), so every
+    estimate is within `relative_accuracy` of a true quantile. Adding or
+    removing a value is O(1); execution times from 1 µs to 1 h need about
+    1,100 buckets at 1% accuracy, however many values are added.
+    """
+
+    __slots__ = ("relative_accuracy", "_log_gamma", "buckets", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = RELATIVE_ACCURACY):
+        self.relative_accuracy = relative_accuracy
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float, weight: int = 1):
+        """Add `value` (`weight` times; a negative weight removes it again)"""
+        if value <= MIN_TRACKED_VALUE:
+            self.zero_count += weight
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            count = self.buckets.get(index, 0) + weight
+            if count > 0:
+                self.buckets[index] = count
+            else:
+                self.buckets.pop(index, None)
+        self.count += weight
+
+    def remove(self, value: float):
+        self.add(value, -1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimated q-quantile (0 <= q <= 1), None if the sketch is empty"""
+        if self.count <= 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # The bucket's midpoint (in relative terms) keeps the error within relative_accuracy.
+                return 2 * math.exp(index * self._log_gamma) / (1 + math.exp(self._log_gamma))
+        return 2 * math.exp(max(self.buckets) * self._log_gamma) / (1 + math.exp(self._log_gamma))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in self.buckets.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuantileSketch':
+        sketch = cls(data.get("relative_accuracy", RELATIVE_ACCURACY))
+        sketch.zero_count = data.get("zero_count", 0)
+        sketch.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        sketch.count = sketch.zero_count + sum(sketch.buckets.values())
+        return sketch
+
+class ToolStats:
+    """
+    Running aggregates for one tool: call count, failures, and over the
+    calls with a known execution time their count, sum, sum of squares,
+    min, max and a QuantileSketch. Every update is O(1).
+
+    Removing a call (retention) keeps everything exact except min/max:
+    if the removed time was the current min or max, `extrema_stale` is set
+    and the owner recomputes them (see set_extrema).
+    """
+
+    __slots__ = ("count", "failures", "timed", "total", "sum_sq", "min", "max", "sketch", "extrema_stale")
+
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.timed = 0
+        self.total = 0.0
+        self.sum_sq = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.sketch = QuantileSketch()
+        self.extrema_stale = False
+
+    def add(self, execution_time: Optional[float], success: bool):
+        self.count += 1
+        self.failures += not success
+        if execution_time is None or execution_time != execution_time:
+            return
+        self.timed += 1
+        self.total += execution_time
+        self.sum_sq += execution_time * execution_time
+        self.min = execution_time if self.min is None else min(self.min, execution_time)
+        self.max = execution_time if self.max is None else max(self.max, execution_time)
+        self.sketch.add(execution_time)
+
+    def remove(self, execution_time: Optional[float], success: bool):
+        self.count -= 1
+        self.failures -= not success
+        if execution_time is None or execution_time != execution_time:
+            return
+        self.timed -= 1
+        self.total -= execution_time
+        self.sum_sq -= execution_time * execution_time
+        self.sketch.remove(execution_time)
+        if execution_time == self.min or execution_time == self.max or self.timed == 0:
+            self.extrema_stale = True
+
+    def set_extrema(self, minimum: Optional[float], maximum: Optional[float]):
+        self.min, self.max = minimum, maximum
+        self.extrema_stale = False
+
+    def summary(self) -> Dict[str, Any]:
+        """Counts, success rate and execution time total/avg/std/min/max/p50/p95/p99"""
+        timed = self.timed
+        avg = self.total / timed if timed else None
+        variance = max(self.sum_sq / timed - avg * avg, 0.0) if timed else None
+        summary = {
+            "count": self.count,
+            "failures": self.failures,
+            "success_rate": (self.count - self.failures) / self.count if self.count else 0,
+            "timed_calls": timed,
+            "total_execution_time": self.total,
+            "avg_execution_time": avg,
+            "std_execution_time": math.sqrt(variance) if variance is not None else None,
+            "min_execution_time": self.min,
+            "max_execution_time": self.max,
+        }
+        for name, q in QUANTILES.items():
+            summary[f"{name}_execution_time"] = self.sketch.quantile(q)
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "timed": self.timed,
+            "total": self.total,
+            "sum_sq": self.sum_sq,
+            "min": self.min,
+            "max": self.max,
+            "sketch": self.sketch.to_dict()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ToolStats':
+        stats = cls()
+        stats.count = data["count"]
+        stats.failures = data["failures"]
+        stats.timed = data["timed"]
+        stats.total = data["total"]
+        stats.sum_sq = data["sum_sq"]
+        stats.min = data.get("min")
+        stats.max = data.get("max")
+        stats.sketch = QuantileSketch.from_dict(data.get("sketch", {}))
+        return stats
+
+class StatsAggregator:
+    """ToolStats per tool name; queries cost O(number of tools), not O(calls)."""
+
+    def __init__(self):
+        self.tools: Dict[str, ToolStats] = {}
+
+    def add(self, tool_name: str, execution_time: Optional[float], success: bool):
+        stats = self.tools.get(tool_name)
+        if stats is None:
+            stats = self.tools[tool_name] = ToolStats()
+        stats.add(execution_time, success)
+
+    def add_records(self, records: Iterable[Dict[str, Any]]):
+        """Add ToolCall.to_dict()-style records, skipping malformed ones (see columnar.parse_record)"""
+        for record in records:
+            parsed = parse_record(record)
+            if parsed is not None:
+                tool_name, _, execution_time, success = parsed
+                self.add(tool_name, execution_time, success)
+
+    def remove_records(self, records: Iterable[Dict[str, Any]]):
+        """Remove records added with add_records (malformed ones were never added)"""
+        for record in records:
+            parsed = parse_record(record)
+            if parsed is not None:
+                tool_name, _, execution_time, success = parsed
+                self.remove(tool_name, execution_time, success)
+
+    def remove(self, tool_name: str, execution_time: Optional[float], success: bool):
+        stats = self.tools.get(tool_name)
+        if stats is None:
+            return
+        stats.remove(execution_time, success)
+        if stats.count <= 0:
+            del self.tools[tool_name]
+
+    def stale_extrema(self) -> Iterable[str]:
+        """Tools whose min/max must be recomputed after removals"""
+        return [name for name, stats in self.tools.items() if stats.extrema_stale]
+
+    def clear(self):
+        self.tools = {}
+
+    def summaries(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.summary() for name, stats in self.tools.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: stats.to_dict() for name, stats in self.tools.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StatsAggregator':
+        aggregator = cls()
+        aggregator.tools = {name: ToolStats.from_dict(stats) for name, stats in data.items()}
+        return aggregator
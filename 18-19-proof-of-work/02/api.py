@@ -110,6 +110,20 @@ class LLMProofOfWorkAPI:
         """
         return self.config["storage"]
         
+    def get_data_store(self):
+        """
+        Open the configured data store.
+        
+        Returns:
+            DataStore at storage.path (SQLite for .db/.sqlite paths),
+            keeping at most storage.max_entries tool calls
+        """
+        from data_store import DataStore
+        
+        storage = self.config["storage"]
+        return DataStore(storage.get("path", self.data_store_path),
+                         max_entries=storage.get("max_entries"))
+        
     def get_dashboard_data(self, 
                           time_interval: Optional[str] = None,
                           tool_filter: Optional[List[str]] = None) -> Dict[str, Any]:
@@ -163,8 +177,14 @@ class LLMProofOfWorkAPI:
             return visualizer.export_to_csv(output_file=output_path)
         else:  # json
             try:
-                with open(self.data_store_path, 'r') as f:
-                    data = json.load(f)
+                from data_store import DataStore, is_sqlite_path
+                if is_sqlite_path(self.data_store_path):
+                    store = DataStore(self.data_store_path)
+                    data = store.data
+                    store.close()
+                else:
+                    with open(self.data_store_path, 'r') as f:
+                        data = json.load(f)
                 
                 with open(output_path, 'w') as f:
                     json.dump(data, f, indent=2)
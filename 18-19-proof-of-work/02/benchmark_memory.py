@@ -0,0 +1,98 @@
+# benchmark_memory.py
+"""
+Memory and aggregation time for recorded tool calls, one object (or dict)
+per call versus ToolCallColumns. Allocation tracing makes the default run take
+a few minutes.
+
+    python benchmark_memory.py [--calls 1000000]
+"""
+import time
+import random
+import argparse
+import datetime
+import tracemalloc
+
+from columnar import ToolCallColumns
+
+TOOLS = ["web_search", "calculator", "read_file", "write_file", "run_code", "send_email", "browse", "sql_query"]
+START = datetime.datetime(2025, 1, 1)
+
+class ObjectToolCall:
+    """A ToolCall as it used to be stored: a regular object with a __dict__."""
+
+    def __init__(self, tool_name, arguments, result, timestamp, execution_time):
+        self.tool_name = tool_name
+        self.arguments = arguments
+        self.result = result
+        self.timestamp = timestamp
+        self.execution_time = execution_time
+
+def calls(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        # Tool names come from a parser/JSON, so each call has its own string object.
+        yield ("".join(rng.choice(TOOLS)), {"arg0": f"query {i}"}, None if rng.random() < 0.05 else "ok",
+               START + datetime.timedelta(microseconds=i * 997_000), rng.lognormvariate(-2, 1))
+
+def build_objects(n):
+    return [ObjectToolCall(*call) for call in calls(n)]
+
+def build_dicts(n):
+    return [
+        {"tool_name": name, "arguments": arguments, "result": result,
+         "timestamp": timestamp.isoformat(), "execution_time": execution_time, "id": i + 1}
+        for i, (name, arguments, result, timestamp, execution_time) in enumerate(calls(n))
+    ]
+
+def build_columns(n, keep_payloads):
+    columns = ToolCallColumns(keep_payloads)
+    columns.extend((name, arguments, result, round(timestamp.timestamp() * 1e6), execution_time)
+                   for name, arguments, result, timestamp, execution_time in calls(n))
+    return columns
+
+def measure(build, *args):
+    tracemalloc.start()
+    value = build(*args)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size
+
+def loop_stats(objects):
+    stats = {}
+    for call in objects:
+        entry = stats.setdefault(call.tool_name, {"count": 0, "total": 0.0, "failures": 0})
+        entry["count"] += 1
+        entry["total"] += call.execution_time
+        entry["failures"] += call.result is None
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.calls
+
+    objects, objects_size = measure(build_objects, n)
+    _, dicts_size = measure(build_dicts, n)
+    _, payload_size = measure(build_columns, n, True)
+    columns, columns_size = measure(build_columns, n, False)
+
+    print(f"{n:,} calls, memory:")
+    print(f"  {'ToolCall objects':<28} {objects_size / 1e6:8.1f} MB  {objects_size / n:6.0f} B/call")
+    print(f"  {'DataStore dicts':<28} {dicts_size / 1e6:8.1f} MB  {dicts_size / n:6.0f} B/call")
+    print(f"  {'columns + payloads':<28} {payload_size / 1e6:8.1f} MB  {payload_size / n:6.0f} B/call")
+    print(f"  {'columns':<28} {columns_size / 1e6:8.1f} MB  {columns_size / n:6.0f} B/call "
+          f"({objects_size / columns_size:.0f}x smaller than objects)")
+
+    start = time.perf_counter()
+    expected = loop_stats(objects)
+    loop_time = time.perf_counter() - start
+    start = time.perf_counter()
+    per_tool = columns.per_tool()
+    vector_time = time.perf_counter() - start
+    assert {k: v["count"] for k, v in expected.items()} == {k: v["count"] for k, v in per_tool.items()}
+    print(f"per-tool stats: loop over objects {loop_time * 1e3:.0f} ms, "
+          f"vectorized columns {vector_time * 1e3:.0f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# benchmark_stats.py
+"""
+get_stats() from the incrementally maintained aggregates versus a full
+GROUP BY scan of the SQLite history, as the history grows, and the
+accuracy of the p50/p95/p99 estimates against exact percentiles.
+
+    python benchmark_stats.py [--calls 1000000] [--batch 10000]
+"""
+import os
+import time
+import argparse
+import tempfile
+
+import numpy as np
+
+from data_store import DataStore
+from benchmark_store import synthetic_calls, timed, TOOLS
+
+def scan_stats(store):
+    """What get_stats cost before: aggregate every row on each call"""
+    return store.backend._connect().execute(
+        "SELECT tool_name, COUNT(*), AVG(execution_time), MIN(execution_time), MAX(execution_time) "
+        "FROM tool_calls GROUP BY tool_name"
+    ).fetchall()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    calls = list(synthetic_calls(args.calls))
+    checkpoints = sorted({n for n in (args.calls // 100, args.calls // 10, args.calls) if n})
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DataStore(os.path.join(tmp, "bench.sqlite"))
+        print(f"{'calls':>10} {'insert/s':>10} {'get_stats':>10} {'full scan':>10}")
+        added, insert_time = 0, 0.0
+        for checkpoint in checkpoints:
+            start = time.perf_counter()
+            for first in range(added, checkpoint, args.batch):
+                store.add_tool_calls(calls[first:min(first + args.batch, checkpoint)])
+            insert_time += time.perf_counter() - start
+            added = checkpoint
+            stats_time, stats = timed(store.get_stats)
+            scan_time, _ = timed(lambda: scan_stats(store))
+            assert stats["total_calls"] == checkpoint
+            print(f"{checkpoint:10,} {added / insert_time:10,.0f} {stats_time * 1e3:8.2f}ms {scan_time * 1e3:8.1f}ms")
+
+        times = {tool: [] for tool in TOOLS}
+        for call in calls:
+            times[call["tool_name"]].append(call["execution_time"])
+        print(f"\n{'tool':>12} {'quantile':>8} {'exact':>10} {'sketch':>10} {'error':>7}")
+        worst = 0.0
+        for tool, summary in sorted(stats["tool_stats"].items()):
+            for q in (50, 95, 99):
+                exact = float(np.percentile(times[tool], q, method="lower"))
+                estimate = summary[f"p{q}_execution_time"]
+                error = abs(estimate - exact) / exact
+                worst = max(worst, error)
+                if tool == TOOLS[0]:
+                    print(f"{tool:>12} {f'p{q}':>8} {exact:10.5f} {estimate:10.5f} {error:7.2%}")
+        print(f"worst relative error over {len(TOOLS)} tools: {worst:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+# benchmark_store.py
+"""
+Filtered get_tool_calls queries on the SQLite backend versus the JSON
+backend's list scans, over a synthetic history of tool calls (one call per
+second, spread over a few tools).
+
+    python benchmark_store.py [--calls 1000000] [--batch 10000]
+"""
+import os
+import time
+import random
+import argparse
+import datetime
+import tempfile
+
+from data_store import DataStore, JSONStorageBackend
+
+TOOLS = ["web_search", "calculator", "read_file", "write_file", "run_code", "send_email", "browse", "sql_query"]
+START = datetime.datetime(2025, 1, 1)
+
+def synthetic_calls(n, seed=0):
+    rng = random.Random(seed)
+    for i in range(n):
+        yield {
+            "tool_name": rng.choice(TOOLS),
+            "arguments": {"query": f"q{i}"},
+            "result": None if rng.random() < 0.05 else "ok",
+            "timestamp": (START + datetime.timedelta(seconds=i)).isoformat(),
+            "execution_time": rng.lognormvariate(-2, 1),
+        }
+
+def timed(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000)
+    args = parser.parse_args()
+
+    window = (START + datetime.timedelta(seconds=args.calls // 2),
+              START + datetime.timedelta(seconds=args.calls // 2 + 3600))
+    queries = {
+        "tool, last hour": dict(tool_name="calculator", start_time=window[0], end_time=window[1]),
+        "hour window": dict(start_time=window[0], end_time=window[1]),
+        "tool, first 100": dict(tool_name="calculator", limit=100),
+        "tool, since hour": dict(tool_name="calculator", start_time=window[0], limit=100),
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite_store = DataStore(os.path.join(tmp, "bench.sqlite"))
+        calls = list(synthetic_calls(args.calls))
+        start = time.perf_counter()
+        for first in range(0, len(calls), args.batch):
+            sqlite_store.add_tool_calls(calls[first:first + args.batch])
+        elapsed = time.perf_counter() - start
+        print(f"sqlite insert: {args.calls:,} calls in {elapsed:.1f}s ({args.calls / elapsed:,.0f}/s, "
+              f"batches of {args.batch:,}), {os.path.getsize(os.path.join(tmp, 'bench.sqlite')) / 1e6:.0f} MB")
+
+        # The JSON backend's queries run on its in-memory list; skip writing the file.
+        json_backend = JSONStorageBackend(os.path.join(tmp, "bench.json"))
+        json_backend.data["tool_calls"] = [{**call, "id": i + 1} for i, call in enumerate(calls)]
+        json_store = DataStore(backend=json_backend)
+
+        print(f"{'query':>18} {'rows':>7} {'json scan':>10} {'sqlite':>9}")
+        for name, query in queries.items():
+            json_time, expected = timed(lambda: json_store.get_tool_calls(**query))
+            sqlite_time, rows = timed(lambda: sqlite_store.get_tool_calls(**query))
+            assert [r["id"] for r in rows] == [r["id"] for r in expected], name
+            print(f"{name:>18} {len(rows):7,} {json_time * 1e3:8.1f}ms {sqlite_time * 1e3:7.2f}ms")
+
+        retained = DataStore(os.path.join(tmp, "retained.sqlite"), max_entries=args.calls // 10)
+        for first in range(0, len(calls), args.batch):
+            retained.add_tool_calls(calls[first:first + args.batch])
+        print(f"retention: max_entries={args.calls // 10:,} keeps {retained.backend.count():,} calls")
+
+if __name__ == "__main__":
+    main()
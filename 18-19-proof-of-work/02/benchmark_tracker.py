@@ -0,0 +1,129 @@
+# benchmark_tracker.py
+"""
+Per-call overhead of ToolTracker.track_tool at growing history sizes.
+
+The journal appends one line per call, so the overhead per call should stay
+flat up to 100,000 calls. The hot path alone (timing the call and handing
+the record to the writer thread) is measured with the writer kept idle, and
+a multi-threaded run checks that no call is lost. For comparison, the
+previous implementation (re-dumping every recorded call as indented JSON
+after each call) is run for a much smaller number of calls.
+
+    python benchmark_tracker.py [--calls 100000] [--threads 8] [--legacy-calls 1000]
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+from tool_tracker import ToolTracker
+
+def noop(query, limit=10):
+    return query
+
+def run(tracker, calls, report_every):
+    tool = tracker.track_tool(noop)
+    start = time.perf_counter()
+    window_start = start
+    for i in range(1, calls + 1):
+        tool("benchmark query", limit=i)
+        if i % report_every == 0:
+            now = time.perf_counter()
+            print(f"  calls {i - report_every + 1:>7,}-{i:<7,}: {(now - window_start) / report_every * 1e6:8.1f} µs/call")
+            window_start = now
+    tracker.save()
+    return time.perf_counter() - start
+
+def bare(calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        noop("benchmark query", limit=i)
+    return (time.perf_counter() - start) / calls
+
+def hot_path(path, calls):
+    # Buffer everything and never wake the writer until save().
+    tracker = ToolTracker(save_path=path, buffer_capacity=2 * calls + 2, flush_interval=3600)
+    tool = tracker.track_tool(noop)
+    start = time.perf_counter()
+    for i in range(calls):
+        tool("benchmark query", limit=i)
+    recorded = time.perf_counter() - start
+    start = time.perf_counter()
+    tracker.save()
+    written = time.perf_counter() - start
+    tracker.close()
+    return recorded / calls, written / calls
+
+def concurrent(path, calls, threads):
+    tracker = ToolTracker(save_path=path)
+    tool = tracker.track_tool(noop)
+    per_thread = calls // threads
+    workers = [
+        threading.Thread(target=lambda: [tool("benchmark query", limit=i) for i in range(per_thread)])
+        for _ in range(threads)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    tracker.save()
+    elapsed = time.perf_counter() - start
+    with open(path) as f:
+        lines = sum(1 for _ in f)
+    tracker.close()
+    return elapsed, per_thread * threads, len(tracker.tool_calls), lines
+
+class LegacyTracker(ToolTracker):
+    """The old behaviour: rewrite the whole file after every call."""
+
+    def track_tool(self, func):
+        tracked = super().track_tool(func)
+
+        def wrapper(*args, **kwargs):
+            try:
+                return tracked(*args, **kwargs)
+            finally:
+                with open(self.save_path + ".legacy.json", 'w') as f:
+                    json.dump([call.to_dict() for call in self.tool_calls], f, indent=2)
+        return wrapper
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=100_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--legacy-calls", type=int, default=1_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"untracked call: {bare(args.calls) * 1e6:.2f} µs")
+
+        path = os.path.join(tmp, "tool_calls.jsonl")
+        print(f"journal ({args.calls:,} calls):")
+        elapsed = run(ToolTracker(save_path=path), args.calls, max(args.calls // 10, 1))
+        print(f"  total {elapsed:.2f}s, {elapsed / args.calls * 1e6:.1f} µs/call, "
+              f"{os.path.getsize(path) / 1e6:.1f} MB journal")
+
+        start = time.perf_counter()
+        tracker = ToolTracker(save_path=path)
+        tracker.load()
+        print(f"  load: {len(tracker.tool_calls):,} calls in {time.perf_counter() - start:.2f}s")
+
+        recorded, written = hot_path(os.path.join(tmp, "hot.jsonl"), args.calls)
+        print(f"hot path: {recorded * 1e6:.2f} µs/call recording, "
+              f"{written * 1e6:.2f} µs/call in the writer thread")
+
+        elapsed, expected, recorded, lines = concurrent(os.path.join(tmp, "threads.jsonl"), args.calls, args.threads)
+        print(f"{args.threads} threads: {expected:,} calls in {elapsed:.2f}s, "
+              f"{recorded:,} recorded, {lines:,} journaled")
+
+        if args.legacy_calls:
+            print(f"full rewrite per call ({args.legacy_calls:,} calls):")
+            legacy = LegacyTracker(save_path=os.path.join(tmp, "legacy.jsonl"))
+            elapsed = run(legacy, args.legacy_calls, max(args.legacy_calls // 4, 1))
+            print(f"  total {elapsed:.2f}s, {elapsed / args.legacy_calls * 1e6:.1f} µs/call")
+
+if __name__ == "__main__":
+    main()
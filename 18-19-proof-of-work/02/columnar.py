@@ -0,0 +1,213 @@
+# columnar.py
+import datetime
+import threading
+from array import array
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+import numpy as np
+
+NAN = float("nan")
+
+def to_micros(timestamp) -> int:
+    """Epoch microseconds for a datetime or ISO string (naive = local time)"""
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.fromisoformat(timestamp)
+    return round(timestamp.timestamp() * 1_000_000)
+
+def from_micros(micros: int) -> datetime.datetime:
+    """Naive local datetime for epoch microseconds (exact inverse of to_micros)"""
+    seconds, micro = divmod(int(micros), 1_000_000)
+    return datetime.datetime.fromtimestamp(seconds).replace(microsecond=micro)
+
+def parse_record(record) -> Optional[Tuple[str, int, Optional[float], bool]]:
+    """
+    (tool_name, epoch microseconds, execution_time, success) for a
+    ToolCall.to_dict()-style record, or None if it is malformed (e.g. a
+    partial journal line). Every consumer of journal records uses this check,
+    so they all skip the same records.
+    """
+    try:
+        tool_name = record["tool_name"]
+        timestamp = to_micros(record["timestamp"])
+        execution_time = record.get("execution_time")
+    except (KeyError, TypeError, ValueError, AttributeError, OverflowError):
+        return None
+    if not isinstance(tool_name, str):
+        return None
+    if execution_time is not None and (isinstance(execution_time, bool)
+                                       or not isinstance(execution_time, (int, float))):
+        return None
+    return tool_name, timestamp, execution_time, record.get("result") is not None
+
+class ToolCallColumns:
+    """
+    Tool calls stored column by column instead of one object per call.
+
+    Tool names are interned to small integer codes (`names[code]`),
+    timestamps are int64 epoch microseconds, execution times are float32
+    seconds (NaN when unknown) and success (a non-None result) is one byte,
+    all in `array` buffers: about 17 bytes per call. Arguments and results
+    are kept in two plain lists only with `keep_payloads=True`.
+
+    `columns()` returns the buffers as NumPy arrays, so aggregations are
+    vectorized. Indexing or iterating yields ToolCall rows, built on demand.
+    Appends and columns() are serialized by a lock, so one thread can add
+    calls while another aggregates.
+    """
+
+    def __init__(self, keep_payloads: bool = True):
+        self.keep_payloads = keep_payloads
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        self.names: List[str] = []          # code -> tool name
+        self._codes: Dict[str, int] = {}    # tool name -> code
+        self.tool_code = array('I')
+        self.timestamp = array('q')
+        self.execution_time = array('f')
+        self.success = array('b')
+        self.arguments: Optional[List[Any]] = [] if self.keep_payloads else None
+        self.results: Optional[List[Any]] = [] if self.keep_payloads else None
+
+    def code(self, tool_name: str) -> int:
+        """Interned code of a tool name (assigned on first use)"""
+        code = self._codes.get(tool_name)
+        if code is None:
+            code = self._codes[tool_name] = len(self.names)
+            self.names.append(tool_name)
+        return code
+
+    def append(self, tool_name: str, arguments: Any, result: Any,
+               timestamp: int, execution_time: Optional[float]):
+        """Add one call (timestamp in epoch microseconds)"""
+        with self._lock:
+            self._append(tool_name, arguments, result, timestamp, execution_time)
+
+    def _append(self, tool_name, arguments, result, timestamp, execution_time):
+        self.tool_code.append(self.code(tool_name))
+        self.timestamp.append(timestamp)
+        self.execution_time.append(NAN if execution_time is None else execution_time)
+        self.success.append(result is not None)
+        if self.keep_payloads:
+            self.arguments.append(arguments)
+            self.results.append(result)
+
+    def extend(self, calls: Iterable[Tuple[str, Any, Any, int, Optional[float]]]):
+        """Add (tool_name, arguments, result, timestamp, execution_time) tuples"""
+        with self._lock:
+            for call in calls:
+                self._append(*call)
+
+    def extend_records(self, records: Iterable[Dict[str, Any]]):
+        """Add ToolCall.to_dict()-style dictionaries, e.g. streamed from a journal"""
+        for record in records:
+            parsed = parse_record(record)
+            if parsed is None:
+                continue
+            tool_name, timestamp, execution_time, _ = parsed
+            self.append(tool_name, record.get("arguments"), record.get("result"),
+                        timestamp, execution_time)
+
+    @classmethod
+    def from_columns(cls, tool_names: Iterable[str], timestamp, execution_time, success) -> 'ToolCallColumns':
+        """
+        Build from whole columns (e.g. fetched from a database) without
+        payloads: tool names, epoch-second timestamps, execution times
+        (None/NaN when unknown) and success flags.
+        """
+        columns = cls(keep_payloads=False)
+        codes = [columns.code(name) for name in tool_names]
+        timestamp = np.asarray(timestamp, dtype=np.float64)
+        columns.tool_code.frombytes(np.asarray(codes, dtype=np.uint32).tobytes())
+        columns.timestamp.frombytes(np.round(np.nan_to_num(timestamp) * 1_000_000).astype(np.int64).tobytes())
+        columns.execution_time.frombytes(np.asarray(execution_time, dtype=np.float32).tobytes())
+        columns.success.frombytes(np.asarray(success, dtype=np.int8).tobytes())
+        return columns
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], keep_payloads: bool = True) -> 'ToolCallColumns':
+        columns = cls(keep_payloads)
+        columns.extend_records(records)
+        return columns
+
+    def __len__(self) -> int:
+        return len(self.tool_code)
+
+    def __getitem__(self, i: int):
+        from tool_tracker import ToolCall
+        if i < 0:
+            i += len(self)
+        tool_call = ToolCall(
+            self.names[self.tool_code[i]],
+            self.arguments[i] if self.keep_payloads else None,
+            self.results[i] if self.keep_payloads else None,
+            timestamp=from_micros(self.timestamp[i]),
+        )
+        execution_time = self.execution_time[i]
+        # float32 precision: drop the digits float32 cannot hold (0.1, not 0.10000000149011612)
+        tool_call.execution_time = None if execution_time != execution_time else float(f"{execution_time:.7g}")
+        return tool_call
+
+    def __iter__(self) -> Iterator:
+        return (self[i] for i in range(len(self)))
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """
+        NumPy copies of the columns: tool_code, timestamp, execution_time and
+        success. (Copies, because an array buffer cannot grow while NumPy views it.)
+        """
+        with self._lock:
+            return {
+                "tool_code": np.frombuffer(self.tool_code, dtype=np.uint32).copy(),
+                "timestamp": np.frombuffer(self.timestamp, dtype=np.int64).copy(),
+                "execution_time": np.frombuffer(self.execution_time, dtype=np.float32).copy(),
+                "success": np.frombuffer(self.success, dtype=np.int8).astype(bool),
+            }
+
+    def nbytes(self) -> int:
+        """Bytes held by the column buffers (excluding payloads)"""
+        return sum(a.buffer_info()[1] * a.itemsize
+                   for a in (self.tool_code, self.timestamp, self.execution_time, self.success))
+
+    def per_tool(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Vectorized per-tool aggregates: count, timed (calls with an execution
+        time), total_execution_time and failures.
+        """
+        cols = self.columns()
+        n_tools = int(cols["tool_code"].max()) + 1 if len(cols["tool_code"]) else 0
+        codes = cols["tool_code"]
+        times = cols["execution_time"].astype(np.float64)
+        timed = ~np.isnan(times)
+        count = np.bincount(codes, minlength=n_tools)
+        timed_count = np.bincount(codes[timed], minlength=n_tools)
+        total = np.bincount(codes[timed], weights=times[timed], minlength=n_tools)
+        failures = np.bincount(codes[~cols["success"]], minlength=n_tools)
+        return {
+            name: {
+                "count": int(count[code]),
+                "timed": int(timed_count[code]),
+                "total_execution_time": float(total[code]),
+                "failures": int(failures[code]),
+            }
+            for code, name in enumerate(self.names[:n_tools]) if count[code]
+        }
+
+def time_buckets(timestamp: np.ndarray, interval: str = "hour") -> Tuple[List[str], np.ndarray]:
+    """
+    Sorted local-time bucket labels for epoch-microsecond timestamps
+    ('minute' -> "%Y-%m-%d %H:%M", 'hour' -> "%Y-%m-%d %H:00", anything else
+    -> "%Y-%m-%d") and, per timestamp, the index of its label. Only distinct
+    minutes are formatted, not every call.
+    """
+    fmt = {"minute": "%Y-%m-%d %H:%M", "hour": "%Y-%m-%d %H:00"}.get(interval, "%Y-%m-%d")
+    # UTC offsets are whole minutes, so epoch minutes map onto local minutes.
+    minutes, minute_index = np.unique(np.asarray(timestamp) // 60_000_000, return_inverse=True)
+    labels = [datetime.datetime.fromtimestamp(int(m) * 60).strftime(fmt) for m in minutes]
+    unique_labels, label_index = np.unique(np.array(labels, dtype=str), return_inverse=True)
+    return unique_labels.tolist(), label_index.reshape(-1)[minute_index.reshape(-1)]
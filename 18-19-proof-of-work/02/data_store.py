@@ -1,20 +1,112 @@
 # data_store.py
+import os
 import json
+import sqlite3
 import datetime
-from typing import Dict, List, Any, Optional
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Any, Optional, Iterable
 
-class DataStore:
+from aggregates import StatsAggregator
+from columnar import ToolCallColumns, parse_record
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+def _epoch(timestamp) -> Optional[float]:
+    """Epoch seconds for an ISO string or datetime (naive = local time), None if unparseable."""
+    try:
+        if isinstance(timestamp, str):
+            timestamp = datetime.datetime.fromisoformat(timestamp)
+        return timestamp.timestamp()
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+class StorageBackend(ABC):
     """
-    Handles the storage and retrieval of tool call data.
-    
-    This class provides an abstraction over the storage mechanism,
-    allowing for different backends to be used.
+    Interface for DataStore backends. Subclasses must implement every
+    abstract method; columns() and close() have defaults.
+
+    Records are tool call dictionaries (as produced by ToolCall.to_dict);
+    backends assign each one an increasing "id". With `max_entries` set, a
+    backend keeps only the newest `max_entries` records. Backends keep
+    per-tool StatsAggregator state up to date on every add (and retention
+    delete) and persist it with the records, so stats() costs O(number of
+    tools) however long the history is.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries
+
+    @abstractmethod
+    def add(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Store records (in one batch) and return their ids"""
+
+    @abstractmethod
+    def query(self,
+              tool_name: Optional[str] = None,
+              start_time: Optional[datetime.datetime] = None,
+              end_time: Optional[datetime.datetime] = None,
+              limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return matching records, oldest first"""
+
+    def columns(self,
+                tool_name: Optional[str] = None,
+                start_time: Optional[datetime.datetime] = None,
+                end_time: Optional[datetime.datetime] = None) -> ToolCallColumns:
+        """Matching records as columns (tool, timestamp, execution time, success), without payloads"""
+        return ToolCallColumns.from_records(self.query(tool_name, start_time, end_time), keep_payloads=False)
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of stored records"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """Per-tool call counts and execution time statistics (see DataStore.get_stats)"""
+
+    @staticmethod
+    def _stats_result(aggregates: StatsAggregator) -> Dict[str, Any]:
+        summaries = aggregates.summaries()
+        return {
+            "total_calls": sum(s["count"] for s in summaries.values()),
+            "tool_counts": {name: s["count"] for name, s in summaries.items()},
+            "execution_times": {
+                name: s["avg_execution_time"] for name, s in summaries.items() if s["timed_calls"]
+            },
+            "tool_stats": summaries
+        }
+
+    @abstractmethod
+    def metadata(self) -> Dict[str, Any]:
+        """created_at / updated_at / version of the store"""
+
+    @abstractmethod
+    def clear(self):
+        """Delete every record (and the aggregates)"""
+
+    def close(self):
+        pass
+
+class JSONStorageBackend(StorageBackend):
     """
-    
-    def __init__(self, storage_path: str = "tool_calls_db.json"):
+    Keeps every record in memory and rewrites the whole JSON file on each
+    change. Simple and human-readable; fine for small histories. The
+    aggregates are saved under "stats" (and rebuilt once for older files).
+    """
+
+    def __init__(self, storage_path: str, max_entries: Optional[int] = None):
+        super().__init__(max_entries)
         self.storage_path = storage_path
         self.data = self._load()
-        
+        if "stats" in self.data:
+            self.aggregates = StatsAggregator.from_dict(self.data["stats"])
+        else:
+            self.aggregates = StatsAggregator()
+            self.aggregates.add_records(self.data["tool_calls"])
+
     def _load(self) -> Dict[str, Any]:
         """Load data from storage"""
         try:
@@ -24,106 +116,372 @@ class DataStore:
             return {
                 "tool_calls": [],
                 "metadata": {
-                    "created_at": datetime.datetime.now().isoformat(),
-                    "updated_at": datetime.datetime.now().isoformat(),
+                    "created_at": _now(),
+                    "updated_at": _now(),
                     "version": "1.0.0"
                 }
             }
-    
+
     def _save(self):
         """Save data to storage"""
-        self.data["metadata"]["updated_at"] = datetime.datetime.now().isoformat()
+        self.data["metadata"]["updated_at"] = _now()
+        self.data["stats"] = self.aggregates.to_dict()
         with open(self.storage_path, 'w') as f:
             json.dump(self.data, f, indent=2)
-    
+
+    def add(self, records: List[Dict[str, Any]]) -> List[int]:
+        tool_calls = self.data["tool_calls"]
+        next_id = tool_calls[-1]["id"] + 1 if tool_calls else 1
+        ids = list(range(next_id, next_id + len(records)))
+        tool_calls.extend({**record, "id": i} for record, i in zip(records, ids))
+        self.aggregates.add_records(records)
+        if self.max_entries is not None and len(tool_calls) > self.max_entries:
+            self.aggregates.remove_records(tool_calls[:len(tool_calls) - self.max_entries])
+            del tool_calls[:len(tool_calls) - self.max_entries]
+            stale = set(self.aggregates.stale_extrema())
+            if stale:
+                times = {name: [] for name in stale}
+                for parsed in map(parse_record, tool_calls):
+                    if parsed is not None and parsed[0] in stale and parsed[2] is not None:
+                        times[parsed[0]].append(parsed[2])
+                for name, values in times.items():
+                    self.aggregates.tools[name].set_extrema(min(values, default=None), max(values, default=None))
+        self._save()
+        return ids
+
+    def query(self, tool_name=None, start_time=None, end_time=None, limit=None):
+        results = self.data["tool_calls"]
+
+        if tool_name:
+            results = [r for r in results if r["tool_name"] == tool_name]
+
+        if start_time:
+            start_str = start_time.isoformat()
+            results = [r for r in results if r["timestamp"] >= start_str]
+
+        if end_time:
+            end_str = end_time.isoformat()
+            results = [r for r in results if r["timestamp"] <= end_str]
+
+        if limit:
+            results = results[:limit]
+
+        return results
+
+    def count(self) -> int:
+        return len(self.data["tool_calls"])
+
+    def stats(self) -> Dict[str, Any]:
+        return self._stats_result(self.aggregates)
+
+    def metadata(self) -> Dict[str, Any]:
+        return self.data["metadata"]
+
+    def clear(self):
+        self.data["tool_calls"] = []
+        self.aggregates.clear()
+        self._save()
+
+class SQLiteStorageBackend(StorageBackend):
+    """
+    SQLite (WAL mode) storage with indexes on tool_name and timestamp, so
+    filtered queries over millions of calls are index range scans.
+
+    Timestamps are indexed as epoch seconds; each record is also kept as
+    JSON so it round-trips unchanged. Batches passed to add() are inserted
+    in one transaction, and retention (max_entries) deletes the oldest rows
+    in the same transaction. The per-tool aggregates live in the tool_stats
+    table and are read, updated and written back for the touched tools in
+    that transaction too, so several processes can share one database.
+    """
+
+    def __init__(self, storage_path: str, max_entries: Optional[int] = None):
+        super().__init__(max_entries)
+        self.storage_path = storage_path
+        self._local = threading.local()
+        db = self._connect()
+        with db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS tool_calls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    tool_name TEXT NOT NULL,
+                    timestamp REAL,
+                    execution_time REAL,
+                    success INTEGER NOT NULL,
+                    record TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS tool_calls_tool_time ON tool_calls (tool_name, timestamp);
+                CREATE INDEX IF NOT EXISTS tool_calls_time ON tool_calls (timestamp);
+                CREATE TABLE IF NOT EXISTS metadata (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE IF NOT EXISTS tool_stats (tool_name TEXT PRIMARY KEY, state TEXT NOT NULL);
+            """)
+            db.executemany(
+                "INSERT OR IGNORE INTO metadata (key, value) VALUES (?, ?)",
+                [("created_at", _now()), ("updated_at", _now()), ("version", "1.0.0")],
+            )
+        self._transaction(self._ensure_stats)
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections are not shareable by default).
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.storage_path, timeout=30)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _transaction(self, fn, *args):
+        """Run fn(db, *args) in a write transaction (BEGIN IMMEDIATE: no lost updates between processes)"""
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(db, *args)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return result
+
+    def _ensure_stats(self, db):
+        # Databases written before aggregates existed get them rebuilt once.
+        if db.execute("SELECT 1 FROM metadata WHERE key = 'stats_version'").fetchone():
+            return
+        aggregates = StatsAggregator()
+        for tool_name, execution_time, success in db.execute(
+                "SELECT tool_name, execution_time, success FROM tool_calls ORDER BY id"):
+            aggregates.add(tool_name, execution_time, bool(success))
+        self._store_stats(db, aggregates, aggregates.tools)
+        db.execute("INSERT INTO metadata (key, value) VALUES ('stats_version', '1')")
+
+    @staticmethod
+    def _load_stats(db, tool_names) -> StatsAggregator:
+        names = list(tool_names)
+        rows = db.execute(
+            f"SELECT tool_name, state FROM tool_stats WHERE tool_name IN ({','.join('?' * len(names))})", names
+        ) if names else []
+        return StatsAggregator.from_dict({name: json.loads(state) for name, state in rows})
+
+    @staticmethod
+    def _store_stats(db, aggregates: StatsAggregator, tool_names):
+        for name in tool_names:
+            if name in aggregates.tools:
+                db.execute("INSERT OR REPLACE INTO tool_stats (tool_name, state) VALUES (?, ?)",
+                           (name, json.dumps(aggregates.tools[name].to_dict())))
+            else:
+                db.execute("DELETE FROM tool_stats WHERE tool_name = ?", (name,))
+
+    def add(self, records: List[Dict[str, Any]]) -> List[int]:
+        rows = [
+            (
+                record["tool_name"],
+                _epoch(record.get("timestamp")),
+                record.get("execution_time"),
+                record.get("result") is not None,
+                json.dumps(record, default=str),
+            )
+            for record in records
+        ]
+        return self._transaction(self._add, rows)
+
+    def _add(self, db, rows) -> List[int]:
+        db.executemany(
+            "INSERT INTO tool_calls (tool_name, timestamp, execution_time, success, record) "
+            "VALUES (?, ?, ?, ?, ?)", rows
+        )
+        # Rows inserted in one write transaction get consecutive ids.
+        last = db.execute("SELECT last_insert_rowid()").fetchone()[0]
+        ids = list(range(last - len(rows) + 1, last + 1)) if rows else []
+        removed = []
+        if ids and self.max_entries is not None:
+            # Ids only grow and only the oldest rows are ever deleted, so this keeps the newest max_entries.
+            cutoff = ids[-1] - self.max_entries
+            removed = db.execute(
+                "SELECT tool_name, execution_time, success FROM tool_calls WHERE id <= ?", (cutoff,)
+            ).fetchall()
+            db.execute("DELETE FROM tool_calls WHERE id <= ?", (cutoff,))
+
+        touched = {row[0] for row in rows} | {row[0] for row in removed}
+        aggregates = self._load_stats(db, touched)
+        for tool_name, _, execution_time, success, _ in rows:
+            aggregates.add(tool_name, execution_time, success)
+        for tool_name, execution_time, success in removed:
+            aggregates.remove(tool_name, execution_time, bool(success))
+        for name in aggregates.stale_extrema():
+            aggregates.tools[name].set_extrema(*db.execute(
+                "SELECT MIN(execution_time), MAX(execution_time) FROM tool_calls WHERE tool_name = ?", (name,)
+            ).fetchone())
+        self._store_stats(db, aggregates, touched)
+        db.execute("UPDATE metadata SET value = ? WHERE key = 'updated_at'", (_now(),))
+        return ids
+
+    @staticmethod
+    def _where(tool_name, start_time, end_time):
+        clauses, args = [], []
+        if tool_name:
+            clauses.append("tool_name = ?")
+            args.append(tool_name)
+        if start_time:
+            clauses.append("timestamp >= ?")
+            args.append(_epoch(start_time))
+        if end_time:
+            clauses.append("timestamp <= ?")
+            args.append(_epoch(end_time))
+        return f"WHERE {' AND '.join(clauses)}" if clauses else "", args
+
+    def query(self, tool_name=None, start_time=None, end_time=None, limit=None):
+        where, args = self._where(tool_name, start_time, end_time)
+        rows = self._connect().execute(
+            f"SELECT id, record FROM tool_calls {where} ORDER BY timestamp, id LIMIT ?",
+            (*args, limit or -1),
+        )
+        return [{**json.loads(record), "id": row_id} for row_id, record in rows]
+
+    def columns(self, tool_name=None, start_time=None, end_time=None):
+        # Only the scalar columns are read: no JSON decoding.
+        where, args = self._where(tool_name, start_time, end_time)
+        rows = self._connect().execute(
+            f"SELECT tool_name, timestamp, execution_time, success FROM tool_calls {where} "
+            "ORDER BY timestamp, id", args
+        ).fetchall()
+        if not rows:
+            return ToolCallColumns(keep_payloads=False)
+        return ToolCallColumns.from_columns(*zip(*rows))
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM tool_calls").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._connect().execute("SELECT tool_name, state FROM tool_stats")
+        return self._stats_result(StatsAggregator.from_dict({name: json.loads(state) for name, state in rows}))
+
+    def metadata(self) -> Dict[str, Any]:
+        return dict(self._connect().execute("SELECT key, value FROM metadata"))
+
+    def clear(self):
+        db = self._connect()
+        with db:
+            db.execute("DELETE FROM tool_calls")
+            db.execute("DELETE FROM tool_stats")
+            db.execute("UPDATE metadata SET value = ? WHERE key = 'updated_at'", (_now(),))
+
+    def close(self):
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+def is_sqlite_path(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in SQLITE_SUFFIXES
+
+def open_backend(storage_path: str, max_entries: Optional[int] = None) -> StorageBackend:
+    """SQLite for .db/.sqlite/.sqlite3 paths, the JSON file backend otherwise"""
+    if is_sqlite_path(storage_path):
+        return SQLiteStorageBackend(storage_path, max_entries)
+    return JSONStorageBackend(storage_path, max_entries)
+
+class DataStore:
+    """
+    Handles the storage and retrieval of tool call data.
+
+    This class provides an abstraction over the storage mechanism,
+    allowing for different backends to be used: pass a StorageBackend, or
+    a storage_path whose extension picks one (.db/.sqlite/.sqlite3 for
+    SQLite, anything else for a JSON file).
+    """
+
+    def __init__(self,
+                 storage_path: str = "tool_calls_db.json",
+                 backend: Optional[StorageBackend] = None,
+                 max_entries: Optional[int] = None):
+        self.storage_path = storage_path
+        self.backend = backend or open_backend(storage_path, max_entries)
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """All tool calls and metadata as one dictionary (materializes every record)"""
+        return {"tool_calls": self.backend.query(), "metadata": self.backend.metadata()}
+
     def add_tool_call(self, tool_call_data: Dict[str, Any]):
         """
         Add a tool call to the data store.
-        
+
         Args:
             tool_call_data: Dictionary containing tool call data
         """
-        self.data["tool_calls"].append({
-            **tool_call_data,
-            "id": len(self.data["tool_calls"]) + 1
-        })
-        self._save()
-    
-    def get_tool_calls(self, 
-                      tool_name: Optional[str] = None, 
+        self.backend.add([tool_call_data])
+
+    def add_tool_calls(self, tool_calls: Iterable[Dict[str, Any]]) -> List[int]:
+        """
+        Add many tool calls in one batch (one transaction for SQLite).
+
+        Args:
+            tool_calls: Dictionaries containing tool call data
+
+        Returns:
+            The ids assigned to the tool calls
+        """
+        return self.backend.add(list(tool_calls))
+
+    def get_tool_calls(self,
+                      tool_name: Optional[str] = None,
                       start_time: Optional[datetime.datetime] = None,
                       end_time: Optional[datetime.datetime] = None,
                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Retrieve tool calls from the data store with optional filtering.
-        
+
         Args:
             tool_name: Filter by tool name
             start_time: Filter by start time
             end_time: Filter by end time
             limit: Maximum number of results to return
-            
+
         Returns:
             List of tool call dictionaries
         """
-        results = self.data["tool_calls"]
-        
-        if tool_name:
-            results = [r for r in results if r["tool_name"] == tool_name]
-        
-        if start_time:
-            start_str = start_time.isoformat()
-            results = [r for r in results if r["timestamp"] >= start_str]
-        
-        if end_time:
-            end_str = end_time.isoformat()
-            results = [r for r in results if r["timestamp"] <= end_str]
-        
-        if limit:
-            results = results[:limit]
-        
-        return results
-    
+        return self.backend.query(tool_name, start_time, end_time, limit)
+
+    def get_columns(self,
+                    tool_name: Optional[str] = None,
+                    start_time: Optional[datetime.datetime] = None,
+                    end_time: Optional[datetime.datetime] = None) -> ToolCallColumns:
+        """
+        Retrieve tool calls as compact columns for vectorized analysis.
+
+        Args:
+            tool_name: Filter by tool name
+            start_time: Filter by start time
+            end_time: Filter by end time
+
+        Returns:
+            ToolCallColumns (tool codes, timestamps, execution times, success; no payloads)
+        """
+        return self.backend.columns(tool_name, start_time, end_time)
+
+    def get_metadata(self) -> Dict[str, Any]:
+        """Creation/update times and format version of the store"""
+        return self.backend.metadata()
+
     def clear(self):
         """Clear all data from the store"""
-        self.data["tool_calls"] = []
-        self._save()
-    
+        self.backend.clear()
+
+    def close(self):
+        """Release the backend's resources (database connections)"""
+        self.backend.close()
+
     def get_stats(self) -> Dict[str, Any]:
         """
         Get statistics about the data in the store.
-        
+
+        Read from aggregates the backend maintains on every insert, so this
+        costs O(number of tools) regardless of history length.
+
         Returns:
-            Dictionary of statistics
+            Dictionary of statistics: total_calls, tool_counts,
+            execution_times (average per tool) and tool_stats (per tool:
+            count, failures, success_rate, timed_calls and execution time
+            total/avg/std/min/max/p50/p95/p99; percentiles within 1%)
         """
-        tool_calls = self.data["tool_calls"]
-        
-        # Count by tool name
-        tool_counts = {}
-        for call in tool_calls:
-            tool_name = call["tool_name"]
-            if tool_name not in tool_counts:
-                tool_counts[tool_name] = 0
-            tool_counts[tool_name] += 1
-        
-        # Calculate average execution time by tool
-        execution_times = {}
-        for call in tool_calls:
-            if "execution_time" not in call:
-                continue
-                
-            tool_name = call["tool_name"]
-            if tool_name not in execution_times:
-                execution_times[tool_name] = {"total": 0, "count": 0, "avg": 0}
-            
-            execution_times[tool_name]["total"] += call["execution_time"]
-            execution_times[tool_name]["count"] += 1
-            execution_times[tool_name]["avg"] = (
-                execution_times[tool_name]["total"] / execution_times[tool_name]["count"]
-            )
-        
-        return {
-            "total_calls": len(tool_calls),
-            "tool_counts": tool_counts,
-            "execution_times": {k: v["avg"] for k, v in execution_times.items()}
-        }
+        return self.backend.stats()
@@ -15,7 +15,7 @@ def example_1_basic_tracking():
     print("\n=== Example 1: Basic Tool Tracking ===")
     
     # Create a tool tracker
-    tracker = ToolTracker(save_path="example_tool_calls.json")
+    tracker = ToolTracker(save_path="example_tool_calls.jsonl")
     
     # Define some example tools
     @tracker.track_tool
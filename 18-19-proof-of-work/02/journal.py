@@ -0,0 +1,229 @@
+# journal.py
+import os
+import json
+import time
+import threading
+from collections import deque
+from typing import Dict, List, Any, Callable, Iterable, Iterator, Optional
+
+class Journal:
+    """
+    Append-only JSONL journal: one JSON record per line.
+
+    Appends go through a buffered file handle, so recording a record costs
+    one json.dumps and an in-memory write regardless of how many records the
+    journal already holds. The buffer is flushed and fsynced at most every
+    `fsync_interval` seconds (and on flush()/close()), so a crash loses at
+    most that much history. A torn last line is skipped when reading. A
+    legacy JSON-array file is converted to JSONL before the first append.
+    """
+
+    def __init__(self, path: str, fsync_interval: float = 1.0, buffer_size: int = 1 << 16):
+        self.path = path
+        self.fsync_interval = fsync_interval
+        self.buffer_size = buffer_size
+        self._file = None
+        self._last_sync = time.monotonic()
+        self._unsynced = False      # records written since the last fsync
+
+    def _open(self):
+        if self._file is None:
+            # Appending lines after a JSON array would make the whole file unreadable.
+            if is_legacy_file(self.path):
+                self._rewrite(list(iter_records(self.path)))
+            self._file = open(self.path, 'a', encoding='utf-8', buffering=self.buffer_size)
+            # Terminate a line torn by a crash so the next record stays readable.
+            if self._file.tell() > 0:
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._file.write("\n")
+        return self._file
+
+    def append(self, record: Dict[str, Any]):
+        """Append one record; fsyncs if the last sync is older than fsync_interval."""
+        self._open().write(json.dumps(record, default=str) + "\n")
+        self._unsynced = True
+        self.flush_if_due()
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        """Append several records with a single write."""
+        lines = "".join(json.dumps(record, default=str) + "\n" for record in records)
+        if lines:
+            self._open().write(lines)
+            self._unsynced = True
+        self.flush_if_due()
+
+    def flush_if_due(self):
+        """fsync if records are waiting and the last sync is older than fsync_interval."""
+        if self._unsynced and time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.flush()
+
+    def flush(self, fsync: bool = True):
+        """Write buffered records to the file and (by default) fsync it."""
+        if self._file is not None:
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+        if fsync:
+            self._unsynced = False
+            self._last_sync = time.monotonic()
+
+    def close(self):
+        """Flush, fsync and close the file; the next append reopens it."""
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def compact(self, records: Iterable[Dict[str, Any]]):
+        """
+        Atomically replace the journal with `records` (e.g. the current,
+        deduplicated or trimmed history), dropping torn or corrupt lines.
+        """
+        self.close()
+        self._rewrite(records)
+
+    def _rewrite(self, records: Iterable[Dict[str, Any]]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8', buffering=self.buffer_size) as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class BackgroundWriter:
+    """
+    Hands records to a Journal from a background thread.
+
+    submit() only appends the object to a bounded in-memory ring buffer
+    (a deque; appends are atomic, so no lock is taken on the hot path). A
+    daemon thread wakes every `flush_interval` seconds, or as soon as the
+    buffer is half full, hands the buffered objects to `on_drain` (if given),
+    encodes them with `encode` and appends them to the journal. If the buffer is ever full the submitting
+    thread drains it itself rather than drop records. The thread also fsyncs
+    records left unsynced once `fsync_interval` has passed, even if no
+    more calls arrive. close() (also run at interpreter exit) drains the
+    buffer and fsyncs the journal.
+    """
+
+    def __init__(self, journal: Journal, encode: Callable[[Any], Dict[str, Any]] = dict,
+                 capacity: int = 65536, flush_interval: float = 0.1,
+                 on_drain: Optional[Callable[[List[Any]], None]] = None):
+        self.journal = journal
+        self.encode = encode
+        self.on_drain = on_drain
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self._buffer = deque()
+        self._lock = threading.Lock()       # serializes journal writes
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any):
+        """Queue one object for the journal (called on the hot path)."""
+        buffer = self._buffer
+        buffer.append(item)
+        if len(buffer) >= self.capacity // 2 or self._closed:
+            if len(buffer) >= self.capacity or self._closed:
+                self.drain()
+            else:
+                self._wakeup.set()
+
+    def drain(self):
+        """Write everything buffered so far to the journal (not fsynced)."""
+        with self._lock:
+            items = []
+            try:
+                while True:
+                    items.append(self._buffer.popleft())
+            except IndexError:
+                pass
+            if items:
+                if self.on_drain is not None:
+                    self.on_drain(items)
+                self.journal.append_many(self.encode(item) for item in items)
+
+    def flush(self):
+        """Drain the buffer and fsync the journal."""
+        self.drain()
+        with self._lock:
+            self.journal.flush()
+
+    def compact(self, records: Iterable[Dict[str, Any]]):
+        """Drain the buffer, then rewrite the journal from `records` (see Journal.compact)."""
+        self.drain()
+        with self._lock:
+            self.journal.compact(records)
+
+    def close(self):
+        """Stop the writer thread, drain the buffer and close the journal."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join()
+        self.drain()
+        with self._lock:
+            self.journal.close()
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.drain()
+            # An idle tracker still gets its last records to disk within fsync_interval.
+            with self._lock:
+                self.journal.flush_if_due()
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream records back from a journal, one line at a time.
+
+    Also reads the legacy format (a single JSON array written with
+    json.dump), which is loaded in one piece, followed by any JSONL lines
+    appended after it. Missing files yield nothing; unparseable lines (a
+    write torn by a crash) are skipped.
+    """
+    try:
+        f = open(path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        lines = f
+        if first == "[":
+            text = f.read()
+            try:
+                records, end = json.JSONDecoder().raw_decode(text, text.index("["))
+            except json.JSONDecodeError:
+                return
+            yield from (record for record in records if isinstance(record, dict))
+            lines = text[end:].splitlines()
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record, dict):
+                yield record
+
+def is_legacy_file(path: str) -> bool:
+    """True if `path` holds the old whole-file JSON array format."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read(64).lstrip().startswith("[")
+    except FileNotFoundError:
+        return False
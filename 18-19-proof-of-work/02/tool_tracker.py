@@ -1,11 +1,21 @@
 # tool_tracker.py
-import json
+import time
+import inspect
+import weakref
 import datetime
-from typing import Dict, List, Any, Optional, Callable
+import functools
+import threading
+from typing import Dict, Any, Optional, Callable, Tuple
+
+from journal import Journal, BackgroundWriter, iter_records, is_legacy_file
+from columnar import ToolCallColumns, from_micros
+from aggregates import StatsAggregator
 
 class ToolCall:
     """Represents a single tool call made by an LLM."""
     
+    __slots__ = ("tool_name", "arguments", "result", "timestamp", "execution_time")
+    
     def __init__(self, 
                  tool_name: str, 
                  arguments: Dict[str, Any], 
@@ -39,19 +49,72 @@ class ToolCall:
         instance.execution_time = data.get("execution_time")
         return instance
 
+# What the hot path records: (tool_name, arguments, result, epoch microseconds, execution_time)
+RecordedCall = Tuple[str, Dict[str, Any], Any, int, float]
+
+def _encode_call(call: RecordedCall) -> Dict[str, Any]:
+    """Journal record for a recorded call (same shape as ToolCall.to_dict)"""
+    tool_name, arguments, result, timestamp, execution_time = call
+    return {
+        "tool_name": tool_name,
+        "arguments": arguments,
+        "result": result,
+        "timestamp": from_micros(timestamp).isoformat(),
+        "execution_time": execution_time
+    }
+
 class ToolTracker:
     """
     Tracks tool calls made by an LLM.
     
     This class provides middleware functionality to intercept tool calls,
     log them, and allow for analysis and visualization.
+
+    Each call is appended to a JSONL journal at `save_path` (see journal.py),
+    so recording costs the same at the 100,000th call as at the first. The
+    wrapper itself only times the call and hands the record to a background
+    writer, so disk I/O is never part of a tool's measured latency. Tracked
+    tools may be called from many threads, and `async def` tools are
+    wrapped as coroutines. Appends are fsynced at most every
+    `fsync_interval` seconds; save() forces everything to disk, and pending
+    records are flushed at interpreter exit. The writer drains its buffer
+    (`buffer_capacity` records) every `flush_interval` seconds.
+
+    In memory, calls are kept column-wise (see columnar.py): `tool_calls`
+    is a ToolCallColumns that yields ToolCall rows on access. With
+    `keep_payloads=False` arguments and results are only kept in the
+    journal, which takes a million calls to about 17 MB.
+
+    Per-tool statistics (see aggregates.py) are updated as the writer
+    drains each batch, so get_tool_usage_stats() costs O(number of tools)
+    however many calls have been recorded.
     """
     
-    def __init__(self, save_path: str = "tool_calls.json"):
-        self.tool_calls: List[ToolCall] = []
+    def __init__(self, save_path: str = "tool_calls.jsonl", fsync_interval: float = 1.0,
+                 buffer_capacity: int = 65536, flush_interval: float = 0.1,
+                 keep_payloads: bool = True):
         self.save_path = save_path
         self.filters: Dict[str, bool] = {}  # Tool name -> whether to track
+        self.journal = Journal(save_path, fsync_interval=fsync_interval)
+        self._calls = ToolCallColumns(keep_payloads)
+        self._stats = StatsAggregator()
+        self._stats_lock = threading.Lock()
+        self.writer = BackgroundWriter(self.journal, encode=_encode_call,
+                                       capacity=buffer_capacity, flush_interval=flush_interval,
+                                       on_drain=self._on_drain(self._calls, self._stats, self._stats_lock))
+        weakref.finalize(self, self.writer.close)
         
+    @staticmethod
+    def _on_drain(calls: ToolCallColumns, stats: StatsAggregator, lock: threading.Lock):
+        # Closes over the containers rather than self, so the writer keeps no
+        # reference to the tracker and weakref.finalize can still fire.
+        def on_drain(items):
+            calls.extend(items)
+            with lock:
+                for tool_name, _, result, _, execution_time in items:
+                    stats.add(tool_name, execution_time, result is not None)
+        return on_drain
+    
     def track_tool(self, func: Callable) -> Callable:
         """
         Decorator to track tool calls.
@@ -61,35 +124,49 @@ class ToolTracker:
             def my_tool(arg1, arg2):
                 return result
         """
-        def wrapper(*args, **kwargs):
-            # Create a tool call record
-            tool_name = func.__name__
-            
-            # Skip if this tool is filtered out
-            if tool_name in self.filters and not self.filters[tool_name]:
-                return func(*args, **kwargs)
-            
-            arguments = {
+        tool_name = func.__name__
+        
+        submit = self.writer.submit
+        
+        def arguments(args, kwargs) -> Dict[str, Any]:
+            return {
                 **{f"arg{i}": arg for i, arg in enumerate(args)},
                 **kwargs
             }
-            
-            tool_call = ToolCall(tool_name, arguments)
-            start_time = datetime.datetime.now()
-            
+        
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                # Skip if this tool is filtered out
+                if not self.filters.get(tool_name, True):
+                    return await func(*args, **kwargs)
+                timestamp = time.time_ns() // 1000
+                start_time = time.perf_counter()
+                result = None
+                try:
+                    result = await func(*args, **kwargs)
+                    return result
+                finally:
+                    # The writer's deque.append is atomic: no lock on the hot path
+                    submit((tool_name, arguments(args, kwargs), result, timestamp,
+                            time.perf_counter() - start_time))
+            return async_wrapper
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Skip if this tool is filtered out
+            if not self.filters.get(tool_name, True):
+                return func(*args, **kwargs)
+            timestamp = time.time_ns() // 1000
+            start_time = time.perf_counter()
+            result = None
             try:
                 # Execute the actual tool function
                 result = func(*args, **kwargs)
-                tool_call.result = result
                 return result
             finally:
-                # Record execution time
-                end_time = datetime.datetime.now()
-                tool_call.execution_time = (end_time - start_time).total_seconds()
-                
-                # Store the tool call
-                self.tool_calls.append(tool_call)
-                self.save()
+                submit((tool_name, arguments(args, kwargs), result, timestamp,
+                        time.perf_counter() - start_time))
         
         return wrapper
     
@@ -103,57 +180,62 @@ class ToolTracker:
         """
         self.filters.update(filters)
     
+    @property
+    def tool_calls(self) -> ToolCallColumns:
+        """All tracked calls, including ones still buffered for the writer"""
+        self.writer.drain()
+        return self._calls
+    
     def save(self):
-        """Save the current tool calls to a file"""
-        data = [tool_call.to_dict() for tool_call in self.tool_calls]
-        with open(self.save_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        """Write pending tool calls to the journal and fsync it"""
+        self.writer.flush()
+    
+    def close(self):
+        """Flush pending tool calls, stop the writer thread and close the journal"""
+        self.writer.close()
+    
+    def compact(self):
+        """Rewrite the journal one record per line, dropping torn lines"""
+        # Streamed from the journal itself: it has full-precision times and all payloads.
+        self.writer.compact(iter_records(self.save_path))
     
     def load(self):
-        """Load tool calls from a file"""
-        try:
-            with open(self.save_path, 'r') as f:
-                data = json.load(f)
-            self.tool_calls = [ToolCall.from_dict(item) for item in data]
-        except (FileNotFoundError, json.JSONDecodeError):
-            self.tool_calls = []
+        """Load tool calls from the journal, streaming it record by record"""
+        self.writer.flush()
+        self._calls.clear()
+        self._calls.extend_records(iter_records(self.save_path))
+        with self._stats_lock:
+            self._stats.clear()
+            self._stats.add_records(iter_records(self.save_path))
+        # A whole-file JSON array from older versions becomes a journal.
+        if is_legacy_file(self.save_path):
+            self.compact()
     
     def get_tool_usage_stats(self) -> Dict[str, Dict[str, Any]]:
         """
         Get statistics about tool usage.
         
         Returns:
-            Dictionary mapping tool names to statistics about their usage.
+            Dictionary mapping tool names to statistics about their usage:
+            count, failures, success_rate and execution time
+            total/avg/std/min/max/p50/p95/p99 (percentiles within 1%).
         """
+        self.writer.drain()
         stats = {}
         
-        for tool_call in self.tool_calls:
-            tool_name = tool_call.tool_name
-            
-            if tool_name not in stats:
-                stats[tool_name] = {
-                    "count": 0,
-                    "avg_execution_time": 0,
-                    "total_execution_time": 0,
-                    "success_rate": 0,
-                    "failures": 0
-                }
-            
-            stats[tool_name]["count"] += 1
-            
-            if tool_call.execution_time is not None:
-                stats[tool_name]["total_execution_time"] += tool_call.execution_time
-                stats[tool_name]["avg_execution_time"] = (
-                    stats[tool_name]["total_execution_time"] / stats[tool_name]["count"]
-                )
-            
-            # Assuming None results indicate failure
-            if tool_call.result is None:
-                stats[tool_name]["failures"] += 1
-            
-            stats[tool_name]["success_rate"] = (
-                (stats[tool_name]["count"] - stats[tool_name]["failures"]) / 
-                stats[tool_name]["count"]
-            )
+        # Maintained incrementally as calls are recorded
+        with self._stats_lock:
+            summaries = self._stats.summaries()
+        for tool_name, summary in summaries.items():
+            count = summary["count"]
+            stats[tool_name] = {
+                "count": count,
+                "avg_execution_time": summary["total_execution_time"] / count,
+                "total_execution_time": summary["total_execution_time"],
+                "success_rate": summary["success_rate"],
+                "failures": summary["failures"],
+                **{f"{key}_execution_time": summary[f"{key}_execution_time"]
+                   for key in ("std", "min", "max", "p50", "p95", "p99")}
+            }
             
         return stats
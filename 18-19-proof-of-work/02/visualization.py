@@ -1,7 +1,11 @@
 # visualization.py
 import json
-import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from columnar import ToolCallColumns, from_micros, time_buckets
+from data_store import DataStore, is_sqlite_path
 
 class DataVisualizer:
     """
@@ -9,23 +13,35 @@ class DataVisualizer:
     
     This class contains methods to generate various visualization formats
     like JSON for charts, CSV data, and more.
+
+    Tool calls are loaded as ToolCallColumns (interned tool codes, int64
+    timestamps, float32 execution times; no arguments or results), and
+    every chart is computed with vectorized NumPy aggregations.
     """
     
     def __init__(self, data_source: str = "tool_calls_db.json"):
         self.data_source = data_source
-        self.data = self._load_data()
+        self.calls, self.metadata = self._load_data()
     
-    def _load_data(self) -> Dict[str, Any]:
-        """Load data from the source file"""
+    def _load_data(self) -> Tuple[ToolCallColumns, Dict[str, Any]]:
+        """Load data from the source file (a JSON file or a SQLite data store)"""
+        if is_sqlite_path(self.data_source):
+            store = DataStore(self.data_source)
+            try:
+                return store.get_columns(), store.get_metadata()
+            finally:
+                store.close()
         try:
             with open(self.data_source, 'r') as f:
-                return json.load(f)
+                data = json.load(f)
         except (FileNotFoundError, json.JSONDecodeError):
-            return {"tool_calls": [], "metadata": {}}
+            data = {}
+        calls = ToolCallColumns.from_records(data.get("tool_calls", []), keep_payloads=False)
+        return calls, data.get("metadata", {})
     
     def refresh(self):
         """Reload data from the source"""
-        self.data = self._load_data()
+        self.calls, self.metadata = self._load_data()
     
     def get_tool_usage_time_series(self, 
                                   interval: str = "hour",
@@ -40,67 +56,35 @@ class DataVisualizer:
         Returns:
             Dictionary with labels and datasets for time series visualization
         """
-        if not self.data.get("tool_calls"):
+        if not len(self.calls):
             return {"labels": [], "datasets": []}
         
+        cols = self.calls.columns()
+        codes, timestamps = cols["tool_code"], cols["timestamp"]
+        
         # Filter tool calls if needed
-        tool_calls = self.data["tool_calls"]
         if tool_names:
-            tool_calls = [call for call in tool_calls if call["tool_name"] in tool_names]
+            wanted = [self.calls.names.index(name) for name in tool_names if name in self.calls.names]
+            mask = np.isin(codes, wanted)
+            codes, timestamps = codes[mask], timestamps[mask]
+        if not len(codes):
+            return {"labels": [], "datasets": []}
         
-        # Group by time interval
-        time_buckets = {}
-        tool_sets = {}
+        # Group by time interval: one bincount over (time bucket, tool) cells
+        labels, bucket = time_buckets(timestamps, interval)
+        n_tools = len(self.calls.names)
+        counts = np.bincount(bucket * n_tools + codes, minlength=len(labels) * n_tools)
+        counts = counts.reshape(len(labels), n_tools)
         
-        for call in tool_calls:
-            try:
-                timestamp = datetime.datetime.fromisoformat(call["timestamp"])
-                
-                # Format the timestamp according to the interval
-                if interval == "minute":
-                    time_key = timestamp.strftime("%Y-%m-%d %H:%M")
-                elif interval == "hour":
-                    time_key = timestamp.strftime("%Y-%m-%d %H:00")
-                else:  # day
-                    time_key = timestamp.strftime("%Y-%m-%d")
-                
-                # Initialize the time bucket if needed
-                if time_key not in time_buckets:
-                    time_buckets[time_key] = {}
-                
-                # Initialize the tool count for this time bucket
-                tool_name = call["tool_name"]
-                if tool_name not in time_buckets[time_key]:
-                    time_buckets[time_key][tool_name] = 0
-                
-                # Add to the count
-                time_buckets[time_key][tool_name] += 1
-                
-                # Track unique tools
-                tool_sets[tool_name] = True
-            except (ValueError, KeyError):
-                # Skip invalid entries
-                continue
-        
-        # Sort time keys
-        sorted_time_keys = sorted(time_buckets.keys())
-        
-        # Prepare the result
-        unique_tools = sorted(tool_sets.keys())
-        datasets = []
-        
-        for tool in unique_tools:
-            data_points = []
-            for time_key in sorted_time_keys:
-                data_points.append(time_buckets[time_key].get(tool, 0))
-            
-            datasets.append({
-                "label": tool,
-                "data": data_points
-            })
+        # Prepare the result (tools sorted by name)
+        present = np.flatnonzero(counts.sum(axis=0))
+        datasets = [
+            {"label": self.calls.names[code], "data": counts[:, code].tolist()}
+            for code in sorted(present, key=lambda c: self.calls.names[c])
+        ]
         
         return {
-            "labels": sorted_time_keys,
+            "labels": labels,
             "datasets": datasets
         }
     
@@ -111,27 +95,13 @@ class DataVisualizer:
         Returns:
             Dictionary with labels and values for execution time visualization
         """
-        if not self.data.get("tool_calls"):
+        if not len(self.calls):
             return {"labels": [], "values": []}
         
-        # Calculate average execution time by tool
-        execution_times = {}
-        
-        for call in self.data["tool_calls"]:
-            if "execution_time" not in call:
-                continue
-                
-            tool_name = call["tool_name"]
-            if tool_name not in execution_times:
-                execution_times[tool_name] = {"total": 0, "count": 0}
-            
-            execution_times[tool_name]["total"] += call["execution_time"]
-            execution_times[tool_name]["count"] += 1
-        
-        # Calculate averages
+        # Calculate average execution time by tool (calls with a known time)
         averages = {
-            tool: data["total"] / data["count"]
-            for tool, data in execution_times.items()
+            tool: data["total_execution_time"] / data["timed"]
+            for tool, data in self.calls.per_tool().items() if data["timed"]
         }
         
         # Sort by average execution time
@@ -149,23 +119,14 @@ class DataVisualizer:
         Returns:
             Dictionary with labels and values for success rate visualization
         """
-        if not self.data.get("tool_calls"):
+        if not len(self.calls):
             return {"labels": [], "success": [], "failure": []}
         
-        # Calculate success/failure counts by tool
-        results = {}
-        
-        for call in self.data["tool_calls"]:
-            tool_name = call["tool_name"]
-            
-            if tool_name not in results:
-                results[tool_name] = {"success": 0, "failure": 0}
-            
-            # Assuming None results indicate failure
-            if call.get("result") is None:
-                results[tool_name]["failure"] += 1
-            else:
-                results[tool_name]["success"] += 1
+        # Calculate success/failure counts by tool (None results count as failures)
+        results = {
+            tool: {"success": data["count"] - data["failures"], "failure": data["failures"]}
+            for tool, data in self.calls.per_tool().items()
+        }
         
         # Sort by success rate
         def success_rate(tool):
@@ -191,19 +152,20 @@ class DataVisualizer:
         Returns:
             Path to the created CSV file
         """
-        if not self.data.get("tool_calls"):
+        if not len(self.calls):
             return "No data to export"
         
         # Create CSV content
         csv_lines = ["timestamp,tool_name,execution_time,success"]
         
-        for call in self.data["tool_calls"]:
-            timestamp = call.get("timestamp", "")
-            tool_name = call.get("tool_name", "")
-            execution_time = call.get("execution_time", "")
-            success = "true" if call.get("result") is not None else "false"
+        calls = self.calls
+        for code, timestamp, execution_time, success in zip(
+                calls.tool_code, calls.timestamp, calls.execution_time, calls.success):
+            timestamp = from_micros(timestamp).isoformat()
+            execution_time = "" if execution_time != execution_time else float(f"{execution_time:.7g}")
+            success = "true" if success else "false"
             
-            csv_lines.append(f"{timestamp},{tool_name},{execution_time},{success}")
+            csv_lines.append(f"{timestamp},{calls.names[code]},{execution_time},{success}")
         
         # Write to file
         csv_content = "\n".join(csv_lines)
@@ -223,6 +185,6 @@ class DataVisualizer:
             "time_series": self.get_tool_usage_time_series(),
             "execution_times": self.get_tool_execution_time_data(),
             "success_rates": self.get_tool_success_rate_data(),
-            "metadata": self.data.get("metadata", {}),
-            "total_calls": len(self.data.get("tool_calls", []))
+            "metadata": self.metadata,
+            "total_calls": len(self.calls)
         }
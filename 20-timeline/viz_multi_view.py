@@ -12,12 +12,16 @@ import os
 import json
 import argparse
 from build_knowledge_graph import build_graph
+from graph_layout import LayoutCache
 from build_timeline_data import build_timeline_data
 try:
     from pyvis.network import Network
 except ImportError:
     raise ImportError("pyvis is required to run this script: pip install pyvis")
 
+# graph_layout positions are roughly in [-1, 1]; vis.js coordinates are pixels.
+LAYOUT_SCALE = 600
+
 def main():
     parser = argparse.ArgumentParser(
         description='Visualize provenance with graph, timeline, and messages panes'
@@ -25,6 +29,8 @@ def main():
     parser.add_argument('input_json', help='Path to proof_of_work JSON file')
     parser.add_argument('-o', '--output', help='Output HTML file', default=None)
     parser.add_argument('--title', help='Title for the visualization', default=None)
+    parser.add_argument('--no-layout-cache', action='store_true',
+                        help='Let vis.js physics place the nodes instead of the cached layout')
     args = parser.parse_args()
 
     # Load provenance JSON
@@ -34,6 +40,14 @@ def main():
 
     # Build networkx graph and export to vis DataSets
     G = build_graph(provenance)
+
+    # Fixed positions from the cached layout (<input>.layout.json); only new nodes are placed.
+    if not args.no_layout_cache:
+        base = os.path.splitext(args.input_json)[0]
+        pos = LayoutCache(f"{base}.layout.json").layout(G, seed=0)
+        for node, (x, y) in pos.items():
+            G.nodes[node]['x'], G.nodes[node]['y'] = float(x) * LAYOUT_SCALE, float(y) * LAYOUT_SCALE
+
     net = Network(height='100%', width='100%', directed=True, notebook=False)
     if args.title:
         net.heading = args.title
@@ -72,6 +86,7 @@ def main():
     # Serialize JSON blobs for embedding
     net_nodes_json = json.dumps(net_nodes, indent=2)
     net_edges_json = json.dumps(net_edges, indent=2)
+    physics_json = json.dumps(args.no_layout_cache)
     groups_json = json.dumps(groups, indent=2)
     items_json = json.dumps(items, indent=2)
 
@@ -199,7 +214,7 @@ def main():
   var network = new vis.Network(
     document.getElementById('network'),
     graphData,
-    {{ interaction: {{ hover: true }}, edges: {{ arrows: {{ to: true }} }} }}
+    {{ interaction: {{ hover: true }}, edges: {{ arrows: {{ to: true }} }}, physics: {physics_json} }}
   );
   // ensure network knows its container size
   network.setSize('100%', '100%');
@@ -11,7 +11,7 @@ type Cmd =
   | { op: "start_timer"; seconds: number }
   | { op: "create_connector"; start_id?: string; end_id?: string };
 
-figma.ui.onmessage = async (cmd: Cmd) => {
+async function handle(cmd: Cmd) {
   switch (cmd.op) {
     case "create_sticky": {
       const sticky = figma.createSticky();
@@ -75,4 +75,13 @@ figma.ui.onmessage = async (cmd: Cmd) => {
       break;
     }
   }
+}
+
+// Commands from the server carry a job_id; report it back once the command is
+// done so the UI acknowledges it (unacknowledged commands are redelivered).
+figma.ui.onmessage = async (cmd: Cmd & { job_id?: number }) => {
+  await handle(cmd);
+  if (cmd.job_id !== undefined) {
+    figma.ui.postMessage({ ack: cmd.job_id });
+  }
 };
@@ -11,6 +11,9 @@ from image_to_data import parse_whiteboard
 
 load_dotenv()
 
+# Command channel on the MCP server; match the BOARD set in the FigJam plugin's ui.html.
+BOARD = os.getenv("MCP_BOARD", "default")
+
 @tool
 def create_sticky(text: str, x: int = 0, y: int = 0) -> str:
     """
@@ -26,7 +29,7 @@ def create_sticky(text: str, x: int = 0, y: int = 0) -> str:
     """
     resp = requests.get(
         "http://localhost:8787/mcp/create_sticky",
-        params={"text": text, "x": x, "y": y},
+        params={"text": text, "x": x, "y": y, "board": BOARD},
         timeout=5,
     )
     resp.raise_for_status()
@@ -48,7 +51,7 @@ def create_text(text: str, x: int = 0, y: int = 0) -> str:
     """
     resp = requests.get(
         "http://localhost:8787/mcp/create_text",
-        params={"text": text, "x": x, "y": y},
+        params={"text": text, "x": x, "y": y, "board": BOARD},
         timeout=5,
     )
     resp.raise_for_status()
@@ -69,7 +72,7 @@ def move_node(id: str, x: int = 0, y: int = 0) -> str:
     """
     resp = requests.get(
         "http://localhost:8787/mcp/move_node",
-        params={"id": id, "x": x, "y": y},
+        params={"id": id, "x": x, "y": y, "board": BOARD},
         timeout=5,
     )
     resp.raise_for_status()
@@ -89,7 +92,7 @@ def start_timer(seconds: int) -> str:
     """
     resp = requests.get(
         "http://localhost:8787/mcp/start_timer",
-        params={"seconds": seconds},
+        params={"seconds": seconds, "board": BOARD},
         timeout=5,
     )
     resp.raise_for_status()
@@ -108,7 +111,7 @@ def create_connector(start_id: str | None = None, end_id: str | None = None) ->
     Returns:
         str: A status message, typically "queued".
     """
-    params = {}
+    params = {"board": BOARD}
     if start_id is not None:
         params["start_id"] = start_id
     if end_id is not None:
@@ -122,6 +125,33 @@ def create_connector(start_id: str | None = None, end_id: str | None = None) ->
     data = resp.json()
     return data.get("result", "")
     
+@tool
+def queue_commands(commands: list) -> str:
+    """
+    Enqueue many whiteboard commands in one request via the MCP batch endpoint.
+    Prefer this over repeated single calls when placing more than a few elements.
+
+    Args:
+        commands: List of command dicts, each with an "op" key, e.g.
+            {"op": "create_sticky", "text": "Idea", "x": 0, "y": 0},
+            {"op": "create_text", "text": "Title", "x": 0, "y": -200},
+            {"op": "move_node", "id": "1:2", "x": 10, "y": 10},
+            {"op": "start_timer", "seconds": 300},
+            {"op": "create_connector", "start_id": "1:2", "end_id": "1:3"}.
+
+    Returns:
+        str: A status message with the number of queued commands.
+    """
+    resp = requests.post(
+        "http://localhost:8787/mcp/batch",
+        params={"board": BOARD},
+        json=commands,
+        timeout=10,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    return f"{data.get('result', '')} {data.get('count', 0)}"
+
 @tool
 def read_txt_file(filepath: str = "whiteboard.txt") -> str:
     """
@@ -177,6 +207,7 @@ def main():
         move_node,
         start_timer,
         create_connector,
+        queue_commands,
         read_txt_file
         #ingest_whiteboard,
     ])
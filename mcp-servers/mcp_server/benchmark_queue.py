@@ -0,0 +1,85 @@
+"""
+Push/pull throughput of the job queue backends, plus a multi-process run in
+which several consumers (like several uvicorn workers) drain one SQLite queue.
+
+    python benchmark_queue.py [--jobs 20000] [--batch 32] [--consumers 4]
+"""
+import os
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+
+from job_queue import MemoryQueue, SQLiteQueue
+
+UNBOUNDED = 10 ** 9     # max_depth: measure throughput, not backpressure
+
+CMD = {"op": "create_sticky", "text": "benchmark sticky", "x": 100, "y": 200}
+
+
+def bench(name, queue, jobs, batch):
+    start = time.perf_counter()
+    for _ in range(jobs):
+        queue.push_many([CMD])
+    push_single = jobs / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(0, jobs, batch):
+        queue.push_many([CMD] * batch)
+    push_batched = jobs / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pulled = 0
+    while True:
+        cmds = queue.pull(batch)
+        if not cmds:
+            break
+        queue.ack(cmd["job_id"] for cmd in cmds)
+        pulled += len(cmds)
+    pull_ack = pulled / (time.perf_counter() - start)
+    print(f"{name:>8}: push {push_single:9,.0f}/s single, {push_batched:9,.0f}/s batched (x{batch}); "
+          f"pull+ack {pull_ack:9,.0f}/s ({pulled} jobs)")
+
+
+def consume(path, batch, results):
+    queue = SQLiteQueue(path, max_depth=UNBOUNDED)
+    seen = []
+    while True:
+        cmds = queue.pull(batch)
+        if not cmds:
+            break
+        queue.ack(cmd["job_id"] for cmd in cmds)
+        seen.extend(cmd["job_id"] for cmd in cmds)
+    results.put(seen)
+
+
+def bench_consumers(path, jobs, batch, consumers):
+    SQLiteQueue(path, max_depth=UNBOUNDED).push_many([CMD] * jobs)
+    results = mp.Queue()
+    start = time.perf_counter()
+    procs = [mp.Process(target=consume, args=(path, batch, results)) for _ in range(consumers)]
+    for p in procs:
+        p.start()
+    seen = [job_id for _ in procs for job_id in results.get()]
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - start
+    print(f"{consumers} processes: pull+ack {len(seen) / elapsed:9,.0f}/s, "
+          f"{len(seen)} delivered, {len(set(seen))} distinct, {SQLiteQueue(path).size()} left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--consumers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bench("memory", MemoryQueue(max_depth=UNBOUNDED), args.jobs, args.batch)
+        bench("sqlite", SQLiteQueue(os.path.join(tmp, "bench.sqlite"), max_depth=UNBOUNDED), args.jobs, args.batch)
+        bench_consumers(os.path.join(tmp, "consumers.sqlite"), args.jobs, args.batch, args.consumers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,445 @@
-# mcp_server/queue.py
-from collections import deque
-from typing import Dict, Any, List
+# mcp_server/job_queue.py
+"""
+Command queue shared by the HTTP endpoints, the stdio MCP tools and the
+FigJam plugin.
 
-_QUEUE: "deque[Dict[str, Any]]" = deque()
+Commands are delivered at least once: `pull` hides each command for
+`visibility_timeout` seconds and tags it with a `job_id`. The command is
+redelivered unless it is acknowledged with `ack(job_ids)` before the timeout
+runs out, so a plugin that crashes mid-batch gets the batch again. After
+`max_deliveries` unacknowledged deliveries a command is dropped.
 
-def push(cmd: Dict[str, Any]) -> None:
-    _QUEUE.append(cmd)
+Backends (env MCP_QUEUE_BACKEND):
+  • "sqlite" (default): a WAL-mode SQLite file (env MCP_QUEUE_PATH) that any
+    number of uvicorn workers and stdio servers can share.
+  • "memory": in-process only, for tests and single-process experiments.
 
-def pull(batch: int | None = None) -> List[Dict[str, Any]]:
-    out = []
-    while _QUEUE and (batch is None or len(out) < batch):
-        out.append(_QUEUE.popleft())
-    return out
+Commands live in named channels (one per board or session, default
+"default"): pulls only see their own channel, so several boards can share
+one server without receiving each other's commands. A channel holding
+`max_depth` commands (env MCP_QUEUE_MAX_DEPTH) rejects further pushes with
+QueueFull until its consumer catches up. `metrics()` reports depth and
+delivery counters per channel.
+
+`pull_wait` is the long-poll variant: it waits until commands are ready
+(pushed by any process) or the wait runs out. Pushes through this module
+wake waiters in the same process at once; pushes from other processes and
+redeliveries are noticed by a slower background check.
+"""
+import os
+import json
+import math
+import time
+import asyncio
+import sqlite3
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Dict, Any, List, Iterable
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "job_queue.sqlite")
+VISIBILITY_TIMEOUT = float(os.environ.get("MCP_QUEUE_VISIBILITY_TIMEOUT", 30))
+MAX_DELIVERIES = 5
+MAX_DEPTH = int(os.environ.get("MCP_QUEUE_MAX_DEPTH", 10000))   # queued commands per channel
+POLL_INTERVAL = 0.5     # how often waiting pulls check the queue for other processes' pushes (seconds)
+DEFAULT_CHANNEL = "default"
+COUNTERS = ("pushed", "delivered", "redelivered", "acked", "dropped", "rejected")
+
+
+class QueueFull(Exception):
+    """Raised when a push would take a channel beyond its max_depth."""
+
+    def __init__(self, channel: str, depth: int, max_depth: int):
+        super().__init__(f"Channel {channel!r} is full ({depth}/{max_depth} queued commands)")
+        self.channel = channel
+        self.depth = depth
+        self.max_depth = max_depth
+
+
+def _check_batch(batch):
+    # None means "every ready job"; SQLite would also read LIMIT -N as no limit.
+    if batch is not None and (isinstance(batch, bool) or not isinstance(batch, int) or batch < 1):
+        raise ValueError(f"batch must be a positive integer or None, got {batch!r}")
+
+
+def _metrics(depth, in_flight, oldest, max_depth, counters, now):
+    return {
+        "depth": depth,
+        "ready": depth - in_flight,
+        "in_flight": in_flight,
+        "oldest_age": round(now - oldest, 3) if oldest is not None else 0.0,
+        "max_depth": max_depth,
+        **{name: counters.get(name, 0) for name in COUNTERS},
+    }
+
+
+class SQLiteQueue:
+    """Durable queue in a SQLite WAL database; safe across threads and processes."""
+
+    def __init__(self, path: str = DEFAULT_PATH, visibility_timeout: float = VISIBILITY_TIMEOUT,
+                 max_deliveries: int = MAX_DELIVERIES, max_depth: int = MAX_DEPTH):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self.max_depth = max_depth
+        self._local = threading.local()
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    payload TEXT NOT NULL,
+                    enqueued_at REAL NOT NULL,
+                    visible_at REAL NOT NULL,
+                    deliveries INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Queues created before channels existed: their jobs go to the default channel.
+            if "channel" not in {row[1] for row in db.execute("PRAGMA table_info(jobs)")}:
+                db.execute(f"ALTER TABLE jobs ADD COLUMN channel TEXT NOT NULL DEFAULT '{DEFAULT_CHANNEL}'")
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_channel ON jobs (channel, id)")
+            # Per-channel depth (for O(1) backpressure checks), limit override and counters.
+            db.execute(f"""
+                CREATE TABLE IF NOT EXISTS channels (
+                    channel TEXT PRIMARY KEY,
+                    depth INTEGER NOT NULL DEFAULT 0,
+                    max_depth INTEGER,
+                    {", ".join(f"{name} INTEGER NOT NULL DEFAULT 0" for name in COUNTERS)}
+                )
+            """)
+            db.execute("""
+                INSERT OR IGNORE INTO channels (channel, depth)
+                SELECT channel, COUNT(*) FROM jobs GROUP BY channel
+            """)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread: FastAPI runs sync endpoints in a thread pool.
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def _count(db, channel, **deltas):
+        sets = ", ".join(f"{name} = {name} + ?" for name in deltas)
+        db.execute(f"UPDATE channels SET {sets} WHERE channel = ?", (*deltas.values(), channel))
+
+    def push_many(self, cmds: Iterable[Dict[str, Any]], channel: str = DEFAULT_CHANNEL) -> None:
+        now = time.time()
+        rows = [(channel, json.dumps(cmd), now, now) for cmd in cmds]
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR IGNORE INTO channels (channel) VALUES (?)", (channel,))
+            depth, max_depth = db.execute(
+                "SELECT depth, max_depth FROM channels WHERE channel = ?", (channel,)
+            ).fetchone()
+            max_depth = self.max_depth if max_depth is None else max_depth
+            if depth + len(rows) > max_depth:
+                self._count(db, channel, rejected=len(rows))
+                db.execute("COMMIT")
+                raise QueueFull(channel, depth, max_depth)
+            db.executemany(
+                "INSERT INTO jobs (channel, payload, enqueued_at, visible_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._count(db, channel, depth=len(rows), pushed=len(rows))
+            db.execute("COMMIT")
+        except QueueFull:
+            raise
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def pull(self, batch: int | None = None, channel: str = DEFAULT_CHANNEL) -> List[Dict[str, Any]]:
+        _check_batch(batch)
+        now = time.time()
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            # Scanning the (channel, id) index keeps FIFO order and stops after `batch` visible jobs.
+            rows = db.execute(
+                "SELECT id, payload, deliveries FROM jobs WHERE channel = ? AND visible_at <= ? "
+                "ORDER BY id LIMIT ?",
+                (channel, now, -1 if batch is None else batch),
+            ).fetchall()
+            dead = [job_id for job_id, _, deliveries in rows if deliveries >= self.max_deliveries]
+            redelivered = sum(0 < deliveries < self.max_deliveries for _, _, deliveries in rows)
+            rows = [(job_id, payload) for job_id, payload, deliveries in rows if deliveries < self.max_deliveries]
+            db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in dead])
+            db.executemany(
+                "UPDATE jobs SET visible_at = ?, deliveries = deliveries + 1 WHERE id = ?",
+                [(now + self.visibility_timeout, job_id) for job_id, _ in rows],
+            )
+            if rows or dead:
+                self._count(db, channel, depth=-len(dead), dropped=len(dead),
+                            delivered=len(rows), redelivered=redelivered)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return [dict(json.loads(payload), job_id=job_id) for job_id, payload in rows]
+
+    def ack(self, job_ids: Iterable[int], channel: str | None = None) -> int:
+        """Delete acknowledged jobs; with `channel`, only jobs of that channel."""
+        ids = [int(i) for i in job_ids]
+        if not ids:
+            return 0
+        db = self._connect()
+        acked = Counter()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                sql = f"DELETE FROM jobs WHERE id IN ({','.join('?' * len(batch))})"
+                if channel is not None:
+                    sql, batch = sql + " AND channel = ?", batch + [channel]
+                acked.update(row[0] for row in db.execute(sql + " RETURNING channel", batch))
+            for name, count in acked.items():
+                self._count(db, name, depth=-count, acked=count)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return sum(acked.values())
+
+    def has_ready(self, channel: str = DEFAULT_CHANNEL) -> bool:
+        # A plain read: with WAL it never waits for writers, so it is cheap to poll.
+        row = self._connect().execute(
+            "SELECT 1 FROM jobs WHERE channel = ? AND visible_at <= ? LIMIT 1", (channel, time.time())
+        )
+        return row.fetchone() is not None
+
+    def size(self, channel: str | None = None) -> int:
+        db = self._connect()
+        if channel is None:
+            return db.execute("SELECT COALESCE(SUM(depth), 0) FROM channels").fetchone()[0]
+        row = db.execute("SELECT depth FROM channels WHERE channel = ?", (channel,)).fetchone()
+        return row[0] if row else 0
+
+    def set_max_depth(self, channel: str, max_depth: int | None) -> None:
+        """Override the depth limit of one channel (None restores the queue-wide default)."""
+        db = self._connect()
+        db.execute("INSERT OR IGNORE INTO channels (channel) VALUES (?)", (channel,))
+        db.execute("UPDATE channels SET max_depth = ? WHERE channel = ?", (max_depth, channel))
+
+    def metrics(self, channel: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """{channel: depth, ready, in_flight, oldest_age, max_depth and delivery counters}."""
+        now = time.time()
+        db = self._connect()
+        where, args = ("WHERE channel = ?", (channel,)) if channel is not None else ("", ())
+        jobs = {
+            row[0]: row[1:] for row in db.execute(
+                f"SELECT channel, SUM(visible_at > ?), MIN(enqueued_at) FROM jobs {where} GROUP BY channel",
+                (now, *args),
+            )
+        }
+        out = {}
+        for name, depth, max_depth, *counts in db.execute(
+            f"SELECT channel, depth, max_depth, {', '.join(COUNTERS)} FROM channels {where} ORDER BY channel", args
+        ):
+            in_flight, oldest = jobs.get(name, (0, None))
+            out[name] = _metrics(depth, in_flight, oldest, self.max_depth if max_depth is None else max_depth,
+                                 dict(zip(COUNTERS, counts)), now)
+        return out
+
+
+class MemoryQueue:
+    """Same semantics as SQLiteQueue, but in-process and not durable."""
+
+    def __init__(self, visibility_timeout: float = VISIBILITY_TIMEOUT, max_deliveries: int = MAX_DELIVERIES,
+                 max_depth: int = MAX_DEPTH):
+        self.visibility_timeout = visibility_timeout
+        self.max_deliveries = max_deliveries
+        self.max_depth = max_depth
+        # channel -> OrderedDict(job_id -> [cmd, visible_at, deliveries, enqueued_at])
+        self._jobs: Dict[str, "OrderedDict[int, list]"] = defaultdict(OrderedDict)
+        self._channel_of: Dict[int, str] = {}
+        self._limits: Dict[str, int] = {}
+        self._counters: Dict[str, Counter] = defaultdict(Counter)
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    def push_many(self, cmds: Iterable[Dict[str, Any]], channel: str = DEFAULT_CHANNEL) -> None:
+        cmds = [dict(cmd) for cmd in cmds]
+        now = time.time()
+        with self._lock:
+            jobs = self._jobs[channel]
+            max_depth = self._limits.get(channel, self.max_depth)
+            if len(jobs) + len(cmds) > max_depth:
+                self._counters[channel]["rejected"] += len(cmds)
+                raise QueueFull(channel, len(jobs), max_depth)
+            for cmd in cmds:
+                jobs[self._next_id] = [cmd, 0.0, 0, now]
+                self._channel_of[self._next_id] = channel
+                self._next_id += 1
+            self._counters[channel]["pushed"] += len(cmds)
+
+    def pull(self, batch: int | None = None, channel: str = DEFAULT_CHANNEL) -> List[Dict[str, Any]]:
+        _check_batch(batch)
+        now = time.time()
+        out, dead = [], []
+        with self._lock:
+            jobs = self._jobs[channel]
+            counters = self._counters[channel]
+            for job_id, job in jobs.items():
+                if batch is not None and len(out) + len(dead) >= batch:
+                    break
+                cmd, visible_at, deliveries, _ = job
+                if visible_at > now:
+                    continue
+                if deliveries >= self.max_deliveries:
+                    dead.append(job_id)
+                    continue
+                job[1], job[2] = now + self.visibility_timeout, deliveries + 1
+                counters["redelivered"] += deliveries > 0
+                out.append(dict(cmd, job_id=job_id))
+            for job_id in dead:
+                del jobs[job_id]
+                del self._channel_of[job_id]
+            counters["delivered"] += len(out)
+            counters["dropped"] += len(dead)
+        return out
+
+    def ack(self, job_ids: Iterable[int], channel: str | None = None) -> int:
+        """Delete acknowledged jobs; with `channel`, only jobs of that channel."""
+        acked = 0
+        with self._lock:
+            for job_id in map(int, job_ids):
+                owner = self._channel_of.get(job_id)
+                if owner is None or (channel is not None and owner != channel):
+                    continue
+                del self._jobs[owner][job_id]
+                del self._channel_of[job_id]
+                self._counters[owner]["acked"] += 1
+                acked += 1
+        return acked
+
+    def has_ready(self, channel: str = DEFAULT_CHANNEL) -> bool:
+        now = time.time()
+        with self._lock:
+            return any(job[1] <= now for job in self._jobs.get(channel, {}).values())
+
+    def size(self, channel: str | None = None) -> int:
+        with self._lock:
+            if channel is None:
+                return len(self._channel_of)
+            return len(self._jobs.get(channel, ()))
+
+    def set_max_depth(self, channel: str, max_depth: int | None) -> None:
+        """Override the depth limit of one channel (None restores the queue-wide default)."""
+        with self._lock:
+            if max_depth is None:
+                self._limits.pop(channel, None)
+            else:
+                self._limits[channel] = max_depth
+
+    def metrics(self, channel: str | None = None) -> Dict[str, Dict[str, Any]]:
+        """{channel: depth, ready, in_flight, oldest_age, max_depth and delivery counters}."""
+        now = time.time()
+        with self._lock:
+            names = sorted(set(self._jobs) | set(self._counters) | set(self._limits))
+            out = {}
+            for name in names if channel is None else [channel]:
+                jobs = list(self._jobs.get(name, {}).values())
+                out[name] = _metrics(
+                    len(jobs), sum(job[1] > now for job in jobs), min((job[3] for job in jobs), default=None),
+                    self._limits.get(name, self.max_depth), self._counters.get(name, {}), now,
+                )
+        return out
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    """Return the process-wide queue backend selected by MCP_QUEUE_BACKEND."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            backend = os.environ.get("MCP_QUEUE_BACKEND", "sqlite")
+            if backend == "memory":
+                _queue = MemoryQueue()
+            elif backend == "sqlite":
+                _queue = SQLiteQueue(os.environ.get("MCP_QUEUE_PATH", DEFAULT_PATH))
+            else:
+                raise ValueError(f"Unknown MCP_QUEUE_BACKEND: {backend}")
+        return _queue
+
+
+# channel -> (event loop, asyncio.Event) of each pull_wait waiting in this process
+_waiters = defaultdict(set)
+_waiters_lock = threading.Lock()
+
+def _wake(channel: str) -> None:
+    # Pushes may come from worker threads, so events are set on their own loops.
+    with _waiters_lock:
+        waiters = list(_waiters.get(channel, ()))
+    for loop, event in waiters:
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:    # loop already closed
+            pass
+
+def push(cmd: Dict[str, Any], channel: str = DEFAULT_CHANNEL) -> None:
+    get_queue().push_many([cmd], channel)
+    _wake(channel)
+
+def push_many(cmds: Iterable[Dict[str, Any]], channel: str = DEFAULT_CHANNEL) -> None:
+    get_queue().push_many(cmds, channel)
+    _wake(channel)
+
+def pull(batch: int | None = None, channel: str = DEFAULT_CHANNEL) -> List[Dict[str, Any]]:
+    return get_queue().pull(batch, channel)
+
+def ack(job_ids: Iterable[int], channel: str | None = None) -> int:
+    return get_queue().ack(job_ids, channel)
+
+def metrics(channel: str | None = None) -> Dict[str, Dict[str, Any]]:
+    return get_queue().metrics(channel)
+
+async def pull_wait(batch: int | None = None, wait: float = 0.0,
+                    channel: str = DEFAULT_CHANNEL) -> List[Dict[str, Any]]:
+    """
+    Like `pull`, but if nothing is ready wait up to `wait` seconds for
+    commands. A push through this module wakes the waiter immediately;
+    pushes from other workers (and redeliveries) are found by checking the
+    queue every POLL_INTERVAL, off the event loop.
+    """
+    if not math.isfinite(wait) or wait < 0:
+        raise ValueError(f"wait must be a finite number of seconds >= 0, got {wait!r}")
+    _check_batch(batch)
+    queue = get_queue()
+    deadline = time.monotonic() + wait
+    waiter = (asyncio.get_running_loop(), asyncio.Event())
+    event = waiter[1]
+    with _waiters_lock:
+        _waiters[channel].add(waiter)
+    try:
+        while True:
+            event.clear()   # before pulling, so a push during the pull is not missed
+            cmds = await asyncio.to_thread(queue.pull, batch, channel)
+            remaining = deadline - time.monotonic()
+            if cmds or remaining <= 0:
+                return cmds
+            while remaining > 0:
+                try:
+                    await asyncio.wait_for(event.wait(), min(POLL_INTERVAL, remaining))
+                    break
+                except asyncio.TimeoutError:
+                    pass
+                if await asyncio.to_thread(queue.has_ready, channel):
+                    break
+                remaining = deadline - time.monotonic()
+    finally:
+        with _waiters_lock:
+            _waiters[channel].discard(waiter)
+            if not _waiters[channel]:
+                del _waiters[channel]
@@ -0,0 +1,83 @@
+"""
+Load test: enqueue 1,000 stickies with one GET /mcp/create_sticky per sticky
+versus POST /mcp/batch in batches of various sizes.
+
+Starts its own server on a temporary queue unless --url is given:
+
+    python loadtest_batch.py [--stickies 1000] [--url http://localhost:8787]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+
+BATCH_SIZES = [10, 100, 1000]
+
+
+def sticky(i):
+    return {"op": "create_sticky", "text": f"sticky {i}", "x": (i % 40) * 220, "y": (i // 40) * 220}
+
+
+def drain(client):
+    while client.get("/pull", params={"batch": 1000, "auto_ack": True}).json():
+        pass
+
+
+def run(url, stickies):
+    with httpx.Client(base_url=url, timeout=60) as client:
+        drain(client)
+        start = time.perf_counter()
+        for i in range(stickies):
+            client.get("/mcp/create_sticky", params={k: v for k, v in sticky(i).items() if k != "op"})
+        single = time.perf_counter() - start
+        print(f"{'single calls':>16}: {stickies:5d} requests, {single:6.2f}s, {stickies / single:8,.0f} stickies/s")
+        drain(client)
+
+        for size in BATCH_SIZES:
+            start = time.perf_counter()
+            requests = 0
+            for first in range(0, stickies, size):
+                client.post("/mcp/batch", json=[sticky(i) for i in range(first, min(first + size, stickies))])
+                requests += 1
+            elapsed = time.perf_counter() - start
+            print(f"{f'batches of {size}':>16}: {requests:5d} requests, {elapsed:6.2f}s, "
+                  f"{stickies / elapsed:8,.0f} stickies/s ({single / elapsed:.0f}x)")
+            drain(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stickies", type=int, default=1000)
+    parser.add_argument("--url", default=None, help="existing server; its queue is drained before each run")
+    parser.add_argument("--port", type=int, default=8797)
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.stickies)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, MCP_QUEUE_PATH=os.path.join(tmp, "loadtest.sqlite"))
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+        )
+        try:
+            url = f"http://127.0.0.1:{args.port}"
+            for _ in range(50):
+                try:
+                    httpx.get(f"{url}/ping")
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.2)
+            run(url, args.stickies)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,30 @@
 """
 Bare‑bones MCP server that exposes:
   • A *tool* → create_sticky(text, x=0, y=0)
-  • A pulling endpoint for the FigJam plugin  (/pull?batch=32)
+  • A pulling endpoint for the FigJam plugin  (/pull?batch=32, long-poll with &wait=30)
+  • A Server-Sent Events stream of queued commands (/stream)
+  • An acknowledgement endpoint for processed commands (POST /ack)
+  • A batch endpoint enqueuing many commands atomically (POST /mcp/batch)
+  • Per-channel queue metrics (/metrics)
+
+Every endpoint takes a `board` parameter (default "default") naming the
+command channel, so one server can drive many boards/sessions at once.
+A full channel answers 429 until its plugin catches up.
 """
 """
 HTTP server for FigJam plugin polling (uses job_queue) and optional stdio JSON-RPC mode.
 """
+import re
+import json
+import asyncio
+
 # FastAPI-based HTTP polling server
-from fastapi import FastAPI
+from typing import Annotated, Literal, Union
+
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from pydantic import BaseModel, Field, TypeAdapter
 # job queue import (support both project-root and mcp_server-root execution)
 try:
     from mcp_server import job_queue as qmod
@@ -25,10 +41,99 @@ app.add_middleware(
 )
 
 
+MAX_WAIT = 60           # longest allowed long-poll / SSE wait (seconds)
+MAX_BATCH = 1000        # most commands per pull or per POST /mcp/batch
+SSE_KEEPALIVE = 15      # comment line sent on idle SSE streams (seconds)
+BOARD_PATTERN = r"^[A-Za-z0-9_.:-]{1,128}$"
+_board_re = re.compile(BOARD_PATTERN[1:-1])
+
+# Commands returned per /pull or /stream event.
+PullBatch = Annotated[int, Query(ge=1, le=MAX_BATCH)]
+
+# Command channel: one per FigJam board or agent session.
+Board = Annotated[str, Query(pattern=BOARD_PATTERN, description="Command channel (board/session id)")]
+
+
+def check_board(board: str) -> str:
+    """Validate a board name from a non-HTTP caller (stdio tools) like the Board query parameter."""
+    if not isinstance(board, str) or not _board_re.fullmatch(board):
+        raise ValueError(f"Invalid board {board!r}: must match {BOARD_PATTERN}")
+    return board
+
+
+@app.exception_handler(qmod.QueueFull)
+def queue_full(request: Request, exc: qmod.QueueFull):
+    """Backpressure: the board's plugin is behind, so the caller should retry later."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc), "board": exc.channel, "depth": exc.depth, "max_depth": exc.max_depth},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/pull")
-def pull(batch: int | None = 32):
-    """FigJam plugin hits this every 2 s and receives queued commands."""
-    return qmod.pull(batch)
+async def pull(batch: PullBatch = 32, auto_ack: bool = False,
+               wait: Annotated[float, Query(ge=0, le=MAX_WAIT)] = 0,
+               board: Board = qmod.DEFAULT_CHANNEL):
+    """
+    FigJam plugin hits this to receive queued commands.
+
+    With wait > 0 (long-poll, e.g. /pull?wait=30) the request is held open
+    until commands arrive or `wait` seconds pass, instead of polling.
+
+    Each command carries a `job_id`; commands that are not acknowledged via
+    POST /ack within the visibility timeout are delivered again. Clients
+    that cannot ack can pass auto_ack=true (at-most-once delivery).
+    """
+    cmds = await qmod.pull_wait(batch, wait, board)
+    if auto_ack:
+        await asyncio.to_thread(qmod.ack, [cmd["job_id"] for cmd in cmds], board)
+    return cmds
+
+
+@app.get("/stream")
+async def stream(request: Request, batch: PullBatch = 32, auto_ack: bool = False,
+                 board: Board = qmod.DEFAULT_CHANNEL):
+    """
+    Server-Sent Events stream: each batch of commands is pushed as one
+    `data:` event (a JSON array) as soon as it is queued. Acknowledgement
+    works as for /pull.
+    """
+    async def events():
+        while not await request.is_disconnected():
+            cmds = await qmod.pull_wait(batch, SSE_KEEPALIVE, board)
+            if not cmds:
+                yield ": keep-alive\n\n"
+                continue
+            if auto_ack:
+                await asyncio.to_thread(qmod.ack, [cmd["job_id"] for cmd in cmds], board)
+            yield f"data: {json.dumps(cmds)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+class AckRequest(BaseModel):
+    job_ids: list[int]
+    board: str | None = Field(default=None, pattern=BOARD_PATTERN)
+
+
+@app.post("/ack")
+def ack(req: AckRequest):
+    """
+    Acknowledge processed commands so they are not redelivered. With
+    `board`, only that board's commands are acknowledged.
+    """
+    return {"acked": qmod.ack(req.job_ids, req.board)}
+
+
+@app.get("/metrics")
+def metrics(board: Annotated[str | None, Query(pattern=BOARD_PATTERN)] = None):
+    """
+    Per-board queue metrics: depth (queued), ready, in_flight (delivered,
+    awaiting ack), oldest_age (seconds), max_depth and the counters pushed,
+    delivered, redelivered, acked, dropped and rejected (429s).
+    """
+    return qmod.metrics(board)
 
 # handy health check
 @app.get("/ping")
@@ -41,6 +146,7 @@ def http_create_sticky(
     text: str,
     x: int = 0,
     y: int = 0,
+    board: Board = qmod.DEFAULT_CHANNEL,
 ):
     """
     HTTP endpoint wrapper for the create_sticky MCP tool.
@@ -50,12 +156,13 @@ def http_create_sticky(
         text: The text on the post-it.
         x: The x position.
         y: The y position.
+        board: The board (command channel) to queue on.
 
     Returns:
         dict: Result of the operation.
     """
     # enqueue the same command as the MCP tool
-    qmod.push({"op": "create_sticky", "text": text, "x": x, "y": y})
+    qmod.push({"op": "create_sticky", "text": text, "x": x, "y": y}, board)
     return {"result": "queued"}
 
 @app.get("/mcp/create_text")
@@ -63,6 +170,7 @@ def http_create_text(
     text: str,
     x: int = 0,
     y: int = 0,
+    board: Board = qmod.DEFAULT_CHANNEL,
 ):
     """
     HTTP endpoint wrapper for the create_text MCP tool.
@@ -72,11 +180,12 @@ def http_create_text(
         text: The text to render.
         x: The x position.
         y: The y position.
+        board: The board (command channel) to queue on.
 
     Returns:
         dict: Result of the operation.
     """
-    qmod.push({"op": "create_text", "text": text, "x": x, "y": y})
+    qmod.push({"op": "create_text", "text": text, "x": x, "y": y}, board)
     return {"result": "queued"}
     
 @app.get("/mcp/move_node")
@@ -84,6 +193,7 @@ def http_move_node(
     id: str,
     x: int = 0,
     y: int = 0,
+    board: Board = qmod.DEFAULT_CHANNEL,
 ):
     """
     HTTP endpoint wrapper for the move_node MCP tool.
@@ -93,16 +203,18 @@ def http_move_node(
         id: The ID of the node to move.
         x: The new x position.
         y: The new y position.
+        board: The board (command channel) to queue on.
 
     Returns:
         dict: Result of the operation.
     """
-    qmod.push({"op": "move_node", "id": id, "x": x, "y": y})
+    qmod.push({"op": "move_node", "id": id, "x": x, "y": y}, board)
     return {"result": "queued"}
 
 @app.get("/mcp/start_timer")
 def http_start_timer(
     seconds: int,
+    board: Board = qmod.DEFAULT_CHANNEL,
 ):
     """
     HTTP endpoint wrapper for the start_timer MCP tool.
@@ -110,17 +222,19 @@ def http_start_timer(
 
     Args:
         seconds: The timer duration in seconds.
+        board: The board (command channel) to queue on.
 
     Returns:
         dict: Result of the operation.
     """
-    qmod.push({"op": "start_timer", "seconds": seconds})
+    qmod.push({"op": "start_timer", "seconds": seconds}, board)
     return {"result": "queued"}
 
 @app.get("/mcp/create_connector")
 def http_create_connector(
     start_id: str | None = None,
     end_id: str | None = None,
+    board: Board = qmod.DEFAULT_CHANNEL,
 ):
     """
     HTTP endpoint for the create_connector MCP tool.
@@ -131,10 +245,81 @@ def http_create_connector(
         cmd["start_id"] = start_id
     if end_id is not None:
         cmd["end_id"] = end_id
-    qmod.push(cmd)
+    qmod.push(cmd, board)
     return {"result": "queued"}
 
 
+
+# ─────────── batched commands ─────────────────────────────────────
+class CreateStickyCmd(BaseModel):
+    op: Literal["create_sticky"]
+    text: str
+    x: int = 0
+    y: int = 0
+
+class CreateTextCmd(BaseModel):
+    op: Literal["create_text"]
+    text: str
+    x: int = 0
+    y: int = 0
+
+class MoveNodeCmd(BaseModel):
+    op: Literal["move_node"]
+    id: str
+    x: int = 0
+    y: int = 0
+
+class StartTimerCmd(BaseModel):
+    op: Literal["start_timer"]
+    seconds: int
+
+class CreateConnectorCmd(BaseModel):
+    op: Literal["create_connector"]
+    start_id: str | None = None
+    end_id: str | None = None
+
+Command = Annotated[
+    Union[CreateStickyCmd, CreateTextCmd, MoveNodeCmd, StartTimerCmd, CreateConnectorCmd],
+    Field(discriminator="op"),
+]
+_batch_adapter = TypeAdapter(list[Command])
+
+
+class BatchTooLarge(ValueError):
+    """More than MAX_BATCH commands in one batch."""
+
+
+def queue_commands(commands: list, board: str = qmod.DEFAULT_CHANNEL) -> int:
+    """Enqueue validated commands on `board` in one transaction; shared by HTTP and stdio."""
+    if len(commands) > MAX_BATCH:
+        raise BatchTooLarge(f"At most {MAX_BATCH} commands per batch")
+    qmod.push_many([cmd.model_dump(exclude_none=True) for cmd in commands], board)
+    return len(commands)
+
+
+def enqueue_batch(commands: list, board: str = qmod.DEFAULT_CHANNEL) -> int:
+    """Validate every command first, then enqueue them all in one transaction."""
+    return queue_commands(_batch_adapter.validate_python(commands), check_board(board))
+
+
+@app.post("/mcp/batch")
+def http_batch(commands: list[Command], board: Board = qmod.DEFAULT_CHANNEL):
+    """
+    HTTP endpoint that enqueues a JSON array of commands, e.g.
+    [{"op": "create_sticky", "text": "hi", "x": 0, "y": 0}, {"op": "create_connector"}].
+
+    The batch is validated as a whole (422 if any command is invalid) and
+    enqueued atomically, in order, on `board` (429 if it would overflow).
+
+    Returns:
+        dict: Result of the operation and the number of queued commands.
+    """
+    try:
+        count = queue_commands(commands, board)
+    except BatchTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return {"result": "queued", "count": count}
+
 # ─────────── entry point ─────────────────────────────────────────
 if __name__ == "__main__":
     import argparse
@@ -149,6 +334,8 @@ if __name__ == "__main__":
                         help="HTTP port (when not using --stdio)")
     parser.add_argument("--reload", action="store_true",
                         help="Enable HTTP reload (when not using --stdio)")
+    parser.add_argument("--board", default=qmod.DEFAULT_CHANNEL, type=check_board,
+                        help="Default board (command channel) for stdio tools")
     args = parser.parse_args()
 
     # In stdio mode, run JSON-RPC MCP server over stdin/stdout
@@ -159,33 +346,41 @@ if __name__ == "__main__":
         mcp_server = FastMCP(name="MCPJam", instructions="Stdio MCP server for FigJam plugin")
         # Register the create_sticky tool for JSON-RPC clients
         @mcp_server.tool(name="create_sticky")
-        def create_sticky_tool(text: str, x: int = 0, y: int = 0):  # noqa: F811
-            qmod.push({"op": "create_sticky", "text": text, "x": x, "y": y})
+        def create_sticky_tool(text: str, x: int = 0, y: int = 0, board: str = args.board):  # noqa: F811
+            qmod.push({"op": "create_sticky", "text": text, "x": x, "y": y}, check_board(board))
             return "queued"
         @mcp_server.tool(name="move_node")
-        def move_node_tool(id: str, x: int = 0, y: int = 0):  # noqa: F811
-            qmod.push({"op": "move_node", "id": id, "x": x, "y": y})
+        def move_node_tool(id: str, x: int = 0, y: int = 0, board: str = args.board):  # noqa: F811
+            qmod.push({"op": "move_node", "id": id, "x": x, "y": y}, check_board(board))
             return "queued"
         @mcp_server.tool(name="start_timer")
-        def start_timer_tool(seconds: int):  # noqa: F811
-            qmod.push({"op": "start_timer", "seconds": seconds})
+        def start_timer_tool(seconds: int, board: str = args.board):  # noqa: F811
+            qmod.push({"op": "start_timer", "seconds": seconds}, check_board(board))
             return "queued"
         @mcp_server.tool(name="create_connector")
         def create_connector_tool(
             start_id: str | None = None,
             end_id: str | None = None,
+            board: str = args.board,
         ):  # noqa: F811
             cmd = {"op": "create_connector"}
             if start_id is not None:
                 cmd["start_id"] = start_id
             if end_id is not None:
                 cmd["end_id"] = end_id
-            qmod.push(cmd)
+            qmod.push(cmd, check_board(board))
             return "queued"
         @mcp_server.tool(name="create_text")
-        def create_text_tool(text: str, x: int = 0, y: int = 0):  # noqa: F811
-            qmod.push({"op": "create_text", "text": text, "x": x, "y": y})
+        def create_text_tool(text: str, x: int = 0, y: int = 0, board: str = args.board):  # noqa: F811
+            qmod.push({"op": "create_text", "text": text, "x": x, "y": y}, check_board(board))
             return "queued"
+        @mcp_server.tool(name="batch")
+        def batch_tool(commands: list[dict], board: str = args.board):  # noqa: F811
+            """
+            Queue many commands at once, e.g. [{"op": "create_sticky", "text": "hi", "x": 0, "y": 0}].
+            Supported ops: create_sticky, create_text, move_node, start_timer, create_connector.
+            """
+            return f"queued {enqueue_batch(commands, board)}"
         # Run the server over stdio
         mcp_server.run("stdio")
     else: